@@ -0,0 +1,199 @@
+"""Benchmark the stages of DER on synthetic workloads.
+
+Usage:
+    python3 benchmarks/run_benchmarks.py --output bench.json
+
+The results are written as JSON, with one record per (workload, size) pair
+holding the best wall time of each stage in seconds, the per-call time of DER
+on a small list of tuples, and the cold import time of simpleder.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import scipy
+
+import workloads
+from simpleder import der
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000, 1000000]
+
+
+def _best_time(function, repeats):
+    """Run `function` `repeats` times, return (best seconds, last result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def measure_import_time(repeats):
+    """Measure the cold import time of simpleder in fresh interpreters.
+
+    Args:
+        repeats: number of fresh interpreters; the best time is reported
+
+    Returns:
+        a dict with the best "seconds", and whether importing simpleder also
+            imported "scipy"
+    """
+    code = ("import sys, time; start = time.perf_counter(); "
+            "import simpleder; print(time.perf_counter() - start, "
+            "'scipy' in sys.modules)")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    best = float("inf")
+    for _ in range(repeats):
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         env=env, universal_newlines=True)
+        seconds, scipy_imported = output.split()
+        best = min(best, float(seconds))
+    return {"seconds": best, "scipy": scipy_imported == "True"}
+
+
+# The example of the README, as lists of tuples: small files like this are
+# scored many times, so the per-call overhead matters.
+SMALL_REF = [("A", 0.0, 1.0), ("B", 1.0, 1.5), ("A", 1.6, 2.1)]
+SMALL_HYP = [("1", 0.0, 0.8), ("2", 0.8, 1.4), ("3", 1.5, 1.8),
+             ("1", 1.8, 2.0)]
+
+
+def benchmark_small_input(repeats, number=1000):
+    """Time the per-call cost of DER on a small list of tuples.
+
+    Args:
+        repeats: number of runs; the best time is reported
+        number: number of calls in each run
+
+    Returns:
+        a dict from stage name to seconds per call
+    """
+    def per_call(function):
+        seconds, _ = _best_time(
+            lambda: [function() for _ in range(number)], repeats)
+        return seconds / number
+
+    return {
+        "check_input": per_call(lambda: (der.check_input(SMALL_REF),
+                                         der.check_input(SMALL_HYP))),
+        "DER": per_call(lambda: der.DER(SMALL_REF, SMALL_HYP)),
+        "DER_without_validation": per_call(
+            lambda: der.DER(SMALL_REF, SMALL_HYP, validate=False)),
+    }
+
+
+def benchmark(ref, hyp, collar, repeats):
+    """Time each stage of DER on one input.
+
+    Args:
+        ref: a SegmentArray for the reference
+        hyp: a SegmentArray for the hypothesis
+        collar: float, the collar
+        repeats: number of runs of each stage; the best time is reported
+
+    Returns:
+        a dict from stage name to seconds
+    """
+    stages = {}
+    stages["check_input"], _ = _best_time(
+        lambda: (der.check_input(ref), der.check_input(hyp)), repeats)
+
+    def subtract_collar():
+        ex_starts, ex_ends = der._merged_exclusion_arrays(ref, collar)
+        return (der._subtract_intervals(ref, ex_starts, ex_ends),
+                der._subtract_intervals(hyp, ex_starts, ex_ends))
+
+    stages["collar_subtraction"], (scored_ref, scored_hyp) = _best_time(
+        subtract_collar, repeats)
+    stages["build_cost_matrix"], cost_matrix = _best_time(
+        lambda: der.build_cost_matrix(scored_ref, scored_hyp), repeats)
+    stages["linear_sum_assignment"], _ = _best_time(
+        lambda: der.compute_optimal_match_overlap(cost_matrix), repeats)
+    stages["compute_load_length"], _ = _best_time(
+        lambda: der.compute_load_length(scored_ref, scored_hyp), repeats)
+    stages["DER"], _ = _best_time(
+        lambda: der.DER(ref, hyp, collar=collar), repeats)
+    return stages
+
+
+def run(workload_names, sizes, repeats, seed):
+    """Run the benchmarks.
+
+    Args:
+        workload_names: a list of keys of `workloads.WORKLOADS`
+        sizes: a list of numbers of reference segments
+        repeats: number of runs of each stage
+        seed: random seed of the workload generators
+
+    Returns:
+        a JSON-serializable dict
+    """
+    import_time = measure_import_time(repeats)
+    print("import simpleder: {:.4f}s".format(import_time["seconds"]),
+          file=sys.stderr)
+    small_input = benchmark_small_input(repeats)
+    print("small input: DER {:.1f}us".format(small_input["DER"] * 1e6),
+          file=sys.stderr)
+    results = []
+    for name in workload_names:
+        for size in sizes:
+            ref, hyp, collar = workloads.WORKLOADS[name](size, seed=seed)
+            stages = benchmark(ref, hyp, collar, repeats)
+            results.append({
+                "workload": name,
+                "num_segments": size,
+                "ref_segments": len(ref),
+                "hyp_segments": len(hyp),
+                "ref_speakers": len(der.build_speaker_index(ref)),
+                "hyp_speakers": len(der.build_speaker_index(hyp)),
+                "collar": collar,
+                "seconds": stages,
+            })
+            print("{:>22} {:>8}: DER {:.4f}s".format(
+                name, size, stages["DER"]), file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeats": repeats,
+        "import": import_time,
+        "small_input": small_input,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workloads", nargs="+",
+                        default=sorted(workloads.WORKLOADS),
+                        choices=sorted(workloads.WORKLOADS))
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="-",
+                        help="path of the JSON output; '-' for stdout")
+    args = parser.parse_args(argv)
+
+    report = run(args.workloads, args.sizes, args.repeats, args.seed)
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as file_object:
+            json.dump(report, file_object, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Seeded generators of synthetic diarization workloads for benchmarking.
+
+Each workload is a function `(num_segments, seed)` that returns a
+`(ref, hyp, collar)` triple, where `ref` and `hyp` are `SegmentArray`s with
+roughly `num_segments` segments each.
+"""
+
+import numpy as np
+
+from simpleder import segments
+
+
+def _make_labels(prefix, num_speakers):
+    return ["{}{}".format(prefix, i) for i in range(num_speakers)]
+
+
+def _remove_self_overlap(codes, starts, ends):
+    """Clip segments so that no two segments of a speaker intersect."""
+    order = np.lexsort((starts, codes))
+    codes, starts, ends = codes[order], starts[order], ends[order]
+    for code in np.unique(codes):
+        rows = np.flatnonzero(codes == code)
+        previous_ends = np.maximum.accumulate(ends[rows])
+        starts[rows[1:]] = np.maximum(starts[rows[1:]], previous_ends[:-1])
+        ends[rows] = np.maximum(ends[rows], starts[rows])
+    keep = ends > starts
+    return codes[keep], starts[keep], ends[keep]
+
+
+def _build(codes, starts, ends, labels):
+    codes, starts, ends = _remove_self_overlap(
+        np.asarray(codes), np.asarray(starts, dtype=np.float64),
+        np.asarray(ends, dtype=np.float64))
+    order = np.argsort(starts, kind="stable")
+    return segments.SegmentArray(codes[order], labels, starts[order],
+                                 ends[order])
+
+
+def generate_reference(rng, num_segments, num_speakers, mean_duration,
+                       overlap_ratio):
+    """Generate a reference of speaker turns.
+
+    Args:
+        rng: a numpy random Generator
+        num_segments: number of segments
+        num_speakers: number of speakers
+        mean_duration: mean segment duration in seconds
+        overlap_ratio: probability that a turn starts before the previous
+            one ends
+
+    Returns:
+        a tuple of 1-dim numpy arrays: (codes, starts, ends)
+    """
+    durations = rng.exponential(mean_duration, num_segments) + 0.05
+    gaps = rng.exponential(0.3 * mean_duration, num_segments)
+    overlapped = rng.random(num_segments) < overlap_ratio
+    # An overlapped turn starts within the previous turn.
+    steps = np.where(overlapped,
+                     -rng.random(num_segments) * np.roll(durations, 1),
+                     gaps)
+    steps[0] = 0.0
+    # Each turn starts `step` after the end of the previous turn.
+    increments = np.concatenate([[0.0], durations[:-1] + steps[1:]])
+    starts = np.cumsum(increments)
+    ends = starts + durations
+    codes = rng.integers(num_speakers, size=num_segments)
+    # Avoid handing a turn to the speaker of the previous turn.
+    same = np.flatnonzero(codes[1:] == codes[:-1]) + 1
+    codes[same] = (codes[same] + 1) % num_speakers
+    return codes, starts, ends
+
+
+def perturb_hypothesis(rng, codes, starts, ends, num_hyp_speakers,
+                       jitter=0.2, confusion=0.1, miss=0.05,
+                       false_alarm=0.05, pieces=1):
+    """Derive a hypothesis from a reference with typical system errors.
+
+    Args:
+        rng: a numpy random Generator
+        codes: speaker codes of the reference, see `generate_reference`
+        starts: start times of the reference
+        ends: end times of the reference
+        num_hyp_speakers: number of hypothesis speakers
+        jitter: standard deviation of boundary errors in seconds
+        confusion: probability of assigning a segment to a random speaker
+        miss: probability of dropping a segment
+        false_alarm: number of false alarm segments per reference segment
+        pieces: maximum number of pieces each segment is split into
+
+    Returns:
+        a tuple of 1-dim numpy arrays: (codes, starts, ends)
+    """
+    mapping = rng.permutation(max(num_hyp_speakers, codes.max() + 1))
+    hyp_codes = mapping[codes] % num_hyp_speakers
+    confused = rng.random(len(codes)) < confusion
+    hyp_codes[confused] = rng.integers(num_hyp_speakers,
+                                       size=int(confused.sum()))
+    hyp_starts = starts + rng.normal(0.0, jitter, len(codes))
+    hyp_ends = ends + rng.normal(0.0, jitter, len(codes))
+    keep = rng.random(len(codes)) >= miss
+    hyp_codes, hyp_starts, hyp_ends = (
+        hyp_codes[keep], hyp_starts[keep], hyp_ends[keep])
+
+    if pieces > 1:
+        # Split each segment into pieces labeled with random speakers.
+        counts = rng.integers(1, pieces + 1, size=len(hyp_codes))
+        rows = np.repeat(np.arange(len(hyp_codes)), counts)
+        index = np.arange(len(rows)) - np.repeat(
+            np.cumsum(counts) - counts, counts)
+        width = (hyp_ends - hyp_starts)[rows] / counts[rows]
+        hyp_starts = hyp_starts[rows] + index * width
+        hyp_ends = hyp_starts + width
+        hyp_codes = hyp_codes[rows]
+        relabel = rng.random(len(rows)) < 0.5
+        hyp_codes[relabel] = rng.integers(num_hyp_speakers,
+                                          size=int(relabel.sum()))
+
+    num_false_alarms = int(false_alarm * len(codes))
+    fa_starts = rng.uniform(0.0, ends.max(), num_false_alarms)
+    fa_ends = fa_starts + rng.exponential(0.5, num_false_alarms)
+    fa_codes = rng.integers(num_hyp_speakers, size=num_false_alarms)
+    return (np.concatenate([hyp_codes, fa_codes]),
+            np.concatenate([hyp_starts, fa_starts]),
+            np.concatenate([hyp_ends, fa_ends]))
+
+
+def _workload(num_segments, seed, num_speakers, num_hyp_speakers,
+              mean_duration, overlap_ratio, collar, pieces=1):
+    rng = np.random.default_rng(seed)
+    codes, starts, ends = generate_reference(
+        rng, num_segments, num_speakers, mean_duration, overlap_ratio)
+    ref = _build(codes, starts, ends, _make_labels("ref", num_speakers))
+    hyp_codes, hyp_starts, hyp_ends = perturb_hypothesis(
+        rng, codes, starts, ends, num_hyp_speakers, pieces=pieces)
+    hyp = _build(hyp_codes, hyp_starts, hyp_ends,
+                 _make_labels("hyp", num_hyp_speakers))
+    return ref, hyp, collar
+
+
+def many_speakers(num_segments, seed=0):
+    """A meeting with many participants and an over-clustered hypothesis."""
+    return _workload(num_segments, seed, num_speakers=50,
+                     num_hyp_speakers=80, mean_duration=2.0,
+                     overlap_ratio=0.1, collar=0.0)
+
+
+def heavy_overlap(num_segments, seed=0):
+    """A conversation where most turns overlap the previous one."""
+    return _workload(num_segments, seed, num_speakers=4, num_hyp_speakers=4,
+                     mean_duration=3.0, overlap_ratio=0.6, collar=0.0)
+
+
+def long_recording(num_segments, seed=0):
+    """A long recording with few speakers and long turns."""
+    return _workload(num_segments, seed, num_speakers=3, num_hyp_speakers=4,
+                     mean_duration=20.0, overlap_ratio=0.05, collar=0.0)
+
+
+def fragmented_hypothesis(num_segments, seed=0):
+    """A hypothesis that splits reference turns into many short pieces.
+
+    The hypothesis has about 3 times as many segments as the reference.
+    """
+    return _workload(num_segments, seed, num_speakers=6,
+                     num_hyp_speakers=30, mean_duration=4.0,
+                     overlap_ratio=0.1, collar=0.0, pieces=5)
+
+
+def dense_collars(num_segments, seed=0):
+    """Many short turns scored with a collar, so exclusions are dense."""
+    return _workload(num_segments, seed, num_speakers=8, num_hyp_speakers=8,
+                     mean_duration=0.8, overlap_ratio=0.2, collar=0.25)
+
+
+WORKLOADS = {
+    "many_speakers": many_speakers,
+    "heavy_overlap": heavy_overlap,
+    "long_recording": long_recording,
+    "fragmented_hypothesis": fragmented_hypothesis,
+    "dense_collars": dense_collars,
+}
@@ -0,0 +1,18 @@
+#!/bin/bash
+set -o errexit
+
+# Get project path.
+PROJECT_PATH="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
+
+# Add project modules to PYTHONPATH.
+if [[ "${PYTHONPATH}" != *"${PROJECT_PATH}"* ]]; then
+    export PYTHONPATH="${PYTHONPATH}:${PROJECT_PATH}"
+fi
+
+pushd ${PROJECT_PATH}
+
+# Run benchmarks. Extra arguments are passed to the benchmark script, e.g.:
+# bash run_benchmarks.sh --sizes 100 1000 --output bench.json
+python3 benchmarks/run_benchmarks.py "$@"
+
+popd
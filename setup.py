@@ -21,6 +21,11 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/wq2012/SimpleDER",
     packages=setuptools.find_packages(),
+    entry_points={
+        "console_scripts": [
+            "simpleder=simpleder.cli:main",
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
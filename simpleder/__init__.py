@@ -1,3 +1,31 @@
+from . import cache
+from . import corpus
+from . import curves
 from . import der
+from . import frames
+from . import online
+from . import profiling
+from . import rttm  # noqa: F401
+from . import segments
+from . import significance  # noqa: F401
+from . import store
+from . import timeline
 
 DER = der.DER
+DER_collars = timeline.DER_collars
+DERDetails = der.DERDetails
+DER_corpus = corpus.DER_corpus
+DER_curve = curves.DER_curve
+DERCurve = curves.DERCurve
+DER_frames = frames.DER_frames
+DER_and_JER = der.DER_and_JER
+DER_and_skip_overlap = timeline.DER_and_skip_overlap
+DER_multi = der.DER_multi
+DER_stores = store.DER_stores
+DERStats = profiling.DERStats
+JER = der.JER
+OnlineDER = online.OnlineDER
+PreparedReference = der.PreparedReference
+ReferenceCache = cache.ReferenceCache
+SegmentArray = segments.SegmentArray
+SegmentStore = store.SegmentStore
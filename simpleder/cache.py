@@ -0,0 +1,119 @@
+import collections
+
+from . import der
+
+
+def _cache_key(key, collar, uem, skip_overlap):
+    """The key of a reference prepared with these options."""
+    cache_key = (key, collar, skip_overlap)
+    if uem is not None:
+        cache_key += (tuple(map(tuple, uem)),)
+    return cache_key
+
+
+class ReferenceCache:
+    """A least-recently-used cache of PreparedReference, bounded in memory.
+
+    This is useful when the same references are scored against many
+    hypotheses, e.g. in a hyperparameter search over a corpus.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """Create an empty cache.
+
+        Args:
+            max_bytes: int, the maximum total `nbytes` of the cached
+                references; the least recently used ones are evicted first
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "ReferenceCache({} references, {} bytes)".format(
+            len(self), self.nbytes)
+
+    def get(self, key, ref, collar=0.0, validate=True, uem=None,
+            skip_overlap=False):
+        """Get the prepared reference for `key`, preparing `ref` if missing.
+
+        Args:
+            key: a hashable id of the reference, e.g. a file id
+            ref: the reference to prepare if `key` with these options is
+                not cached, see `PreparedReference`
+            collar: float, tolerance allowing for some mismatch in speaker
+                borders
+            validate: if False, skip `check_input` on `ref`
+            uem: optional list of (start, end) tuples; if set, only these
+                regions are scored
+            skip_overlap: if True, do not score the regions where at least
+                two reference speakers overlap
+
+        Returns:
+            a PreparedReference
+        """
+        prepared = self.lookup(key, collar=collar, uem=uem,
+                               skip_overlap=skip_overlap)
+        if prepared is None:
+            prepared = self.insert(
+                key, der.PreparedReference(ref, collar=collar,
+                                           validate=validate, uem=uem,
+                                           skip_overlap=skip_overlap),
+                collar=collar, uem=uem, skip_overlap=skip_overlap)
+        return prepared
+
+    def lookup(self, key, collar=0.0, uem=None, skip_overlap=False):
+        """Get the prepared reference for `key` if it is cached.
+
+        Together with `insert`, this lets callers prepare references outside
+        of a lock that guards the cache.
+
+        Args:
+            key: a hashable id of the reference
+            collar: float, see `get`
+            uem: optional list of (start, end) tuples, see `get`
+            skip_overlap: bool, see `get`
+
+        Returns:
+            a PreparedReference, or None if it is not cached
+        """
+        cache_key = _cache_key(key, collar, uem, skip_overlap)
+        if cache_key not in self._entries:
+            return None
+        self._entries.move_to_end(cache_key)
+        return self._entries[cache_key]
+
+    def insert(self, key, prepared, collar=0.0, uem=None,
+               skip_overlap=False):
+        """Cache a prepared reference, unless one is cached already.
+
+        Args:
+            key: a hashable id of the reference
+            prepared: a PreparedReference, prepared with these options
+            collar: float, see `get`
+            uem: optional list of (start, end) tuples, see `get`
+            skip_overlap: bool, see `get`
+
+        Returns:
+            the cached PreparedReference for `key`, or `prepared` if it is
+                too large to be cached
+        """
+        cache_key = _cache_key(key, collar, uem, skip_overlap)
+        if cache_key in self._entries:
+            self._entries.move_to_end(cache_key)
+            return self._entries[cache_key]
+        if prepared.nbytes <= self.max_bytes:
+            self._entries[cache_key] = prepared
+            self.nbytes += prepared.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return prepared
+
+    def clear(self):
+        """Remove all cached references."""
+        self._entries.clear()
+        self.nbytes = 0
@@ -0,0 +1,64 @@
+import argparse
+import sys
+
+from . import corpus
+from . import der
+from . import rttm
+
+
+def build_parser():
+    """Build the argument parser of the command line tool."""
+    parser = argparse.ArgumentParser(
+        prog="simpleder",
+        description="Compute Diarization Error Rate (DER) of a hypothesis "
+                    "RTTM file against a reference RTTM file.")
+    parser.add_argument("ref", help="path to the reference RTTM file")
+    parser.add_argument("hyp", help="path to the hypothesis RTTM file")
+    parser.add_argument("--collar", type=float, default=0.0,
+                        help="tolerance in seconds around reference "
+                             "boundaries (default: 0.0)")
+    parser.add_argument("--uem",
+                        help="path to a UEM file; only its regions are "
+                             "scored, and files missing from it are scored "
+                             "entirely")
+    parser.add_argument("--skip-overlap", action="store_true",
+                        help="do not score regions where at least two "
+                             "reference speakers are active")
+    parser.add_argument("--per-file", action="store_true",
+                        help="also print the DER of each file")
+    return parser
+
+
+def main(argv=None):
+    """Run the command line tool.
+
+    Args:
+        argv: a list of command line arguments, without the program name;
+            defaults to `sys.argv[1:]`
+
+    Returns:
+        the exit code
+    """
+    args = build_parser().parse_args(argv)
+    uem = rttm.read_uem(args.uem) if args.uem else {}
+    file_ids, errors, ref_lengths = [], [], []
+    for file_id, ref, hyp in rttm.iter_rttm_pairs(args.ref, args.hyp,
+                                                  as_arrays=True):
+        error_length, ref_total_length = (
+            der.compute_error_and_reference_length(
+                ref, hyp, collar=args.collar, uem=uem.get(file_id),
+                skip_overlap=args.skip_overlap))
+        file_ids.append(file_id)
+        errors.append(error_length)
+        ref_lengths.append(ref_total_length)
+        if args.per_file:
+            file_der = (error_length / ref_total_length
+                        if ref_total_length else 0.0)
+            print("{} DER={:.4f}".format(file_id, file_der))
+    result = corpus.CorpusResult(file_ids, errors, ref_lengths)
+    print("DER={:.4f}".format(result.der))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import concurrent.futures
+import functools
+import os
+
+import numpy as np
+
+from . import der
+
+
+class CorpusResult:
+    """Per-file and corpus-level Diarization Error Rate.
+
+    Attributes:
+        file_ids: a list of file ids, in the same order as the input pairs
+        errors: a 1-dim numpy array with the error length (miss, false alarm
+            and confusion) of each file
+        ref_lengths: a 1-dim numpy array with the reference length of each
+            file
+    """
+
+    def __init__(self, file_ids, errors, ref_lengths):
+        self.file_ids = list(file_ids)
+        self.errors = np.asarray(errors, dtype=np.float64)
+        self.ref_lengths = np.asarray(ref_lengths, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.file_ids)
+
+    def __repr__(self):
+        return "CorpusResult({} files, DER={:.4f})".format(len(self), self.der)
+
+    @property
+    def ders(self):
+        """A dict from file id to the Diarization Error Rate of that file."""
+        ders = np.divide(self.errors, self.ref_lengths,
+                         out=np.zeros_like(self.errors),
+                         where=self.ref_lengths != 0.0)
+        return dict(zip(self.file_ids, ders.tolist()))
+
+    @property
+    def der(self):
+        """The corpus DER: total error length over total reference length."""
+        ref_total_length = self.ref_lengths.sum()
+        if ref_total_length == 0.0:
+            return 0.0
+        return float(self.errors.sum() / ref_total_length)
+
+
+def _score_pair(pair, collar, validate):
+    """Compute (error_length, ref_total_length) for a (ref, hyp) pair."""
+    ref, hyp = pair
+    return der.compute_error_and_reference_length(
+        ref, hyp, collar=collar, validate=validate)
+
+
+def _map_files(score, file_ids, items, workers, chunksize):
+    """Score files, in worker processes if requested.
+
+    Args:
+        score: a picklable function from an item to a tuple
+            (error_length, ref_total_length)
+        file_ids: a list of file ids
+        items: a list with the item of each file id, passed to `score`
+        workers: number of worker processes; 1 scores all items in the
+            current process, and None uses all CPUs
+        chunksize: number of items sent to a worker process at a time; None
+            splits the items into about 4 chunks per worker
+
+    Returns:
+        a CorpusResult
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(items) <= 1:
+        results = [score(item) for item in items]
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(items) // (workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(score, items, chunksize=chunksize))
+    errors = [result[0] for result in results]
+    ref_lengths = [result[1] for result in results]
+    return CorpusResult(file_ids, errors, ref_lengths)
+
+
+def DER_corpus(pairs, collar=0.0, workers=1, chunksize=None, validate=True):
+    """Compute Diarization Error Rate for a corpus of files.
+
+    The corpus DER is the sum of error lengths over the sum of reference
+    lengths of all files, which is not the average of per-file DERs.
+
+    Args:
+        pairs: a dict from file id to a (ref, hyp) pair, or a sequence of
+            (ref, hyp) pairs, where `ref` and `hyp` are what `DER` accepts;
+            for a sequence, file ids are the positions in the sequence
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        workers: number of worker processes; 1 scores all files in the
+            current process, and None uses all CPUs
+        chunksize: number of files sent to a worker process at a time; by
+            default, files are split into about 4 chunks per worker
+        validate: if False, skip `check_input` on all inputs
+
+    Returns:
+        a CorpusResult
+    """
+    if isinstance(pairs, dict):
+        file_ids = list(pairs.keys())
+        pairs = list(pairs.values())
+    else:
+        pairs = list(pairs)
+        file_ids = list(range(len(pairs)))
+
+    score = functools.partial(_score_pair, collar=collar, validate=validate)
+    return _map_files(score, file_ids, pairs, workers, chunksize)
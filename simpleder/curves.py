@@ -0,0 +1,165 @@
+import numpy as np
+
+from . import der
+
+
+class DERCurve:
+    """Error and reference lengths of a recording over time windows.
+
+    Attributes:
+        starts: a 1-dim numpy array with the start time of each window
+        ends: a 1-dim numpy array with the end time of each window
+        errors: a 1-dim numpy array with the error length (miss, false alarm
+            and confusion) inside each window
+        ref_lengths: a 1-dim numpy array with the reference length inside
+            each window
+    """
+
+    def __init__(self, starts, ends, errors, ref_lengths):
+        self.starts = starts
+        self.ends = ends
+        self.errors = errors
+        self.ref_lengths = ref_lengths
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return "DERCurve({} windows)".format(len(self))
+
+    @property
+    def ders(self):
+        """A 1-dim numpy array with the DER of each window; 0.0 if a window
+        has no reference speech."""
+        return np.divide(self.errors, self.ref_lengths,
+                         out=np.zeros_like(self.errors),
+                         where=self.ref_lengths != 0.0)
+
+
+def _cumulative_lengths(prepared, hyp):
+    """Integrate the error and the reference length over time.
+
+    Speakers are mapped once for the whole recording. Then in every
+    elementary interval between adjacent boundaries, the error is
+    max(N_ref, N_hyp) minus the number of mapped speaker pairs that are both
+    active, and the reference length is N_ref; both are constant inside the
+    interval, so their integrals are piecewise linear in time.
+
+    Args:
+        prepared: a der.PreparedReference
+        hyp: the hypothesis, with the exclusions of `prepared` removed
+
+    Returns:
+        a tuple (boundaries, errors, ref_lengths) of 1-dim numpy arrays,
+            where errors[k] and ref_lengths[k] are the integrals up to
+            boundaries[k]
+    """
+    hyp_index = der.build_speaker_index(hyp)
+    hyp_codes = der._speaker_codes(hyp, hyp_index)
+    hyp_starts, hyp_ends = der._start_end_arrays(hyp)
+    ref_starts, ref_ends = prepared._starts, prepared._ends
+    ref_pos, hyp_pos, overlap = der._compute_pairwise_overlaps(
+        ref_starts, ref_ends, prepared._order,
+        hyp_starts, hyp_ends, np.argsort(hyp_starts, kind="stable"))
+    ref_codes = prepared._codes[ref_pos]
+    hyp_pair_codes = hyp_codes[hyp_pos]
+    cost_matrix = der._pair_cost_matrix(
+        ref_codes * len(hyp_index) + hyp_pair_codes, overlap,
+        (len(prepared.ref_index), len(hyp_index)))
+    rows, cols = der.compute_optimal_mapping(cost_matrix)
+    mapped_ref = np.full(len(hyp_index), -1, dtype=np.int64)
+    mapped_ref[cols] = rows
+
+    # The intersections of segment pairs of mapped speakers.
+    matched = ref_codes == mapped_ref[hyp_pair_codes]
+    matched_starts = np.maximum(ref_starts[ref_pos[matched]],
+                                hyp_starts[hyp_pos[matched]])
+    matched_ends = np.minimum(ref_ends[ref_pos[matched]],
+                              hyp_ends[hyp_pos[matched]])
+
+    boundaries = np.unique(
+        np.concatenate([prepared._points, hyp_starts, hyp_ends]))
+    points = boundaries[:-1]
+    ref_count = der.count_active_segments(points, ref_starts, ref_ends)
+    hyp_count = der.count_active_segments(points, hyp_starts, hyp_ends)
+    matched_count = der.count_active_segments(points, matched_starts,
+                                              matched_ends)
+    lengths = np.diff(boundaries)
+    errors = np.cumsum(
+        lengths * (np.maximum(ref_count, hyp_count) - matched_count))
+    ref_lengths = np.cumsum(lengths * ref_count)
+    return (boundaries, np.concatenate([[0.0], errors]),
+            np.concatenate([[0.0], ref_lengths]))
+
+
+def DER_curve(ref, hyp, window=60.0, step=None, edges=None, collar=0.0,
+              validate=True, uem=None):
+    """Compute error and reference length curves over time windows.
+
+    The speaker mapping is the optimal mapping of the whole recording, so
+    the errors of windows that tile the recording sum up to the error length
+    of `DER`. All windows are answered from one sweep over the elementary
+    intervals, by interpolating the cumulative error and reference length at
+    the window borders, so the cost hardly depends on the number of windows.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyp: a list of tuples for the diarization result hypothesis, same type
+            as `ref`
+        window: float, the length of each window in seconds
+        step: float, the distance between the starts of adjacent windows;
+            defaults to `window`, i.e. non-overlapping windows. Windows start
+            at multiples of `step` and cover all segments
+        edges: optional 1-dim sorted array of bin edges; if set, the windows
+            are the bins between adjacent edges, and `window` and `step` are
+            ignored
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyp`
+        uem: optional list of (start, end) tuples; if set, only these regions
+            are scored
+
+    Returns:
+        a DERCurve
+
+    Raises:
+        ValueError: if `window` or `step` is not positive, or if `edges` is
+            not sorted
+    """
+    if validate:
+        der.check_input(hyp)
+    prepared = der.PreparedReference(ref, collar=collar, validate=validate,
+                                     uem=uem)
+    der._check_time_kinds(prepared._time_kind, der._time_kind(hyp))
+    if len(prepared._ex_starts):
+        hyp = der._subtract_intervals(hyp, prepared._ex_starts,
+                                      prepared._ex_ends)
+    boundaries, errors, ref_lengths = _cumulative_lengths(prepared, hyp)
+
+    if edges is not None:
+        edges = np.asarray(edges, dtype=np.float64)
+        if np.any(np.diff(edges) < 0.0):
+            raise ValueError("edges must be sorted.")
+        starts, ends = edges[:-1], edges[1:]
+    else:
+        if step is None:
+            step = window
+        if not (window > 0.0 and step > 0.0):
+            raise ValueError("window and step must be positive.")
+        if len(boundaries):
+            first = np.floor(min(boundaries[0], 0.0) / step)
+            starts = step * np.arange(first, np.ceil(boundaries[-1] / step))
+        else:
+            starts = np.zeros(0)
+        ends = starts + window
+
+    if len(boundaries) < 2:
+        zeros = np.zeros(len(starts))
+        return DERCurve(starts, ends, zeros, zeros.copy())
+    return DERCurve(
+        starts, ends,
+        np.interp(ends, boundaries, errors) -
+        np.interp(starts, boundaries, errors),
+        np.interp(ends, boundaries, ref_lengths) -
+        np.interp(starts, boundaries, ref_lengths))
@@ -1,5 +1,34 @@
+import itertools
+import math
+import time
+
 import numpy as np
-from scipy import optimize
+
+from . import profiling
+from . import segments
+
+SegmentArray = segments.SegmentArray
+
+# The sparse cost matrix and assignment are used when there are at least
+# SPARSE_MIN_SIZE speaker pairs, of which at most a fraction
+# SPARSE_MAX_DENSITY overlap.
+SPARSE_MIN_SIZE = 250000
+SPARSE_MAX_DENSITY = 0.01
+
+# Assignments with at most this many speakers on both sides are solved by
+# brute force (at most 6 mappings) until SciPy is needed; beyond that,
+# linear_sum_assignment is much faster.
+BRUTE_FORCE_MAX_SPEAKERS = 3
+
+# scipy.optimize, once an assignment has needed it. The built-in solver only
+# saves the cold import of SciPy, so from then on dense assignments go to
+# linear_sum_assignment directly.
+_optimize = None
+
+
+# The segments of a speaker are checked for intersections in pure Python up
+# to this many segments, and with NumPy beyond.
+SMALL_CHECK_MAX_SEGMENTS = 64
 
 
 def check_input(hyp):
@@ -7,28 +36,119 @@ def check_input(hyp):
 
     Args:
         hyp: a list of tuples, where each tuple is (speaker, start, end)
-            of type (string, float, float)
+            of type (string, float, float); or a SegmentArray
 
     Raises:
         TypeError: if the type of `hyp` is incorrect
-        ValueError: if some tuple has start > end; or if two tuples intersect
+        ValueError: if some tuple has start > end, or a start or end that is
+            NaN or infinite; or if two tuples of the same speaker intersect
             with each other
     """
+    if isinstance(hyp, SegmentArray):
+        _check_segment_array(hyp)
+        return
     if not isinstance(hyp, list):
-        raise TypeError("Input must be a list.")
+        raise TypeError("Input must be a list or a SegmentArray.")
+    intervals = {}
     for element in hyp:
         if not isinstance(element, tuple):
             raise TypeError("Input must be a list of tuples.")
         if len(element) != 3:
             raise TypeError(
                 "Each tuple must have the elements: (speaker, start, end).")
-        if not isinstance(element[0], str):
+        speaker, start, end = element
+        if not isinstance(speaker, str):
             raise TypeError("Speaker must be a string.")
-        if not isinstance(element[1], float) or not isinstance(
-                element[2], float):
+        if not isinstance(start, float) or not isinstance(end, float):
             raise TypeError("Start and end must be float numbers.")
-        if element[1] > element[2]:
-            raise ValueError("Start must not be larger than end.")
+        if not -math.inf < start <= end < math.inf:
+            if start > end:
+                raise ValueError("Start must not be larger than end.")
+            raise ValueError("Start and end must be finite numbers.")
+        # Zero-length segments never intersect anything.
+        if start < end:
+            if speaker in intervals:
+                intervals[speaker].append((start, end))
+            else:
+                intervals[speaker] = [(start, end)]
+    for speaker_intervals in intervals.values():
+        _check_intervals(speaker_intervals)
+
+
+def _check_intervals(intervals):
+    """Check that (start, end) tuples of positive length do not intersect.
+
+    After sorting by start, two intervals intersect iff some interval starts
+    before the previous one ends.
+
+    Raises:
+        ValueError: if two of the intervals intersect
+    """
+    if len(intervals) < 2:
+        return
+    if len(intervals) > SMALL_CHECK_MAX_SEGMENTS:
+        starts, ends = zip(*intervals)
+        starts = np.fromiter(starts, dtype=np.float64, count=len(intervals))
+        ends = np.fromiter(ends, dtype=np.float64, count=len(intervals))
+        order = np.argsort(starts, kind="stable")
+        intersect = np.any(starts[order][1:] < ends[order][:-1])
+    else:
+        intersect = False
+        previous_end = -math.inf
+        for start, end in sorted(intervals):
+            if start < previous_end:
+                intersect = True
+                break
+            previous_end = end
+    if intersect:
+        raise ValueError(
+            "Two segments of the same speaker intersect with each other.")
+
+
+def _check_segment_array(hyp):
+    """Check whether a SegmentArray is valid, see `check_input`."""
+    if not (hyp.speakers.ndim == hyp.start.ndim == hyp.end.ndim == 1):
+        raise TypeError("Speakers, start and end must be 1-dim arrays.")
+    if not len(hyp.speakers) == len(hyp.start) == len(hyp.end):
+        raise TypeError("Speakers, start and end must have the same length.")
+    if not (hyp.start.dtype.kind == hyp.end.dtype.kind and
+            hyp.start.dtype.kind in "fi"):
+        raise TypeError(
+            "Start and end must both be float numbers or integer ticks.")
+    if not all(isinstance(label, str) for label in hyp.labels):
+        raise TypeError("Speaker must be a string.")
+    if len(hyp.speakers) and (hyp.speakers.min() < 0 or
+                              hyp.speakers.max() >= len(hyp.labels)):
+        raise ValueError("Speaker indices must be valid indices of labels.")
+    _check_times(hyp.speakers, hyp.start, hyp.end)
+
+
+def _check_times(codes, starts, ends):
+    """Check the times of all segments in bulk, see `check_input`.
+
+    Args:
+        codes: a 1-dim integer numpy array with the speaker of each segment
+        starts: a 1-dim numpy array of segment start times
+        ends: a 1-dim numpy array of segment end times
+
+    Raises:
+        ValueError: if the times are invalid
+    """
+    if not (np.all(np.isfinite(starts)) and np.all(np.isfinite(ends))):
+        raise ValueError("Start and end must be finite numbers.")
+    if np.any(starts > ends):
+        raise ValueError("Start must not be larger than end.")
+    # After sorting the segments of each speaker by start, two of them
+    # intersect iff some segment starts before the previous one ends.
+    # Zero-length segments never intersect anything.
+    positive = ends > starts
+    codes, starts, ends = codes[positive], starts[positive], ends[positive]
+    order = np.lexsort((starts, codes))
+    codes, starts, ends = codes[order], starts[order], ends[order]
+    intersect = (codes[1:] == codes[:-1]) & (starts[1:] < ends[:-1])
+    if np.any(intersect):
+        raise ValueError(
+            "Two segments of the same speaker intersect with each other.")
 
 
 def compute_total_length(hyp):
@@ -36,11 +156,13 @@ def compute_total_length(hyp):
 
     Args:
         hyp: a list of tuples, where each tuple is (speaker, start, end)
-            of type (string, float, float)
+            of type (string, float, float); or a SegmentArray
 
     Returns:
         a float number for the total length
     """
+    if isinstance(hyp, SegmentArray):
+        return float(np.sum(hyp.end - hyp.start))
     total_length = 0.0
     for element in hyp:
         total_length += element[2] - element[1]
@@ -62,6 +184,81 @@ def compute_intersection_length(A, B):
     return max(0.0, min_end - max_start)
 
 
+def _time_kind(hyp):
+    """Whether times are "ticks" or "seconds"; None for empty inputs."""
+    if not len(hyp):
+        return None
+    if isinstance(hyp, SegmentArray) and hyp.start.dtype.kind == "i":
+        return "ticks"
+    return "seconds"
+
+
+def _check_time_kinds(ref_kind, hyp_kind):
+    """Check that the reference and the hypothesis use the same time kind.
+
+    Args:
+        ref_kind: the `_time_kind` of the reference
+        hyp_kind: the `_time_kind` of the hypothesis
+
+    Raises:
+        TypeError: if one is in float seconds and the other in integer ticks
+    """
+    if ref_kind and hyp_kind and ref_kind != hyp_kind:
+        raise TypeError("Reference is in {} but hypothesis is in {}.".format(
+            ref_kind, hyp_kind))
+
+
+def _tick_value(value, dtype, name):
+    """Convert a collar or UEM time to integer ticks of `dtype`.
+
+    Raises:
+        ValueError: if `value` is not a whole number of ticks
+    """
+    if not float(value).is_integer():
+        raise ValueError("{} must be a whole number of ticks.".format(name))
+    return np.dtype(dtype).type(value)
+
+
+def _start_end_arrays(hyp):
+    """Extract the start and end times of a hypothesis/reference as arrays.
+
+    Args:
+        hyp: a list of tuples, where each tuple is (speaker, start, end)
+            of type (string, float, float); or a SegmentArray
+
+    Returns:
+        a tuple of two 1-dim float numpy arrays: (starts, ends)
+    """
+    if isinstance(hyp, SegmentArray):
+        return hyp.start, hyp.end
+    starts = np.fromiter((element[1] for element in hyp),
+                         dtype=np.float64, count=len(hyp))
+    ends = np.fromiter((element[2] for element in hyp),
+                       dtype=np.float64, count=len(hyp))
+    return starts, ends
+
+
+def count_active_segments(points, starts, ends):
+    """Count the segments that are active right after each time point.
+
+    This is an event-based sweep: every start is a +1 event and every end is
+    a -1 event, so the number of active segments right after `t` is the
+    number of starts <= t minus the number of ends <= t. Zero-length segments
+    contribute one event of each kind and are never counted.
+
+    Args:
+        points: a 1-dim numpy array of time points
+        starts: a 1-dim numpy array of segment start times
+        ends: a 1-dim numpy array of segment end times
+
+    Returns:
+        a 1-dim integer numpy array with the same length as `points`
+    """
+    started = np.searchsorted(np.sort(starts), points, side="right")
+    ended = np.searchsorted(np.sort(ends), points, side="right")
+    return started - ended
+
+
 def compute_load_length(ref, hyp):
     """Compute the load length (integrated maximum number of speakers).
 
@@ -79,38 +276,51 @@ def compute_load_length(ref, hyp):
 
     Args:
         ref: a list of tuples for the ground truth, where each tuple is
-            (speaker, start, end) of type (string, float, float)
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
         hyp: a list of tuples for the diarization result hypothesis, same type
             as `ref`
 
     Returns:
         a float number for the load length
     """
-    boundaries = set()
-    for element in ref + hyp:
-        boundaries.add(element[1])
-        boundaries.add(element[2])
-    boundaries = sorted(list(boundaries))
+    ref_starts, ref_ends = _start_end_arrays(ref)
+    hyp_starts, hyp_ends = _start_end_arrays(hyp)
+    return _compute_load_length(ref_starts, ref_ends, hyp_starts, hyp_ends)
 
-    load_length = 0.0
-    for i in range(len(boundaries) - 1):
-        start = boundaries[i]
-        end = boundaries[i + 1]
-        mid = (start + end) / 2.0
 
-        ref_count = 0
-        for element in ref:
-            if element[1] <= mid <= element[2]:
-                ref_count += 1
+def _sweep_counts(ref_starts, ref_ends, hyp_starts, hyp_ends):
+    """Count active reference/hypothesis segments in each elementary interval.
 
-        hyp_count = 0
-        for element in hyp:
-            if element[1] <= mid <= element[2]:
-                hyp_count += 1
+    Args:
+        ref_starts: a 1-dim numpy array of reference start times
+        ref_ends: a 1-dim numpy array of reference end times
+        hyp_starts: a 1-dim numpy array of hypothesis start times
+        hyp_ends: a 1-dim numpy array of hypothesis end times
 
-        load_length += (end - start) * max(ref_count, hyp_count)
+    Returns:
+        a tuple (lengths, ref_count, hyp_count) of 1-dim numpy arrays with one
+            element per elementary interval between adjacent boundaries
+    """
+    boundaries = np.unique(
+        np.concatenate([ref_starts, ref_ends, hyp_starts, hyp_ends]))
+    # Each elementary interval lies strictly between two adjacent boundaries,
+    # so a segment covers it iff the segment starts at or before the left
+    # boundary and has not ended by then.
+    ref_count = count_active_segments(boundaries[:-1], ref_starts, ref_ends)
+    hyp_count = count_active_segments(boundaries[:-1], hyp_starts, hyp_ends)
+    return np.diff(boundaries), ref_count, hyp_count
 
-    return load_length
+
+def _compute_load_length(ref_starts, ref_ends, hyp_starts, hyp_ends):
+    """Compute the load length from start and end arrays.
+
+    See `compute_load_length`.
+    """
+    lengths, ref_count, hyp_count = _sweep_counts(
+        ref_starts, ref_ends, hyp_starts, hyp_ends)
+    load_length = np.sum(lengths * np.maximum(ref_count, hyp_count))
+    return float(load_length)
 
 
 def build_speaker_index(hyp):
@@ -118,22 +328,110 @@ def build_speaker_index(hyp):
 
     Args:
         hyp: a list of tuples, where each tuple is (speaker, start, end)
-            of type (string, float, float)
+            of type (string, float, float); or a SegmentArray
 
     Returns:
         a dict from speaker to integer
     """
-    speaker_set = sorted({element[0] for element in hyp})
+    if isinstance(hyp, SegmentArray):
+        speaker_set = sorted(
+            hyp.labels[code] for code in np.unique(hyp.speakers).tolist())
+    else:
+        speaker_set = sorted({element[0] for element in hyp})
     index = {speaker: i for i, speaker in enumerate(speaker_set)}
     return index
 
 
+def _speaker_codes(hyp, index):
+    """Map the speaker of each segment to its index.
+
+    Args:
+        hyp: a list of tuples, where each tuple is (speaker, start, end)
+            of type (string, float, float); or a SegmentArray
+        index: a dict from speaker to integer, see `build_speaker_index`
+
+    Returns:
+        a 1-dim integer numpy array with one index per segment
+    """
+    if isinstance(hyp, SegmentArray):
+        lookup = np.array([index.get(label, -1) for label in hyp.labels],
+                          dtype=np.int64)
+        return lookup[hyp.speakers]
+    return np.fromiter((index[element[0]] for element in hyp),
+                       dtype=np.int64, count=len(hyp))
+
+
+def _expand_ranges(lows, highs):
+    """Expand per-row [low, high) ranges into flat (row, position) arrays."""
+    counts = np.maximum(highs - lows, 0)
+    rows = np.repeat(np.arange(len(lows)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(
+        np.cumsum(counts) - counts, counts)
+    return rows, np.repeat(lows, counts) + offsets
+
+
+def compute_pairwise_overlaps(a_starts, a_ends, b_starts, b_ends):
+    """Find all pairs of segments from `a` and `b` that overlap.
+
+    Two segments overlap iff one of them starts inside the other. After
+    sorting both sides by start time, the segments of `b` starting inside a
+    segment of `a` form a contiguous run that is located with
+    `np.searchsorted`, and vice versa. So the cost is
+    O((A + B) log(A + B) + P), where P is the number of overlapping pairs.
+
+    Args:
+        a_starts: a 1-dim numpy array of start times of `a`
+        a_ends: a 1-dim numpy array of end times of `a`
+        b_starts: a 1-dim numpy array of start times of `b`
+        b_ends: a 1-dim numpy array of end times of `b`
+
+    Returns:
+        a tuple (a_pos, b_pos, overlap) of 1-dim numpy arrays, where
+            `overlap[k]` is the positive intersection length between segment
+            `a_pos[k]` of `a` and segment `b_pos[k]` of `b`; pairs are sorted
+            by (a_pos, b_pos)
+    """
+    return _compute_pairwise_overlaps(
+        a_starts, a_ends, np.argsort(a_starts, kind="stable"),
+        b_starts, b_ends, np.argsort(b_starts, kind="stable"))
+
+
+def _compute_pairwise_overlaps(a_starts, a_ends, a_order,
+                               b_starts, b_ends, b_order):
+    """See `compute_pairwise_overlaps`; `a_order` and `b_order` are the
+    stable argsorts of `a_starts` and `b_starts`.
+    """
+    a_sorted_starts = a_starts[a_order]
+    b_sorted_starts = b_starts[b_order]
+
+    # Segments of `b` starting in [a_start, a_end).
+    a_rows, b_sorted_pos = _expand_ranges(
+        np.searchsorted(b_sorted_starts, a_starts, side="left"),
+        np.searchsorted(b_sorted_starts, a_ends, side="left"))
+    # Segments of `a` starting in (b_start, b_end).
+    b_rows, a_sorted_pos = _expand_ranges(
+        np.searchsorted(a_sorted_starts, b_starts, side="right"),
+        np.searchsorted(a_sorted_starts, b_ends, side="left"))
+
+    a_pos = np.concatenate([a_rows, a_order[a_sorted_pos]])
+    b_pos = np.concatenate([b_order[b_sorted_pos], b_rows])
+    order = np.argsort(a_pos * len(b_starts) + b_pos)
+    a_pos = a_pos[order]
+    b_pos = b_pos[order]
+
+    overlap = (np.minimum(a_ends[a_pos], b_ends[b_pos]) -
+               np.maximum(a_starts[a_pos], b_starts[b_pos]))
+    positive = overlap > 0.0
+    return a_pos[positive], b_pos[positive], overlap[positive]
+
+
 def build_cost_matrix(ref, hyp):
     """Build the cost matrix.
 
     Args:
         ref: a list of tuples for the ground truth, where each tuple is
-            (speaker, start, end) of type (string, float, float)
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
         hyp: a list of tuples for the diarization result hypothesis, same type
             as `ref`
 
@@ -143,122 +441,920 @@ def build_cost_matrix(ref, hyp):
     """
     ref_index = build_speaker_index(ref)
     hyp_index = build_speaker_index(hyp)
-    cost_matrix = np.zeros((len(ref_index), len(hyp_index)))
-    for ref_element in ref:
-        for hyp_element in hyp:
-            i = ref_index[ref_element[0]]
-            j = hyp_index[hyp_element[0]]
-            cost_matrix[i, j] += compute_intersection_length(
-                ref_element, hyp_element)
-    return cost_matrix
+    ref_codes = _speaker_codes(ref, ref_index)
+    hyp_codes = _speaker_codes(hyp, hyp_index)
+    ref_starts, ref_ends = _start_end_arrays(ref)
+    hyp_starts, hyp_ends = _start_end_arrays(hyp)
+
+    ref_pos, hyp_pos, overlap = compute_pairwise_overlaps(
+        ref_starts, ref_ends, hyp_starts, hyp_ends)
+    flat_index = ref_codes[ref_pos] * len(hyp_index) + hyp_codes[hyp_pos]
+    cost_matrix = np.bincount(
+        flat_index, weights=overlap,
+        minlength=len(ref_index) * len(hyp_index))
+    return cost_matrix.reshape((len(ref_index), len(hyp_index)))
+
+
+def _pair_cost_matrix(flat_index, overlap, shape, sparse_layout=None):
+    """Sum overlaps of segment pairs into a dense or sparse cost matrix.
+
+    Args:
+        flat_index: a 1-dim integer numpy array, the speaker pair
+            `i * shape[1] + j` of each overlapping segment pair
+        overlap: a 1-dim numpy array, the overlap of each segment pair
+        shape: (number of reference speakers, number of hypothesis speakers)
+        sparse_layout: True for a scipy.sparse matrix, False for a numpy
+            array, or None to choose from SPARSE_MIN_SIZE and
+            SPARSE_MAX_DENSITY
+
+    Returns:
+        a 2-dim numpy array or scipy.sparse CSR matrix, see
+            `build_cost_matrix`
+    """
+    size = shape[0] * shape[1]
+    if sparse_layout is False or (sparse_layout is None and
+                                  size < SPARSE_MIN_SIZE):
+        return np.bincount(flat_index, weights=overlap,
+                           minlength=size).reshape(shape)
+    keys, inverse = np.unique(flat_index, return_inverse=True)
+    if sparse_layout is None and len(keys) > SPARSE_MAX_DENSITY * size:
+        return np.bincount(flat_index, weights=overlap,
+                           minlength=size).reshape(shape)
+    weights = np.bincount(inverse.ravel(), weights=overlap,
+                          minlength=len(keys))
+    from scipy import sparse
+    return sparse.csr_matrix((weights, (keys // shape[1], keys % shape[1])),
+                             shape=shape)
+
+
+def _sparse_optimal_match_overlap(cost_matrix):
+    """Solve the assignment on the bipartite graph of overlapping speakers.
+
+    See `_sparse_optimal_mapping`.
+    """
+    return float(_sparse_optimal_mapping(cost_matrix)[2].sum())
+
+
+def _sparse_optimal_mapping(cost_matrix):
+    """Find an optimal mapping on the bipartite graph of overlapping speakers.
+
+    `min_weight_full_bipartite_matching` requires a matching that covers all
+    vertices, so the graph is padded with one dummy vertex per speaker: each
+    reference speaker `i` may be matched to its dummy at cost K, each
+    hypothesis speaker `j` likewise, and if `i` and `j` are matched to each
+    other at cost K - overlap, their two dummies are matched at cost K. With
+    K above every overlap, a minimum cost matching is a maximum overlap
+    mapping.
+
+    Returns:
+        a tuple (rows, cols, overlaps) of 1-dim numpy arrays, where reference
+            speaker `rows[k]` is mapped to hypothesis speaker `cols[k]` with
+            a positive overlap `overlaps[k]`
+    """
+    from scipy import sparse
+    from scipy.sparse import csgraph
+    cost_matrix = sparse.csr_matrix(cost_matrix)
+    cost_matrix.sum_duplicates()
+    cost_matrix = cost_matrix.tocoo()
+    num_ref, num_hyp = cost_matrix.shape
+    rows, cols, weights = cost_matrix.row, cost_matrix.col, cost_matrix.data
+    if not len(weights):
+        return (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                np.zeros(0))
+    big = weights.max() + 1.0
+    ref_range = np.arange(num_ref)
+    hyp_range = np.arange(num_hyp)
+    graph = sparse.csr_matrix(
+        (np.concatenate([big - weights,
+                         np.full(num_ref + num_hyp + len(weights), big)]),
+         (np.concatenate([rows, ref_range, num_ref + hyp_range,
+                          num_ref + cols]),
+          np.concatenate([cols, num_hyp + ref_range, hyp_range,
+                          num_hyp + rows]))),
+        shape=(num_ref + num_hyp, num_hyp + num_ref))
+    row_index, col_index = csgraph.min_weight_full_bipartite_matching(graph)
+    matched = (row_index < num_ref) & (col_index < num_hyp)
+    # Look up the matched overlaps; the entries are sorted by (row, col).
+    keys = rows.astype(np.int64) * num_hyp + cols
+    matched_keys = row_index[matched].astype(np.int64) * num_hyp + (
+        col_index[matched])
+    return (row_index[matched], col_index[matched],
+            weights[np.searchsorted(keys, matched_keys)])
+
+
+def _is_sparse(cost_matrix):
+    """Whether a cost matrix is a scipy.sparse matrix, without SciPy."""
+    return (not isinstance(cost_matrix, np.ndarray) and
+            hasattr(cost_matrix, "tocoo"))
+
+
+def _small_optimal_match_overlap(cost_matrix):
+    """Solve easy assignments without SciPy.
+
+    If the best partners of all speakers with any overlap on the smaller
+    side are distinct, mapping each to its best partner reaches the upper
+    bound of the total overlap. Otherwise, if there are at most
+    `BRUTE_FORCE_MAX_SPEAKERS` overlapping speakers on both sides, all
+    mappings are tried.
+
+    Args:
+        cost_matrix: a 2-dim non-negative numpy array, see
+            `compute_optimal_match_overlap`
+
+    Returns:
+        a float number for the maximum total overlap, or None if the
+            assignment is not easy
+    """
+    if not cost_matrix.size:
+        return 0.0
+    if cost_matrix.shape[0] > cost_matrix.shape[1]:
+        cost_matrix = cost_matrix.T
+    best = cost_matrix.argmax(axis=1)
+    best_overlap = cost_matrix[np.arange(len(best)), best]
+    best = best[best_overlap > 0.0].tolist()
+    if len(set(best)) == len(best):
+        return float(best_overlap.sum())
+    cost_matrix = cost_matrix[np.any(cost_matrix > 0.0, axis=1)]
+    cost_matrix = cost_matrix[:, np.any(cost_matrix > 0.0, axis=0)]
+    if cost_matrix.shape[0] > cost_matrix.shape[1]:
+        cost_matrix = cost_matrix.T
+    num_rows, num_cols = cost_matrix.shape
+    if num_cols > BRUTE_FORCE_MAX_SPEAKERS:
+        return None
+    # Each row of `mappings` assigns distinct columns to all rows.
+    mappings = np.array(
+        list(itertools.permutations(range(num_cols), num_rows)),
+        dtype=np.int64).reshape((-1, num_rows))
+    totals = cost_matrix[np.arange(num_rows), mappings].sum(axis=1)
+    return float(totals.max())
+
+
+def compute_optimal_match_overlap(cost_matrix):
+    """Compute the total overlap of the optimal speaker mapping.
+
+    Until SciPy is needed, easy cases are solved without importing it.
+
+    Args:
+        cost_matrix: a 2-dim non-negative numpy array, whose element (i, j)
+            is the overlap between `i`th reference speaker and `j`th
+            hypothesis speaker; or a scipy.sparse matrix with only the
+            overlapping speaker pairs
+
+    Returns:
+        a float number for the maximum total overlap of a one-to-one mapping
+            between reference and hypothesis speakers
+    """
+    if _is_sparse(cost_matrix):
+        return _sparse_optimal_match_overlap(cost_matrix)
+    if _optimize is None:
+        optimal_match_overlap = _small_optimal_match_overlap(cost_matrix)
+        if optimal_match_overlap is not None:
+            return optimal_match_overlap
+    row_index, col_index = _linear_sum_assignment(cost_matrix)
+    # Summing a few Python floats is faster than a NumPy reduction here.
+    return float(sum(cost_matrix[row_index, col_index].tolist()))
+
+
+def _linear_sum_assignment(cost_matrix):
+    """Maximize the total overlap with SciPy, importing it on first use."""
+    global _optimize
+    if _optimize is None:
+        from scipy import optimize
+        _optimize = optimize
+    return _optimize.linear_sum_assignment(cost_matrix, maximize=True)
+
+
+def compute_optimal_mapping(cost_matrix):
+    """Compute an optimal one-to-one mapping between speakers.
+
+    Args:
+        cost_matrix: a 2-dim non-negative numpy array or scipy.sparse
+            matrix, see `compute_optimal_match_overlap`
+
+    Returns:
+        a tuple (rows, cols) of 1-dim integer numpy arrays, where reference
+            speaker `rows[k]` is mapped to hypothesis speaker `cols[k]`;
+            pairs without overlap are left out, and the total overlap of the
+            pairs is `compute_optimal_match_overlap(cost_matrix)`
+    """
+    if _is_sparse(cost_matrix):
+        rows, cols, _ = _sparse_optimal_mapping(cost_matrix)
+        return rows, cols
+    rows, cols = _linear_sum_assignment(cost_matrix)
+    positive = cost_matrix[rows, cols] > 0.0
+    return rows[positive], cols[positive]
+
+
+def _speaker_durations(codes, starts, ends, num_speakers):
+    """Total length of the segments of each speaker."""
+    return np.bincount(codes, weights=ends - starts, minlength=num_speakers)
+
+
+def _jaccard_matrix(cost_matrix, ref_durations, hyp_durations):
+    """Divide the overlap of each speaker pair by the length of their union.
+
+    Args:
+        cost_matrix: a 2-dim numpy array or scipy.sparse matrix, see
+            `build_cost_matrix`
+        ref_durations: a 1-dim numpy array, the total length of each
+            reference speaker
+        hyp_durations: a 1-dim numpy array, the total length of each
+            hypothesis speaker
+
+    Returns:
+        a matrix of the same layout as `cost_matrix`, whose element (i, j) is
+            the Jaccard index between `i`th reference speaker and `j`th
+            hypothesis speaker
+    """
+    if _is_sparse(cost_matrix):
+        jaccard = cost_matrix.tocoo(copy=True)
+        jaccard.data = jaccard.data / (ref_durations[jaccard.row] +
+                                       hyp_durations[jaccard.col] -
+                                       jaccard.data)
+        return jaccard.tocsr()
+    union = (ref_durations[:, np.newaxis] + hyp_durations[np.newaxis, :] -
+             cost_matrix)
+    return np.divide(cost_matrix, union, out=np.zeros(cost_matrix.shape),
+                     where=union > 0.0)
+
+
+def compute_jaccard_error_rate(cost_matrix, ref_durations, hyp_durations):
+    """Compute Jaccard Error Rate from the overlaps of speaker pairs.
+
+    The Jaccard index of a reference speaker and a hypothesis speaker is the
+    length of their intersection over the length of their union. Speakers
+    are mapped one-to-one to maximize the total Jaccard index, and JER is
+    one minus the average Jaccard index of the mapped pairs over all
+    reference speakers; unmapped reference speakers count as 0. The
+    intersections are the elements of the DER cost matrix, so only the
+    durations and a second assignment are added.
+
+    Args:
+        cost_matrix: a 2-dim numpy array or scipy.sparse matrix, see
+            `build_cost_matrix`
+        ref_durations: a 1-dim numpy array, the total length of each
+            reference speaker
+        hyp_durations: a 1-dim numpy array, the total length of each
+            hypothesis speaker
+
+    Returns:
+        a float number for the Jaccard Error Rate, which is 0.0 if no
+            reference speaker has a positive length
+    """
+    num_ref = np.count_nonzero(ref_durations > 0.0)
+    if not num_ref:
+        return 0.0
+    jaccard = _jaccard_matrix(cost_matrix, ref_durations, hyp_durations)
+    return 1.0 - compute_optimal_match_overlap(jaccard) / float(num_ref)
+
+
+def _time_limits(dtype):
+    """The smallest and largest time of a dtype, for unbounded intervals."""
+    if np.dtype(dtype).kind == "i":
+        info = np.iinfo(dtype)
+        return info.min, info.max
+    return -np.inf, np.inf
+
+
+def _merged_exclusion_arrays(ref, collar):
+    """Compute merged exclusion intervals as (starts, ends) numpy arrays.
+
+    All exclusion intervals have the same length `2 * collar`, so sorting them
+    by start also sorts them by end, and an interval starts a new merged
+    interval iff it starts after the end of the previous one.
+    """
+    ref_starts, ref_ends = _start_end_arrays(ref)
+    points = np.sort(np.concatenate([ref_starts, ref_ends]))
+    if collar == 0.0 or not len(points):
+        return np.zeros(0, dtype=points.dtype), np.zeros(0, dtype=points.dtype)
+    if points.dtype.kind == "i":
+        # A float collar would turn the exclusions into float seconds.
+        collar = _tick_value(collar, points.dtype, "Collar")
+    starts = points - collar
+    ends = points + collar
+    is_first = np.concatenate([[True], starts[1:] > ends[:-1]])
+    is_last = np.concatenate([is_first[1:], [True]])
+    return starts[is_first], ends[is_last]
+
+
+def _merge_interval_arrays(starts, ends):
+    """Merge intervals given as arrays into sorted, disjoint intervals.
+
+    Intervals that overlap or touch are merged. An interval starts a new
+    merged interval iff it starts after the furthest end of all intervals
+    sorted before it.
+    """
+    if not len(starts):
+        return np.zeros(0, dtype=starts.dtype), np.zeros(0, dtype=ends.dtype)
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    ends = ends[order]
+    reach = np.maximum.accumulate(ends)
+    is_first = np.concatenate([[True], starts[1:] > reach[:-1]])
+    return starts[is_first], np.maximum.reduceat(ends,
+                                                 np.flatnonzero(is_first))
+
+
+def _check_uem(uem):
+    """Check whether UEM regions are valid.
+
+    Raises:
+        TypeError: if `uem` is not a list of (start, end) pairs
+        ValueError: if some region has start > end, or a NaN start or end
+    """
+    regions = np.asarray(uem, dtype=np.float64)
+    if regions.size and (regions.ndim != 2 or regions.shape[1] != 2):
+        raise TypeError("UEM must be a list of (start, end) tuples.")
+    regions = regions.reshape((-1, 2))
+    if np.isnan(regions).any():
+        raise ValueError("UEM start and end must not be NaN.")
+    if (regions[:, 0] > regions[:, 1]).any():
+        raise ValueError("UEM start must not be larger than end.")
+
+
+def _overlap_interval_arrays(ref):
+    """Compute the merged intervals where at least two reference speakers
+    are active, as (starts, ends) numpy arrays."""
+    ref_starts, ref_ends = _start_end_arrays(ref)
+    boundaries = np.unique(np.concatenate([ref_starts, ref_ends]))
+    ref_count = count_active_segments(boundaries[:-1], ref_starts, ref_ends)
+    overlapped = ref_count >= 2
+    return _merge_interval_arrays(boundaries[:-1][overlapped],
+                                  boundaries[1:][overlapped])
+
+
+def _exclusion_arrays(ref, collar, uem=None, skip_overlap=False):
+    """Compute the merged exclusion intervals of a collar and a UEM.
+
+    Everything outside of the UEM regions is excluded, as unbounded
+    intervals before the first region and after the last one, and the
+    complement is merged with the collar exclusions, and with the overlapped
+    reference speech if `skip_overlap` is True.
+
+    Args:
+        ref: a list of tuples for the ground truth; or a SegmentArray
+        collar: float, tolerance
+        uem: optional list of (start, end) tuples, the scored regions
+        skip_overlap: if True, also exclude the regions where at least two
+            reference speakers are active
+
+    Returns:
+        a tuple of two sorted 1-dim numpy arrays: (starts, ends)
+    """
+    starts, ends = _merged_exclusion_arrays(ref, collar)
+    if uem is None and not skip_overlap:
+        return starts, ends
+    starts, ends = [starts], [ends]
+    if uem is not None:
+        # With integer ticks, the UEM is in ticks too.
+        if starts[0].dtype.kind == "i":
+            dtype = np.int64
+            regions = np.array(
+                [_tick_value(time, dtype, "UEM time")
+                 for region in uem for time in region],
+                dtype=dtype).reshape((-1, 2))
+        else:
+            dtype = np.float64
+            regions = np.asarray(uem, dtype=dtype).reshape((-1, 2))
+        uem_starts, uem_ends = _merge_interval_arrays(regions[:, 0],
+                                                      regions[:, 1])
+        low, high = _time_limits(dtype)
+        starts += [np.array([low], dtype=dtype), uem_ends]
+        ends += [uem_starts, np.array([high], dtype=dtype)]
+    if skip_overlap:
+        overlap_starts, overlap_ends = _overlap_interval_arrays(ref)
+        starts.append(overlap_starts)
+        ends.append(overlap_ends)
+    return _merge_interval_arrays(np.concatenate(starts),
+                                  np.concatenate(ends))
 
 
 def compute_merged_exclusion_intervals(ref, collar):
     """Compute merged exclusion intervals based on reference boundaries.
 
     Args:
-        ref: a list of tuples for the ground truth
+        ref: a list of tuples for the ground truth; or a SegmentArray
         collar: float, tolerance
 
     Returns:
         a list of (start, end) tuples, sorted and merged
     """
-    if collar == 0.0:
-        return []
-
-    intervals = []
-    for element in ref:
-        start, end = element[1], element[2]
-        intervals.append((start - collar, start + collar))
-        intervals.append((end - collar, end + collar))
-
-    # Sort and merge
-    intervals.sort()
-    merged = []
-    if not intervals:
-        return []
-
-    curr_start, curr_end = intervals[0]
-    for next_start, next_end in intervals[1:]:
-        if next_start <= curr_end:
-            curr_end = max(curr_end, next_end)
-        else:
-            merged.append((curr_start, curr_end))
-            curr_start, curr_end = next_start, next_end
-    merged.append((curr_start, curr_end))
-    return merged
+    starts, ends = _merged_exclusion_arrays(ref, collar)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def _subtract_interval_arrays(starts, ends, ex_starts, ex_ends):
+    """Subtract exclusion intervals from segments given as arrays.
+
+    The exclusions split the time line into gaps, where gap `k` spans from
+    the end of exclusion `k - 1` to the start of exclusion `k`. The gaps that
+    a segment intersects form a contiguous run, which is located with
+    `np.searchsorted`, so all segments are cut in bulk.
+
+    Args:
+        starts: a 1-dim numpy array of segment start times
+        ends: a 1-dim numpy array of segment end times
+        ex_starts: a 1-dim sorted numpy array of exclusion start times
+        ex_ends: a 1-dim sorted numpy array of exclusion end times; the
+            exclusions must be merged
+
+    Returns:
+        a tuple (rows, new_starts, new_ends) of 1-dim numpy arrays, where
+            [new_starts[k], new_ends[k]] is a remaining part of segment
+            `rows[k]`, with positive length
+    """
+    dtype = np.result_type(starts, ex_starts)
+    low, high = _time_limits(dtype)
+    gap_starts = np.concatenate([np.array([low], dtype=dtype), ex_ends])
+    gap_ends = np.concatenate([ex_starts, np.array([high], dtype=dtype)])
+    rows, gaps = _expand_ranges(
+        np.searchsorted(ex_starts, starts, side="right"),
+        np.searchsorted(ex_ends, ends, side="left") + 1)
+    new_starts = np.maximum(starts[rows], gap_starts[gaps])
+    new_ends = np.minimum(ends[rows], gap_ends[gaps])
+    positive = new_ends > new_starts
+    return rows[positive], new_starts[positive], new_ends[positive]
+
+
+def _subtract_intervals(segments, ex_starts, ex_ends):
+    """Subtract exclusion intervals given as arrays, see `subtract_intervals`.
+    """
+    if not len(ex_starts):
+        return segments
+    starts, ends = _start_end_arrays(segments)
+    rows, new_starts, new_ends = _subtract_interval_arrays(
+        starts, ends, ex_starts, ex_ends)
+    if isinstance(segments, SegmentArray):
+        return SegmentArray(segments.speakers[rows], segments.labels,
+                            new_starts, new_ends)
+    return [(segments[row][0], start, end) for row, start, end in zip(
+        rows.tolist(), new_starts.tolist(), new_ends.tolist())]
 
 
 def subtract_intervals(segments, exclusions):
     """Subtract exclusion intervals from segments.
 
     Args:
-        segments: a list of (speaker, start, end)
+        segments: a list of (speaker, start, end); or a SegmentArray
         exclusions: a list of (start, end) tuples, sorted and merged
 
     Returns:
-        a list of (speaker, start, end) with exclusions removed
+        segments of the same type as `segments`, with exclusions removed
     """
-    if not exclusions:
-        return segments
+    exclusions = np.asarray(exclusions, dtype=np.float64).reshape((-1, 2))
+    return _subtract_intervals(segments, exclusions[:, 0], exclusions[:, 1])
 
-    new_segments = []
-    for speaker, start, end in segments:
-        # We need to intersect [start, end] with NOT exclusions
-        # Iterate through exclusions and cut [start, end]
-        current_time = start
-        for ex_start, ex_end in exclusions:
-            if ex_end <= current_time:
-                continue
-            if ex_start >= end:
-                break
 
-            # Now we have overlap between
-            # [current_time, end] and [ex_start, ex_end]
-            # The valid part is [current_time, ex_start] (if valid)
-            if ex_start > current_time:
-                new_segments.append((speaker, current_time, ex_start))
+class DERDetails:
+    """The components of Diarization Error Rate.
 
-            # Advance current_time to after exclusion
-            current_time = max(current_time, ex_end)
+    All lengths are in seconds. False alarm includes hypothesis speech in
+    excess of the number of reference speakers, i.e. what is sometimes called
+    "Overlap" in the strict form of DER.
 
-            if current_time >= end:
-                break
+    Attributes:
+        ref_length: total length of the reference
+        miss: integral of max(0, N_ref(t) - N_hyp(t))
+        false_alarm: integral of max(0, N_hyp(t) - N_ref(t))
+        confusion: integral of min(N_ref(t), N_hyp(t)), minus the total
+            overlap of the optimal speaker mapping
+        error_length: Load - Match, which equals
+            miss + false_alarm + confusion
+        jer: the Jaccard Error Rate if it was requested, otherwise None; see
+            `compute_jaccard_error_rate`
+    """
+
+    def __init__(self, ref_length, miss, false_alarm, confusion,
+                 error_length, jer=None):
+        self.ref_length = ref_length
+        self.miss = miss
+        self.false_alarm = false_alarm
+        self.confusion = confusion
+        self.error_length = error_length
+        self.jer = jer
+
+    def __repr__(self):
+        text = ("DERDetails(der={:.4f}, ref_length={:.3f}, miss={:.3f}, "
+                "false_alarm={:.3f}, confusion={:.3f}").format(
+                    self.der, self.ref_length, self.miss, self.false_alarm,
+                    self.confusion)
+        if self.jer is not None:
+            text += ", jer={:.4f}".format(self.jer)
+        return text + ")"
+
+    @property
+    def der(self):
+        """The Diarization Error Rate."""
+        if self.ref_length == 0.0:
+            return 0.0
+        return self.error_length / self.ref_length
+
+
+class PreparedReference:
+    """A reference with all reference-side work of DER done in advance.
+
+    Scoring many hypotheses against the same reference with `score` only
+    costs the hypothesis-side work, and gives exactly the same numbers as
+    `DER`.
+
+    Attributes:
+        collar: float, the collar that the reference was prepared for
+        skip_overlap: whether overlapped reference speech is not scored
+        ref_length: total length of the reference after removing the collar
+            and everything outside of the UEM
+        ref_index: a dict from reference speaker to integer
+    """
+
+    def __init__(self, ref, collar=0.0, validate=True, stats=None, uem=None,
+                 skip_overlap=False):
+        """Prepare a reference.
+
+        Args:
+            ref: a list of tuples for the ground truth, where each tuple is
+                (speaker, start, end) of type (string, float, float); or a
+                SegmentArray
+            collar: float, tolerance allowing for some mismatch in speaker
+                borders
+            validate: if False, skip `check_input` on `ref`
+            stats: optional DERStats, see `compute_der_details`
+            uem: optional list of (start, end) tuples; if set, only these
+                regions are scored
+            skip_overlap: if True, do not score the regions where at least
+                two reference speakers are active
+
+        Raises:
+            TypeError: if the type of `ref` or `uem` is incorrect
+            ValueError: if `ref` or `uem` is invalid, see `check_input`
+        """
+        if stats is not None:
+            tic = time.perf_counter()
+        if validate:
+            check_input(ref)
+            if uem is not None:
+                _check_uem(uem)
+            if stats is not None:
+                tic = profiling.record(stats, "check_input", tic,
+                                       ref_segments=len(ref))
+
+        self.collar = collar
+        self.skip_overlap = skip_overlap
+        self._time_kind = _time_kind(ref)
+        ref_segments = len(ref)
+        if collar > 0.0 or uem is not None or skip_overlap:
+            self._ex_starts, self._ex_ends = _exclusion_arrays(
+                ref, collar, uem, skip_overlap)
+            ref = _subtract_intervals(ref, self._ex_starts, self._ex_ends)
+        else:
+            self._ex_starts, self._ex_ends = np.zeros(0), np.zeros(0)
+        self.ref_length = compute_total_length(ref)
+        self.ref_index = build_speaker_index(ref)
+        self._codes = _speaker_codes(ref, self.ref_index)
+        self._starts, self._ends = _start_end_arrays(ref)
+        self._order = np.argsort(self._starts, kind="stable")
+        self._sorted_starts = np.sort(self._starts)
+        self._sorted_ends = np.sort(self._ends)
+        self._points = np.unique(np.concatenate([self._starts, self._ends]))
+        self._durations = _speaker_durations(
+            self._codes, self._starts, self._ends, len(self.ref_index))
+        if stats is not None:
+            profiling.record(stats, "prepare_reference", tic,
+                             ref_segments=ref_segments,
+                             exclusions=len(self._ex_starts),
+                             scored_ref_segments=len(self._starts),
+                             ref_speakers=len(self.ref_index))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __repr__(self):
+        return "PreparedReference({} segments, collar={})".format(
+            len(self), self.collar)
+
+    @property
+    def nbytes(self):
+        """Approximate memory used by the prepared arrays, in bytes."""
+        arrays = (self._ex_starts, self._ex_ends, self._codes, self._starts,
+                  self._ends, self._order, self._sorted_starts,
+                  self._sorted_ends, self._points, self._durations)
+        return sum(array.nbytes for array in arrays)
+
+    def build_cost_matrix(self, hyp, sparse_layout=False):
+        """Build the cost matrix against a hypothesis.
 
-        # If there is remaining time after all exclusions
-        if current_time < end:
-            new_segments.append((speaker, current_time, end))
+        Args:
+            hyp: a list of tuples for the diarization result hypothesis; or
+                a SegmentArray; the collar must already be removed
+            sparse_layout: True to return a scipy.sparse matrix, False for a
+                numpy array, or None to choose from the density of the
+                overlapping speaker pairs
 
-    return new_segments
+        Returns:
+            a 2-dim numpy array or scipy.sparse matrix, whose element (i, j)
+                is the overlap between `i`th reference speaker and `j`th
+                hypothesis speaker
+        """
+        return self._build_cost_matrix(hyp, sparse_layout)[0]
 
+    def _build_cost_matrix(self, hyp, sparse_layout):
+        """See `build_cost_matrix`; also return the hypothesis speaker codes
+        and the number of hypothesis speakers.
+        """
+        hyp_index = build_speaker_index(hyp)
+        hyp_codes = _speaker_codes(hyp, hyp_index)
+        hyp_starts, hyp_ends = _start_end_arrays(hyp)
+        ref_pos, hyp_pos, overlap = _compute_pairwise_overlaps(
+            self._starts, self._ends, self._order,
+            hyp_starts, hyp_ends, np.argsort(hyp_starts, kind="stable"))
+        flat_index = self._codes[ref_pos] * len(hyp_index) + hyp_codes[hyp_pos]
+        cost_matrix = _pair_cost_matrix(flat_index, overlap,
+                                        (len(self.ref_index), len(hyp_index)),
+                                        sparse_layout)
+        return cost_matrix, hyp_codes, len(hyp_index)
 
-def DER(ref, hyp, collar=0.0):
+    def _sweep_counts(self, hyp_starts, hyp_ends):
+        """See `_sweep_counts`."""
+        boundaries = np.unique(
+            np.concatenate([self._points, hyp_starts, hyp_ends]))
+        points = boundaries[:-1]
+        ref_count = (
+            np.searchsorted(self._sorted_starts, points, side="right") -
+            np.searchsorted(self._sorted_ends, points, side="right"))
+        hyp_count = count_active_segments(points, hyp_starts, hyp_ends)
+        return np.diff(boundaries), ref_count, hyp_count
+
+    def score(self, hyp, validate=True, stats=None, jer=False):
+        """Compute Diarization Error Rate and its components for a hypothesis.
+
+        Args:
+            hyp: a list of tuples for the diarization result hypothesis,
+                where each tuple is (speaker, start, end) of type
+                (string, float, float); or a SegmentArray
+            validate: if False, skip `check_input` on `hyp`
+            stats: optional DERStats, see `compute_der_details`
+            jer: if True, also compute the Jaccard Error Rate from the same
+                cost matrix
+
+        Returns:
+            a DERDetails
+
+        Raises:
+            TypeError: if `hyp` is invalid, or in float seconds while the
+                reference is in integer ticks, or vice versa
+        """
+        if stats is not None:
+            tic = time.perf_counter()
+        _check_time_kinds(self._time_kind, _time_kind(hyp))
+        if validate:
+            check_input(hyp)
+            if stats is not None:
+                tic = profiling.record(stats, "check_input", tic,
+                                       hyp_segments=len(hyp))
+
+        if len(self._ex_starts):
+            hyp_segments = len(hyp)
+            hyp = _subtract_intervals(hyp, self._ex_starts, self._ex_ends)
+            if stats is not None:
+                tic = profiling.record(stats, "collar", tic,
+                                       hyp_segments=hyp_segments,
+                                       exclusions=len(self._ex_starts),
+                                       scored_hyp_segments=len(hyp))
+
+        cost_matrix, hyp_codes, num_hyp_speakers = self._build_cost_matrix(
+            hyp, sparse_layout=None)
+        if stats is not None:
+            tic = profiling.record(stats, "build_cost_matrix", tic,
+                                   ref_segments=len(self),
+                                   hyp_segments=len(hyp),
+                                   ref_speakers=cost_matrix.shape[0],
+                                   hyp_speakers=cost_matrix.shape[1],
+                                   cost_matrix_shape=cost_matrix.shape,
+                                   sparse=_is_sparse(cost_matrix))
+        optimal_match_overlap = compute_optimal_match_overlap(cost_matrix)
+        if stats is not None:
+            tic = profiling.record(stats, "assignment", tic,
+                                   cost_matrix_shape=cost_matrix.shape,
+                                   sparse=_is_sparse(cost_matrix))
+        hyp_starts, hyp_ends = _start_end_arrays(hyp)
+        jaccard_error_rate = None
+        if jer:
+            jaccard_error_rate = compute_jaccard_error_rate(
+                cost_matrix, self._durations,
+                _speaker_durations(hyp_codes, hyp_starts, hyp_ends,
+                                   num_hyp_speakers))
+            if stats is not None:
+                tic = profiling.record(stats, "jer", tic,
+                                       cost_matrix_shape=cost_matrix.shape)
+        lengths, ref_count, hyp_count = self._sweep_counts(
+            hyp_starts, hyp_ends)
+        load_length = float(
+            np.sum(lengths * np.maximum(ref_count, hyp_count)))
+        miss = float(np.sum(lengths * np.maximum(ref_count - hyp_count, 0)))
+        false_alarm = float(
+            np.sum(lengths * np.maximum(hyp_count - ref_count, 0)))
+        confusion = float(np.sum(lengths * np.minimum(ref_count, hyp_count)) -
+                          optimal_match_overlap)
+        if stats is not None:
+            profiling.record(stats, "load", tic,
+                             ref_segments=len(self), hyp_segments=len(hyp),
+                             elementary_intervals=len(lengths))
+        return DERDetails(self.ref_length, miss, false_alarm, confusion,
+                          float(load_length - optimal_match_overlap),
+                          jaccard_error_rate)
+
+
+def compute_der_details(ref, hyp, collar=0.0, validate=True, stats=None,
+                        uem=None, jer=False, skip_overlap=False):
+    """Compute Diarization Error Rate and its components in a single pass.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyp: a list of tuples for the diarization result hypothesis, same type
+            as `ref`
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyp`; only use
+            this for inputs that have already been checked
+        stats: optional DERStats, which records the wall time and input sizes
+            of each stage
+        uem: optional list of (start, end) tuples; if set, only these regions
+            are scored
+        jer: if True, also compute the Jaccard Error Rate
+        skip_overlap: if True, do not score the regions where at least two
+            reference speakers are active
+
+    Returns:
+        a DERDetails
+    """
+    if stats is not None:
+        tic = time.perf_counter()
+    if validate:
+        check_input(ref)
+        check_input(hyp)
+        if uem is not None:
+            _check_uem(uem)
+        if stats is not None:
+            profiling.record(stats, "check_input", tic,
+                             ref_segments=len(ref), hyp_segments=len(hyp))
+    prepared = PreparedReference(ref, collar=collar, validate=False,
+                                 stats=stats, uem=uem,
+                                 skip_overlap=skip_overlap)
+    return prepared.score(hyp, validate=False, stats=stats, jer=jer)
+
+
+def compute_error_and_reference_length(ref, hyp, collar=0.0, validate=True,
+                                       stats=None, uem=None,
+                                       skip_overlap=False):
+    """Compute the numerator and denominator of Diarization Error Rate.
+
+    Unlike the ratio returned by `DER`, these two terms can be summed over
+    many files to compute a corpus-level DER.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyp: a list of tuples for the diarization result hypothesis, same type
+            as `ref`
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyp`; only use
+            this for inputs that have already been checked
+        stats: optional DERStats, see `compute_der_details`
+        uem: optional list of (start, end) tuples; if set, only these regions
+            are scored
+        skip_overlap: if True, do not score the regions where at least two
+            reference speakers are active
+
+    Returns:
+        a tuple of two float numbers: (error_length, ref_total_length), where
+            error_length is the total length of miss, false alarm and
+            confusion
+    """
+    details = compute_der_details(ref, hyp, collar=collar, validate=validate,
+                                  stats=stats, uem=uem,
+                                  skip_overlap=skip_overlap)
+    return details.error_length, details.ref_length
+
+
+def DER(ref, hyp, collar=0.0, validate=True, detailed=False, stats=None,
+        uem=None, skip_overlap=False):
     """Compute Diarization Error Rate.
 
     Args:
         ref: a list of tuples for the ground truth, where each tuple is
-            (speaker, start, end) of type (string, float, float)
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
         hyp: a list of tuples for the diarization result hypothesis, same type
             as `ref`
         collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyp`; this saves
+            time when the same inputs are scored many times, but the result
+            is undefined for invalid inputs
+        detailed: if True, return a DERDetails with the miss, false alarm and
+            confusion components instead of a float number
+        stats: optional DERStats, which records the wall time and input sizes
+            of each stage; None adds no overhead
+        uem: optional list of (start, end) tuples, e.g. from `rttm.read_uem`;
+            if set, only these regions are scored
+        skip_overlap: if True, do not score the regions where at least two
+            reference speakers are active; see `DER_and_skip_overlap` to
+            get both variants from one pass
 
     Returns:
-        a float number for the Diarization Error Rate
-    """
-    check_input(ref)
-    check_input(hyp)
-
-    if collar > 0.0:
-        exclusions = compute_merged_exclusion_intervals(ref, collar)
-        ref = subtract_intervals(ref, exclusions)
-        hyp = subtract_intervals(hyp, exclusions)
-
-    ref_total_length = compute_total_length(ref)
-    cost_matrix = build_cost_matrix(ref, hyp)
-    row_index, col_index = optimize.linear_sum_assignment(-cost_matrix)
-    optimal_match_overlap = cost_matrix[row_index, col_index].sum()
-    load_length = compute_load_length(ref, hyp)
-    if ref_total_length == 0.0:
-        return 0.0
-    der = (load_length - optimal_match_overlap) / ref_total_length
-    return der
+        a float number for the Diarization Error Rate, or a DERDetails if
+            `detailed` is True
+    """
+    details = compute_der_details(ref, hyp, collar=collar, validate=validate,
+                                  stats=stats, uem=uem,
+                                  skip_overlap=skip_overlap)
+    if detailed:
+        return details
+    return details.der
+
+
+def JER(ref, hyp, collar=0.0, validate=True, uem=None):
+    """Compute Jaccard Error Rate.
+
+    See `compute_jaccard_error_rate`. Collars and UEM regions are removed
+    from both inputs first, as in `DER`.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyp: a list of tuples for the diarization result hypothesis, same type
+            as `ref`
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyp`
+        uem: optional list of (start, end) tuples; if set, only these regions
+            are scored
+
+    Returns:
+        a float number for the Jaccard Error Rate
+    """
+    return compute_der_details(ref, hyp, collar=collar, validate=validate,
+                               uem=uem, jer=True).jer
+
+
+def DER_and_JER(ref, hyp, collar=0.0, validate=True, uem=None):
+    """Compute Diarization Error Rate and Jaccard Error Rate in one pass.
+
+    Both metrics share the validation, the collar, the speaker indexes and
+    the cost matrix; JER only adds the speaker durations and a second
+    assignment.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyp: a list of tuples for the diarization result hypothesis, same type
+            as `ref`
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyp`
+        uem: optional list of (start, end) tuples; if set, only these regions
+            are scored
+
+    Returns:
+        a tuple of two float numbers: (DER, JER)
+    """
+    details = compute_der_details(ref, hyp, collar=collar, validate=validate,
+                                  uem=uem, jer=True)
+    return details.der, details.jer
+
+
+def DER_multi(ref, hyps, collar=0.0, validate=True, detailed=False,
+              uem=None, skip_overlap=False):
+    """Compute Diarization Error Rate of many hypotheses against one reference.
+
+    The reference is validated and prepared once, see `PreparedReference`,
+    so each hypothesis only costs the hypothesis-side work. The results are
+    identical to separate `DER` calls.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyps: a list of hypotheses, each of the same type as `ref`; or a
+            dict from system name to hypothesis
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyps`
+        detailed: if True, return DERDetails instead of float numbers
+        uem: optional list of (start, end) tuples; if set, only these regions
+            are scored
+        skip_overlap: if True, do not score the regions where at least two
+            reference speakers are active
+
+    Returns:
+        a list with the Diarization Error Rate (or DERDetails) of each
+            hypothesis, or a dict from system name to it if `hyps` is a dict
+    """
+    prepared = PreparedReference(ref, collar=collar, validate=validate,
+                                 uem=uem, skip_overlap=skip_overlap)
+
+    def score(hyp):
+        details = prepared.score(hyp, validate=validate)
+        return details if detailed else details.der
+
+    if isinstance(hyps, dict):
+        return {name: score(hyp) for name, hyp in hyps.items()}
+    return [score(hyp) for hyp in hyps]
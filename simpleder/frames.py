@@ -0,0 +1,239 @@
+import time
+
+import numpy as np
+
+from . import der
+from . import profiling
+
+
+def _frame_range(starts, ends, resolution):
+    """Frames [first, last) whose centers lie in [start, end)."""
+    return (np.ceil(starts / resolution - 0.5).astype(np.int64),
+            np.ceil(ends / resolution - 0.5).astype(np.int64))
+
+
+# Number of set bits of each byte value.
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)],
+                     dtype=np.uint8)
+
+
+def _popcount(packed):
+    """Count the set bits along the last axis of a uint8 numpy array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(packed).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT[packed].sum(axis=-1, dtype=np.int64)
+
+
+def rasterize(codes, first, last, num_speakers, num_frames):
+    """Build bit-packed per-speaker activity from frame ranges.
+
+    Args:
+        codes: a 1-dim integer numpy array, the speaker index of each segment
+        first: a 1-dim integer numpy array, the first frame of each segment
+        last: a 1-dim integer numpy array, one past the last frame of each
+            segment; all frames must lie in [0, num_frames]
+        num_speakers: number of speakers
+        num_frames: number of frames
+
+    Returns:
+        a tuple (packed, counts), where `packed` is a 2-dim uint8 numpy array
+            of shape (num_speakers, ceil(num_frames / 8)) with the activity
+            of each speaker packed by `np.packbits`, and `counts` is a 1-dim
+            integer numpy array with the number of active speakers in each
+            frame
+    """
+    packed = np.zeros((num_speakers, (num_frames + 7) // 8), dtype=np.uint8)
+    counts = np.zeros(num_frames, dtype=np.int32)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(num_speakers + 1))
+    for code in range(num_speakers):
+        rows = order[bounds[code]:bounds[code + 1]]
+        delta = np.zeros(num_frames + 1, dtype=np.int32)
+        np.add.at(delta, first[rows], 1)
+        np.add.at(delta, last[rows], -1)
+        active = np.cumsum(delta[:-1]) > 0
+        packed[code] = np.packbits(active)
+        counts += active
+    return packed, counts
+
+
+def compute_der_details(ref, hyp, resolution, collar=0.0, validate=True,
+                        stats=None, uem=None, skip_overlap=False):
+    """Approximate Diarization Error Rate and its components on frames.
+
+    The reference and the hypothesis are rasterized into bit-packed
+    per-speaker activity over frames of `resolution` seconds, where a frame
+    is active for a speaker iff the center of the frame lies in one of its
+    segments. Each element of the cost matrix is then the number of set bits
+    of an AND of two activity rows, and the load a frame-wise maximum of the
+    numbers of active speakers. The cost grows with the number of frames
+    times the number of speakers, so this is usually much slower than the
+    exact `der.compute_der_details`; it is meant for comparing with
+    frame-based scoring, see also `DER_frames`.
+
+    Rasterizing moves every segment boundary by at most `resolution / 2`,
+    and moving one boundary by `d` changes both the load and the optimal
+    match overlap by at most `d`. So without a collar, compared to
+    `der.compute_der_details`:
+
+        |error_length - exact| <= 2 * resolution * (N_ref + N_hyp)
+        |ref_length - exact| <= resolution * N_ref
+
+    where N_ref and N_hyp are the numbers of reference and hypothesis
+    segments. With a collar, a UEM or `skip_overlap`, each merged exclusion
+    interval adds at most `resolution` times the maximum number of
+    simultaneously active speakers to both bounds.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyp: a list of tuples for the diarization result hypothesis, same type
+            as `ref`
+        resolution: float, the frame length in seconds
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyp`
+        stats: optional DERStats, which records the wall time and input sizes
+            of each stage
+        uem: optional list of (start, end) tuples; if set, only these regions
+            are scored
+        skip_overlap: if True, do not score the regions where at least two
+            reference speakers are active
+
+    Returns:
+        a DERDetails, with lengths that are multiples of `resolution`
+
+    Raises:
+        ValueError: if `resolution` is not positive
+    """
+    if not resolution > 0.0:
+        raise ValueError("resolution must be positive.")
+    tic = None
+    if stats is not None:
+        tic = time.perf_counter()
+    if validate:
+        der.check_input(ref)
+        der.check_input(hyp)
+        if uem is not None:
+            der._check_uem(uem)
+        if stats is not None:
+            tic = profiling.record(stats, "check_input", tic,
+                                   ref_segments=len(ref),
+                                   hyp_segments=len(hyp))
+
+    ref_index = der.build_speaker_index(ref)
+    hyp_index = der.build_speaker_index(hyp)
+    ref_first, ref_last = _frame_range(*der._start_end_arrays(ref),
+                                       resolution)
+    hyp_first, hyp_last = _frame_range(*der._start_end_arrays(hyp),
+                                       resolution)
+    frames = np.concatenate([ref_first, ref_last, hyp_first, hyp_last])
+    if not len(frames):
+        return der.DERDetails(0.0, 0.0, 0.0, 0.0, 0.0)
+    origin = frames.min()
+    num_frames = int(frames.max() - origin)
+    ref_packed, ref_count = rasterize(
+        der._speaker_codes(ref, ref_index), ref_first - origin,
+        ref_last - origin, len(ref_index), num_frames)
+    hyp_packed, hyp_count = rasterize(
+        der._speaker_codes(hyp, hyp_index), hyp_first - origin,
+        hyp_last - origin, len(hyp_index), num_frames)
+    if collar > 0.0 or uem is not None or skip_overlap:
+        # Clip unbounded exclusions to the frames before rasterizing them.
+        low = (origin - 1) * resolution
+        high = (origin + num_frames + 1) * resolution
+        ex_starts, ex_ends = der._exclusion_arrays(ref, collar, uem,
+                                                   skip_overlap)
+        ex_first, ex_last = _frame_range(np.clip(ex_starts, low, high),
+                                         np.clip(ex_ends, low, high),
+                                         resolution)
+        excluded_packed, excluded = rasterize(
+            np.zeros(len(ex_first), dtype=np.int64),
+            np.clip(ex_first - origin, 0, num_frames),
+            np.clip(ex_last - origin, 0, num_frames), 1, num_frames)
+        ref_packed &= ~excluded_packed
+        ref_count = ref_count * (excluded == 0)
+        hyp_count = hyp_count * (excluded == 0)
+    if stats is not None:
+        tic = profiling.record(stats, "rasterize", tic,
+                               ref_segments=len(ref), hyp_segments=len(hyp),
+                               frames=num_frames)
+
+    return _score_packed(ref_packed, ref_count, hyp_packed, hyp_count,
+                         resolution, stats, tic)
+
+
+def _score_packed(ref_packed, ref_count, hyp_packed, hyp_count, resolution,
+                  stats=None, tic=None):
+    """Compute DERDetails from bit-packed activity, see `rasterize`."""
+    cost_matrix = np.zeros((len(ref_packed), len(hyp_packed)))
+    for code in range(len(ref_packed)):
+        cost_matrix[code] = _popcount(ref_packed[code] & hyp_packed)
+    if stats is not None:
+        tic = profiling.record(stats, "build_cost_matrix", tic,
+                               ref_speakers=cost_matrix.shape[0],
+                               hyp_speakers=cost_matrix.shape[1],
+                               cost_matrix_shape=cost_matrix.shape)
+    optimal_match_frames = der.compute_optimal_match_overlap(cost_matrix)
+    if stats is not None:
+        tic = profiling.record(stats, "assignment", tic,
+                               cost_matrix_shape=cost_matrix.shape)
+
+    load_frames = np.maximum(ref_count, hyp_count).sum()
+    miss_frames = np.maximum(ref_count - hyp_count, 0).sum()
+    false_alarm_frames = np.maximum(hyp_count - ref_count, 0).sum()
+    confusion_frames = (np.minimum(ref_count, hyp_count).sum() -
+                        optimal_match_frames)
+    if stats is not None:
+        profiling.record(stats, "load", tic, frames=len(ref_count))
+    return der.DERDetails(float(ref_count.sum() * resolution),
+                          float(miss_frames * resolution),
+                          float(false_alarm_frames * resolution),
+                          float(confusion_frames * resolution),
+                          float((load_frames - optimal_match_frames) *
+                                resolution))
+
+
+def DER_frames(ref_activity, hyp_activity, resolution=0.01, scored=None,
+               detailed=False):
+    """Compute Diarization Error Rate of frame-level speaker activity.
+
+    This scores e.g. thresholded outputs of a diarization model directly,
+    without converting them to segments.
+
+    Args:
+        ref_activity: a 2-dim boolean numpy array of shape
+            (number of reference speakers, number of frames), where element
+            (i, t) is True iff `i`th reference speaker is active in frame `t`
+        hyp_activity: same as `ref_activity`, for the hypothesis speakers,
+            with the same number of frames
+        resolution: float, the frame length in seconds
+        scored: optional 1-dim boolean numpy array, which frames to score,
+            e.g. to exclude collars
+        detailed: if True, return a DERDetails instead of a float number
+
+    Returns:
+        a float number for the Diarization Error Rate, or a DERDetails if
+            `detailed` is True
+
+    Raises:
+        ValueError: if the shapes of the inputs do not match
+    """
+    ref_activity = np.asarray(ref_activity, dtype=bool)
+    hyp_activity = np.asarray(hyp_activity, dtype=bool)
+    if (ref_activity.ndim != 2 or hyp_activity.ndim != 2 or
+            ref_activity.shape[1] != hyp_activity.shape[1]):
+        raise ValueError("Activity must be 2-dim with the same frames.")
+    if scored is not None:
+        scored = np.asarray(scored, dtype=bool)
+        if scored.shape != (ref_activity.shape[1],):
+            raise ValueError("scored must have one element per frame.")
+        ref_activity = ref_activity & scored
+        hyp_activity = hyp_activity & scored
+    details = _score_packed(
+        np.packbits(ref_activity, axis=1), ref_activity.sum(axis=0),
+        np.packbits(hyp_activity, axis=1), hyp_activity.sum(axis=0),
+        resolution)
+    if detailed:
+        return details
+    return details.der
@@ -0,0 +1,199 @@
+import math
+
+import numpy as np
+
+from . import der
+
+
+class _SegmentBuffer:
+    """A growable columnar buffer of (speaker index, start, end) segments."""
+
+    def __init__(self, capacity=64):
+        self.codes = np.zeros(capacity, dtype=np.int64)
+        self.starts = np.zeros(capacity)
+        self.ends = np.zeros(capacity)
+        self.size = 0
+
+    def append(self, code, start, end):
+        if self.size == len(self.starts):
+            capacity = 2 * len(self.starts)
+            self.codes = np.resize(self.codes, capacity)
+            self.starts = np.resize(self.starts, capacity)
+            self.ends = np.resize(self.ends, capacity)
+        self.codes[self.size] = code
+        self.starts[self.size] = start
+        self.ends[self.size] = end
+        self.size += 1
+
+    def arrays(self):
+        """Return (codes, starts, ends) views of the buffered segments."""
+        return (self.codes[:self.size], self.starts[:self.size],
+                self.ends[:self.size])
+
+    def keep(self, mask):
+        """Only keep the segments where `mask` is True."""
+        size = int(mask.sum())
+        self.codes[:size] = self.codes[:self.size][mask]
+        self.starts[:size] = self.starts[:self.size][mask]
+        self.ends[:size] = self.ends[:self.size][mask]
+        self.size = size
+
+
+class OnlineDER:
+    """Diarization Error Rate computed incrementally as segments arrive.
+
+    The overlap cost matrix, the reference length and the finalized part of
+    the load are updated as each segment is added, so `current()` only needs
+    to solve the linear sum assignment and sweep the unfinalized segments.
+
+    If `horizon` is set, all segments must arrive in roughly chronological
+    order: once a segment starting at time `t` has been added, no segment
+    starting before `t - horizon` may be added. Segments ending before that
+    time are then finalized: their contribution to the load is accumulated
+    and they are dropped from memory.
+
+    Collars are not supported, because a new reference boundary would change
+    the scoring region of segments that were already added.
+    """
+
+    def __init__(self, horizon=None):
+        """Create an empty OnlineDER.
+
+        Args:
+            horizon: float, how far back in time from the latest segment start
+                new segments may still start; None to keep all segments
+        """
+        self.horizon = horizon
+        self._ref_index = {}
+        self._hyp_index = {}
+        self._ref = _SegmentBuffer()
+        self._hyp = _SegmentBuffer()
+        self._cost_matrix = np.zeros((0, 0))
+        self._ref_total_length = 0.0
+        self._finalized_load = 0.0
+        self._finalized_time = -np.inf
+        self._latest_start = -np.inf
+
+    def _speaker_code(self, index, speaker):
+        """Get the index of a speaker, adding it to the cost matrix if new."""
+        if speaker not in index:
+            index[speaker] = len(index)
+            self._cost_matrix = np.pad(
+                self._cost_matrix,
+                ((0, len(self._ref_index) - self._cost_matrix.shape[0]),
+                 (0, len(self._hyp_index) - self._cost_matrix.shape[1])))
+        return index[speaker]
+
+    def _check_segment(self, buffer, index, speaker, start, end):
+        """Check a new segment like `der.check_input` checks a list.
+
+        Finalized segments end before any new segment starts, so only the
+        buffered segments of the same speaker can intersect it.
+        """
+        if not isinstance(speaker, str):
+            raise TypeError("Speaker must be a string.")
+        if not isinstance(start, float) or not isinstance(end, float):
+            raise TypeError("Start and end must be float numbers.")
+        if not -math.inf < start <= end < math.inf:
+            if start > end:
+                raise ValueError("Start must not be larger than end.")
+            raise ValueError("Start and end must be finite numbers.")
+        if start < self._finalized_time:
+            raise ValueError(
+                "Segment starts at {}, before the finalized time {}.".format(
+                    start, self._finalized_time))
+        if start < end and speaker in index:
+            codes, starts, ends = buffer.arrays()
+            if np.any((codes == index[speaker]) & (starts < end) &
+                      (ends > start) & (ends > starts)):
+                raise ValueError("Two segments of the same speaker intersect "
+                                 "with each other.")
+        self._latest_start = max(self._latest_start, start)
+
+    def add_ref(self, speaker, start, end):
+        """Add a reference segment.
+
+        Args:
+            speaker: string, the speaker
+            start: float, start time of the segment
+            end: float, end time of the segment
+
+        Raises:
+            TypeError: if the type of the segment is incorrect
+            ValueError: if start > end, if the segment intersects another
+                reference segment of the same speaker, or if it starts in a
+                region that was already finalized
+        """
+        self._check_segment(self._ref, self._ref_index, speaker, start, end)
+        code = self._speaker_code(self._ref_index, speaker)
+        hyp_codes, hyp_starts, hyp_ends = self._hyp.arrays()
+        overlap = np.maximum(
+            np.minimum(end, hyp_ends) - np.maximum(start, hyp_starts), 0.0)
+        self._cost_matrix[code, :] += np.bincount(
+            hyp_codes, weights=overlap, minlength=len(self._hyp_index))
+        self._ref.append(code, start, end)
+        self._ref_total_length += end - start
+
+    def add_hyp(self, speaker, start, end):
+        """Add a hypothesis segment.
+
+        Args:
+            speaker: string, the speaker
+            start: float, start time of the segment
+            end: float, end time of the segment
+
+        Raises:
+            TypeError: if the type of the segment is incorrect
+            ValueError: if start > end, if the segment intersects another
+                hypothesis segment of the same speaker, or if it starts in a
+                region that was already finalized
+        """
+        self._check_segment(self._hyp, self._hyp_index, speaker, start, end)
+        code = self._speaker_code(self._hyp_index, speaker)
+        ref_codes, ref_starts, ref_ends = self._ref.arrays()
+        overlap = np.maximum(
+            np.minimum(end, ref_ends) - np.maximum(start, ref_starts), 0.0)
+        self._cost_matrix[:, code] += np.bincount(
+            ref_codes, weights=overlap, minlength=len(self._ref_index))
+        self._hyp.append(code, start, end)
+
+    def _load_length_after(self, time, until=np.inf):
+        """Load length of the buffered segments within [time, until]."""
+        _, ref_starts, ref_ends = self._ref.arrays()
+        _, hyp_starts, hyp_ends = self._hyp.arrays()
+        return der._compute_load_length(
+            np.clip(ref_starts, time, until), np.clip(ref_ends, time, until),
+            np.clip(hyp_starts, time, until), np.clip(hyp_ends, time, until))
+
+    def finalize(self):
+        """Finalize the region older than the horizon, and free its segments.
+
+        This is called by `current()`, but may also be called more often to
+        bound memory usage.
+        """
+        if self.horizon is None:
+            return
+        cutoff = self._latest_start - self.horizon
+        if cutoff <= self._finalized_time:
+            return
+        self._finalized_load += self._load_length_after(
+            self._finalized_time, cutoff)
+        self._finalized_time = cutoff
+        self._ref.keep(self._ref.arrays()[2] > cutoff)
+        self._hyp.keep(self._hyp.arrays()[2] > cutoff)
+
+    def current(self):
+        """Compute the Diarization Error Rate of all segments added so far.
+
+        Returns:
+            a float number for the Diarization Error Rate
+        """
+        self.finalize()
+        optimal_match_overlap = der.compute_optimal_match_overlap(
+            self._cost_matrix)
+        load_length = self._finalized_load + self._load_length_after(
+            self._finalized_time)
+        if self._ref_total_length == 0.0:
+            return 0.0
+        return float((load_length - optimal_match_overlap) /
+                     self._ref_total_length)
@@ -0,0 +1,77 @@
+import collections
+import time
+
+
+class DERStats:
+    """Collects the wall time and input sizes of each stage of DER.
+
+    Pass an instance as the `stats` argument of `DER` to record one entry per
+    stage of every call. Stages are, in order: "check_input" (only if
+    validating), "prepare_reference", "collar" (only with a positive collar),
+    "build_cost_matrix", "assignment" and "load".
+
+    Attributes:
+        records: a list of (stage, seconds, info) tuples in the order they
+            were recorded, where info is a dict of sizes such as
+            "ref_segments", "hyp_segments", "exclusions",
+            "elementary_intervals" and "cost_matrix_shape"
+    """
+
+    def __init__(self, callback=None):
+        """Create an empty collector.
+
+        Args:
+            callback: optional function called as callback(stage, seconds,
+                info) for every record, e.g. to forward it to a metrics
+                system
+        """
+        self.callback = callback
+        self.records = []
+
+    def __repr__(self):
+        return "DERStats({} records)".format(len(self.records))
+
+    def record(self, stage, seconds, info):
+        """Record one stage.
+
+        Args:
+            stage: string, the name of the stage
+            seconds: float, the wall time of the stage
+            info: a dict of sizes of the stage inputs and outputs
+        """
+        self.records.append((stage, seconds, info))
+        if self.callback is not None:
+            self.callback(stage, seconds, info)
+
+    def seconds(self):
+        """Total wall time per stage, over all recorded calls.
+
+        Returns:
+            an ordered dict from stage to float seconds
+        """
+        totals = collections.OrderedDict()
+        for stage, seconds, _ in self.records:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+    def clear(self):
+        """Remove all records."""
+        self.records = []
+
+
+def record(stats, stage, tic, **info):
+    """Record the stage that started at `tic`, and return a new tic.
+
+    Args:
+        stats: a DERStats, or any object with a `record(stage, seconds, info)`
+            method
+        stage: string, the name of the stage
+        tic: float, the `time.perf_counter()` value at the stage start
+        **info: sizes of the stage inputs and outputs
+
+    Returns:
+        float, the current `time.perf_counter()` value
+    """
+    seconds = time.perf_counter() - tic
+    stats.record(stage, seconds, info)
+    return time.perf_counter()
@@ -0,0 +1,150 @@
+import contextlib
+
+from . import segments
+
+
+@contextlib.contextmanager
+def _open_text(path_or_file):
+    """Open a path for reading, or pass through an already open file."""
+    if hasattr(path_or_file, "read"):
+        yield path_or_file
+    else:
+        with open(path_or_file, "r") as file_object:
+            yield file_object
+
+
+def _build_segments(speakers, starts, ends, as_arrays):
+    """Build the segments of one file from its columns."""
+    if as_arrays:
+        return segments.SegmentArray.from_arrays(speakers, starts, ends)
+    return list(zip(speakers, starts, ends))
+
+
+def iter_rttm(path_or_file, as_arrays=False):
+    """Read an RTTM file and yield the segments of one file at a time.
+
+    Only `SPEAKER` lines are used. The file is streamed, so at most one file
+    worth of segments is held in memory. This requires that all lines of the
+    same file are contiguous, which is the case for RTTM files written per
+    file and then concatenated.
+
+    Args:
+        path_or_file: path to an RTTM file, or an open text file
+        as_arrays: if True, yield segments as a SegmentArray instead of a list
+            of tuples
+
+    Yields:
+        (file_id, segments) pairs, where segments is a list of tuples
+            (speaker, start, end) of type (string, float, float), or a
+            SegmentArray
+
+    Raises:
+        ValueError: if a line is malformed, or if the lines of a file are not
+            contiguous
+    """
+    seen_file_ids = set()
+    current_file_id = None
+    speakers, starts, ends = [], [], []
+    with _open_text(path_or_file) as file_object:
+        for line_number, line in enumerate(file_object, start=1):
+            fields = line.split()
+            if not fields or fields[0] != "SPEAKER":
+                continue
+            if len(fields) < 8:
+                raise ValueError(
+                    "Malformed RTTM line {}: {}".format(line_number, line))
+            file_id = fields[1]
+            if file_id != current_file_id:
+                if current_file_id is not None:
+                    yield current_file_id, _build_segments(
+                        speakers, starts, ends, as_arrays)
+                if file_id in seen_file_ids:
+                    raise ValueError(
+                        "RTTM lines of file {} are not contiguous.".format(
+                            file_id))
+                seen_file_ids.add(file_id)
+                current_file_id = file_id
+                speakers, starts, ends = [], [], []
+            start = float(fields[3])
+            speakers.append(fields[7])
+            starts.append(start)
+            ends.append(start + float(fields[4]))
+    if current_file_id is not None:
+        yield current_file_id, _build_segments(
+            speakers, starts, ends, as_arrays)
+
+
+def read_uem(path_or_file):
+    """Read a UEM file.
+
+    Each line of a UEM file is: `file_id channel start end`.
+
+    Args:
+        path_or_file: path to a UEM file, or an open text file
+
+    Returns:
+        a dict from file id to a list of (start, end) tuples of type
+            (float, float)
+    """
+    uem = {}
+    with _open_text(path_or_file) as file_object:
+        for line_number, line in enumerate(file_object, start=1):
+            fields = line.split()
+            if not fields or fields[0].startswith(";;"):
+                continue
+            if len(fields) != 4:
+                raise ValueError(
+                    "Malformed UEM line {}: {}".format(line_number, line))
+            uem.setdefault(fields[0], []).append(
+                (float(fields[2]), float(fields[3])))
+    return uem
+
+
+def iter_rttm_pairs(ref_path_or_file, hyp_path_or_file, as_arrays=False):
+    """Read a reference and a hypothesis RTTM file and pair them by file.
+
+    Both files are streamed. A file is yielded as soon as both sides of it
+    have been read, so when both RTTM files list files in the same order,
+    only one file worth of segments is held in memory. Files missing from the
+    hypothesis are yielded with an empty hypothesis, and files missing from
+    the reference are skipped.
+
+    Args:
+        ref_path_or_file: path to the reference RTTM file, or an open file
+        hyp_path_or_file: path to the hypothesis RTTM file, or an open file
+        as_arrays: if True, yield segments as SegmentArray
+
+    Yields:
+        (file_id, ref, hyp) tuples
+    """
+    pending_refs = {}
+    pending_hyps = {}
+    ref_iterator = iter_rttm(ref_path_or_file, as_arrays=as_arrays)
+    hyp_iterator = iter_rttm(hyp_path_or_file, as_arrays=as_arrays)
+    ref_done = False
+    hyp_done = False
+    while not (ref_done and hyp_done):
+        if not ref_done:
+            try:
+                file_id, ref = next(ref_iterator)
+            except StopIteration:
+                ref_done = True
+            else:
+                if file_id in pending_hyps:
+                    yield file_id, ref, pending_hyps.pop(file_id)
+                elif hyp_done:
+                    yield file_id, ref, _build_segments([], [], [], as_arrays)
+                else:
+                    pending_refs[file_id] = ref
+        if not hyp_done:
+            try:
+                file_id, hyp = next(hyp_iterator)
+            except StopIteration:
+                hyp_done = True
+            else:
+                if file_id in pending_refs:
+                    yield file_id, pending_refs.pop(file_id), hyp
+                elif not ref_done:
+                    pending_hyps[file_id] = hyp
+    for file_id, ref in pending_refs.items():
+        yield file_id, ref, _build_segments([], [], [], as_arrays)
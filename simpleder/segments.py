@@ -0,0 +1,140 @@
+import numpy as np
+
+# Ticks per second of `SegmentArray.to_ticks`, i.e. microseconds.
+DEFAULT_TICK_RATE = 1000000
+
+
+def _time_column(values):
+    """Convert a time column to float64, or keep integer numpy arrays."""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "i":
+        return np.ascontiguousarray(values)
+    if isinstance(values, np.ndarray) and values.dtype.kind == "u":
+        return np.ascontiguousarray(values, dtype=np.int64)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+class SegmentArray:
+    """A columnar representation of a hypothesis/reference.
+
+    Instead of a list of (speaker, start, end) tuples, the segments are stored
+    as contiguous numpy arrays, and speakers are stored as integer codes into
+    a vocabulary of speaker labels.
+
+    Times are float64 seconds, unless `start` and `end` are given as integer
+    numpy arrays: then they are integer ticks, e.g. microseconds or audio
+    samples, and are kept as int32 or int64. With integer ticks, all
+    boundaries are compared, sorted and summed exactly; collars, UEM regions
+    and all returned lengths are in ticks too.
+
+    Attributes:
+        speakers: a 1-dim integer numpy array, where `speakers[k]` is the index
+            of the speaker of the `k`th segment in `labels`
+        labels: a tuple of speaker labels of type string
+        start: a 1-dim float64 or integer numpy array of segment start times
+        end: a 1-dim numpy array of segment end times, of the same type as
+            `start`
+    """
+
+    def __init__(self, speakers, labels, start, end):
+        self.speakers = np.ascontiguousarray(speakers, dtype=np.int32)
+        self.labels = tuple(labels)
+        self.start = _time_column(start)
+        self.end = _time_column(end)
+
+    @classmethod
+    def from_tuples(cls, hyp):
+        """Build a SegmentArray from a list of tuples.
+
+        Args:
+            hyp: a list of tuples, where each tuple is (speaker, start, end)
+                of type (string, float, float)
+
+        Returns:
+            a SegmentArray
+        """
+        speakers = np.array([element[0] for element in hyp], dtype=object)
+        start = np.fromiter((element[1] for element in hyp),
+                            dtype=np.float64, count=len(hyp))
+        end = np.fromiter((element[2] for element in hyp),
+                          dtype=np.float64, count=len(hyp))
+        return cls.from_arrays(speakers, start, end)
+
+    @classmethod
+    def from_arrays(cls, speakers, start, end, labels=None):
+        """Build a SegmentArray from columns.
+
+        Any array-like columns are accepted, e.g. numpy arrays or pandas
+        Series.
+
+        Args:
+            speakers: the speaker of each segment; these are speaker labels of
+                type string if `labels` is None, otherwise integer indices
+                into `labels`
+            start: the start time of each segment
+            end: the end time of each segment
+            labels: an optional sequence of speaker labels
+
+        Returns:
+            a SegmentArray
+        """
+        if labels is None:
+            labels, speakers = np.unique(
+                np.asarray(speakers, dtype=object), return_inverse=True)
+        return cls(np.asarray(speakers).reshape(-1), labels, start, end)
+
+    @classmethod
+    def from_dataframe(cls, data_frame, speaker="speaker", start="start",
+                       end="end"):
+        """Build a SegmentArray from a pandas DataFrame.
+
+        Args:
+            data_frame: a pandas DataFrame, or any mapping from column names
+                to array-like columns
+            speaker: name of the speaker label column
+            start: name of the start time column
+            end: name of the end time column
+
+        Returns:
+            a SegmentArray
+        """
+        return cls.from_arrays(np.asarray(data_frame[speaker]),
+                               np.asarray(data_frame[start]),
+                               np.asarray(data_frame[end]))
+
+    def __len__(self):
+        return len(self.start)
+
+    def __repr__(self):
+        return "SegmentArray({} segments, {} labels)".format(
+            len(self), len(self.labels))
+
+    def take(self, indices):
+        """Select a subset of the segments.
+
+        Args:
+            indices: an integer index array or a boolean mask
+
+        Returns:
+            a SegmentArray sharing the label vocabulary with this one
+        """
+        return SegmentArray(self.speakers[indices], self.labels,
+                            self.start[indices], self.end[indices])
+
+    def to_ticks(self, rate=DEFAULT_TICK_RATE):
+        """Convert times in seconds to integer ticks.
+
+        Args:
+            rate: the number of ticks per second, e.g. 1000000 for
+                microseconds, or the sample rate of the audio
+
+        Returns:
+            a SegmentArray with int64 times, rounded to the nearest tick
+        """
+        return SegmentArray(self.speakers, self.labels,
+                            np.rint(self.start * rate).astype(np.int64),
+                            np.rint(self.end * rate).astype(np.int64))
+
+    def to_tuples(self):
+        """Convert to a list of (speaker, start, end) tuples."""
+        return [(self.labels[code], start, end) for code, start, end in zip(
+            self.speakers.tolist(), self.start.tolist(), self.end.tolist())]
@@ -0,0 +1,406 @@
+"""A local scoring server that keeps prepared references warm.
+
+Run it with:
+
+    python3 -m simpleder.server --socket /tmp/simpleder.sock
+
+and score through `ScoringClient`, which falls back to in-process scoring if
+the server is not running.
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import socket
+import sys
+import threading
+
+from . import cache
+from . import corpus
+from . import der
+from . import rttm
+from . import segments
+
+DEFAULT_SOCKET = "/tmp/simpleder.sock"
+
+# Requests are single JSON lines, so the line limit of the stream reader
+# bounds the size of a request.
+MAX_REQUEST_BYTES = 1024 * 1024 * 1024
+
+
+class ReferenceNotCached(KeyError):
+    """The server has no prepared reference for the `ref_key` of a request
+    that did not include the reference."""
+
+
+# Exceptions that are sent back to the client and raised there again; others
+# are raised as RuntimeError.
+_ERRORS = {"TypeError": TypeError, "ValueError": ValueError,
+           "KeyError": KeyError, "FileNotFoundError": FileNotFoundError,
+           "ReferenceNotCached": ReferenceNotCached}
+
+
+def _to_tuples(hyp):
+    """Convert segments to a JSON-serializable list."""
+    if isinstance(hyp, segments.SegmentArray):
+        return hyp.to_tuples()
+    return [tuple(element) for element in hyp]
+
+
+def _from_json(hyp):
+    """Convert segments received as JSON to a list of tuples."""
+    if not isinstance(hyp, list):
+        raise TypeError("Segments must be a list.")
+    return [tuple(element) for element in hyp]
+
+
+def _error_response(error):
+    return {"error": type(error).__name__, "message": str(error)}
+
+
+def _corpus_response(result):
+    return {"der": result.der, "ders": result.ders}
+
+
+class ScoringServer:
+    """An asyncio server that scores DER requests over a Unix socket.
+
+    Requests and responses are newline-delimited JSON objects. Requests are
+    scored concurrently in a thread pool; prepared references and parsed
+    reference RTTM files are kept in LRU caches, so repeated requests
+    against the same references only cost the hypothesis-side work. A
+    request with a cached `ref_key` may omit the reference.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, workers=None,
+                 max_bytes=256 * 1024 * 1024, max_corpora=8,
+                 max_request_bytes=MAX_REQUEST_BYTES):
+        """Create a server.
+
+        Args:
+            path: path of the Unix socket
+            workers: number of scoring threads; None uses all CPUs
+            max_bytes: memory budget of the prepared reference cache, see
+                `ReferenceCache`
+            max_corpora: number of parsed reference RTTM files to keep
+            max_request_bytes: the maximum size of one request
+        """
+        self.path = path
+        self.max_corpora = max_corpora
+        self.max_request_bytes = max_request_bytes
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            workers or os.cpu_count() or 1)
+        self._references = cache.ReferenceCache(max_bytes=max_bytes)
+        self._corpora = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._server = None
+
+    async def start(self):
+        """Start listening on the Unix socket."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=self.path, limit=self.max_request_bytes)
+
+    async def serve_forever(self):
+        """Start the server if needed, and serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        """Stop the server and the scoring threads."""
+        if self._server is not None:
+            self._server.close()
+        self._executor.shutdown(wait=False)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def _handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError as error:
+                    # The request is larger than `max_request_bytes`; the
+                    # rest of it cannot be told apart from the next request.
+                    await self._respond(writer, _error_response(error))
+                    break
+                if not line:
+                    break
+                try:
+                    result = await loop.run_in_executor(
+                        self._executor, self._dispatch, json.loads(line))
+                    response = {"result": result}
+                except Exception as error:
+                    response = _error_response(error)
+                await self._respond(writer, response)
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, response):
+        writer.write(json.dumps(response).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    def _dispatch(self, request):
+        """Run one request in a scoring thread."""
+        method = request.get("method")
+        if method == "ping":
+            return "pong"
+        if method == "der":
+            return self._score(request)
+        if method == "der_rttm":
+            return self._score_rttm(request)
+        raise ValueError("Unknown method: {}".format(method))
+
+    def _prepare(self, key, ref, collar):
+        """Get a prepared reference, from the cache if `key` is set.
+
+        The lock is only held to look up and insert, so references are
+        prepared concurrently; `ref` may be a function that returns the
+        reference, called only if it is not cached.
+        """
+        if key is not None:
+            with self._lock:
+                prepared = self._references.lookup(key, collar=collar)
+            if prepared is not None:
+                return prepared
+        if callable(ref):
+            ref = ref()
+        prepared = der.PreparedReference(ref, collar=collar)
+        if key is not None:
+            with self._lock:
+                prepared = self._references.insert(key, prepared,
+                                                   collar=collar)
+        return prepared
+
+    def _score(self, request):
+        collar = float(request.get("collar", 0.0))
+        ref_key = request.get("ref_key")
+        if ref_key is not None:
+            # JSON turns tuples into lists, which are not hashable.
+            ref_key = ("ref", json.dumps(ref_key))
+
+        def ref():
+            if "ref" not in request:
+                raise ReferenceNotCached(
+                    "The request has no reference, and none is cached for "
+                    "ref_key {}.".format(request.get("ref_key")))
+            return _from_json(request["ref"])
+
+        prepared = self._prepare(ref_key, ref, collar)
+        details = prepared.score(_from_json(request["hyp"]))
+        if request.get("detailed"):
+            return {"der": details.der, "ref_length": details.ref_length,
+                    "miss": details.miss,
+                    "false_alarm": details.false_alarm,
+                    "confusion": details.confusion,
+                    "error_length": details.error_length}
+        return details.der
+
+    def _reference_corpus(self, path):
+        """Parse a reference RTTM file, or get it from the cache."""
+        status = os.stat(path)
+        key = (os.path.abspath(path), status.st_mtime_ns, status.st_size)
+        with self._lock:
+            if key in self._corpora:
+                self._corpora.move_to_end(key)
+                return key, self._corpora[key]
+        refs = dict(rttm.iter_rttm(path, as_arrays=True))
+        with self._lock:
+            self._corpora[key] = refs
+            while len(self._corpora) > self.max_corpora:
+                self._corpora.popitem(last=False)
+        return key, refs
+
+    def _score_rttm(self, request):
+        collar = float(request.get("collar", 0.0))
+        key, refs = self._reference_corpus(request["ref"])
+        hyps = dict(rttm.iter_rttm(request["hyp"], as_arrays=True))
+        file_ids, errors, ref_lengths = [], [], []
+        for file_id, ref in refs.items():
+            prepared = self._prepare(key + (file_id,), ref, collar)
+            hyp = hyps.get(file_id, segments.SegmentArray([], (), [], []))
+            details = prepared.score(hyp)
+            file_ids.append(file_id)
+            errors.append(details.error_length)
+            ref_lengths.append(details.ref_length)
+        return _corpus_response(
+            corpus.CorpusResult(file_ids, errors, ref_lengths))
+
+
+class ScoringClient:
+    """A client of ScoringServer, with an in-process fallback.
+
+    If the server cannot be reached, requests are scored in the current
+    process instead, with the same results.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=60.0, fallback=True):
+        """Create a client.
+
+        Args:
+            path: path of the Unix socket of the server
+            timeout: float, seconds to wait for a response
+            fallback: if False, raise ConnectionError when the server cannot
+                be reached, instead of scoring in-process
+        """
+        self.path = path
+        self.timeout = timeout
+        self.fallback = fallback
+
+    def _request(self, request):
+        """Send a request; return the result, or None if unreachable."""
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+        try:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            connection.connect(self.path)
+        except OSError:
+            connection.close()
+            if self.fallback:
+                return None
+            raise ConnectionError(
+                "No scoring server at {}.".format(self.path))
+        with connection:
+            try:
+                connection.sendall(json.dumps(
+                    request, default=float).encode("utf-8") + b"\n")
+                with connection.makefile("rb") as file_object:
+                    line = file_object.readline()
+            except OSError as error:
+                raise ConnectionError(
+                    "The scoring server at {} closed the connection: "
+                    "{}".format(self.path, error))
+        if not line:
+            raise ConnectionError(
+                "The scoring server at {} closed the connection without a "
+                "response.".format(self.path))
+        response = json.loads(line)
+        if "error" in response:
+            raise _ERRORS.get(response["error"], RuntimeError)(
+                response["message"])
+        return response
+
+    def ping(self):
+        """Whether the server is reachable."""
+        try:
+            return self._request({"method": "ping"}) is not None
+        except ConnectionError:
+            return False
+
+    def DER(self, ref, hyp, collar=0.0, ref_key=None, detailed=False):
+        """Compute Diarization Error Rate, see `der.DER`.
+
+        Args:
+            ref: a list of tuples for the ground truth, or a SegmentArray
+            hyp: a list of tuples for the hypothesis, or a SegmentArray
+            collar: float, tolerance allowing for some mismatch in speaker
+                borders
+            ref_key: optional JSON-serializable id of `ref`, e.g. a file
+                id; the server keeps the prepared reference of each key, so
+                `ref` must not change for the same key, and is only sent
+                when the server does not have it
+            detailed: if True, return a DERDetails
+
+        Returns:
+            a float number, or a DERDetails if `detailed` is True
+        """
+        request = {"method": "der", "hyp": _to_tuples(hyp), "collar": collar,
+                   "ref_key": ref_key, "detailed": detailed}
+        sent = False
+        if ref_key is not None:
+            # Try without the reference first; it is only sent if the server
+            # does not have it prepared.
+            try:
+                response = self._request(request)
+                sent = True
+            except ReferenceNotCached:
+                pass
+        if not sent:
+            request["ref"] = _to_tuples(ref)
+            response = self._request(request)
+        if response is None:
+            return der.DER(ref, hyp, collar=collar, detailed=detailed)
+        result = response["result"]
+        if detailed:
+            return der.DERDetails(result["ref_length"], result["miss"],
+                                  result["false_alarm"], result["confusion"],
+                                  result["error_length"])
+        return result
+
+    def DER_rttm(self, ref_path, hyp_path, collar=0.0):
+        """Compute corpus-level DER of two RTTM files.
+
+        The server keeps the parsed reference file and its prepared
+        references until the file changes.
+
+        Args:
+            ref_path: path to the reference RTTM file; it must be readable
+                by the server
+            hyp_path: path to the hypothesis RTTM file
+            collar: float, tolerance allowing for some mismatch in speaker
+                borders
+
+        Returns:
+            a dict with the corpus "der", and "ders", a dict from file id to
+                the DER of that file
+        """
+        response = self._request({
+            "method": "der_rttm", "ref": os.path.abspath(ref_path),
+            "hyp": os.path.abspath(hyp_path), "collar": collar})
+        if response is not None:
+            return response["result"]
+        file_ids, errors, ref_lengths = [], [], []
+        for file_id, ref, hyp in rttm.iter_rttm_pairs(ref_path, hyp_path,
+                                                      as_arrays=True):
+            error_length, ref_total_length = (
+                der.compute_error_and_reference_length(ref, hyp,
+                                                       collar=collar))
+            file_ids.append(file_id)
+            errors.append(error_length)
+            ref_lengths.append(ref_total_length)
+        return _corpus_response(
+            corpus.CorpusResult(file_ids, errors, ref_lengths))
+
+
+def main(argv=None):
+    """Run the scoring server until interrupted.
+
+    Args:
+        argv: a list of command line arguments, without the program name;
+            defaults to `sys.argv[1:]`
+
+    Returns:
+        the exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="python3 -m simpleder.server",
+        description="Serve DER requests over a Unix socket.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET,
+                        help="path of the Unix socket (default: {})".format(
+                            DEFAULT_SOCKET))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of scoring threads (default: all CPUs)")
+    parser.add_argument("--max-bytes", type=int, default=256 * 1024 * 1024,
+                        help="memory budget of prepared references")
+    args = parser.parse_args(argv)
+    server = ScoringServer(args.socket, workers=args.workers,
+                           max_bytes=args.max_bytes)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
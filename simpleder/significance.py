@@ -0,0 +1,180 @@
+import concurrent.futures
+import os
+
+import numpy as np
+
+# Each batch of bootstrap samples draws at most this many file counts.
+_MAX_BATCH_ELEMENTS = 2 ** 22
+
+
+class BootstrapResult:
+    """A bootstrap confidence interval of corpus DER.
+
+    Attributes:
+        der: the corpus DER of all files
+        low: the lower end of the confidence interval
+        high: the upper end of the confidence interval
+        samples: a 1-dim numpy array with the corpus DER of each bootstrap
+            sample
+    """
+
+    def __init__(self, der, low, high, samples):
+        self.der = der
+        self.low = low
+        self.high = high
+        self.samples = samples
+
+    def __repr__(self):
+        return "BootstrapResult(der={:.4f}, interval=[{:.4f}, {:.4f}])".format(
+            self.der, self.low, self.high)
+
+
+class PairedBootstrapResult:
+    """A paired bootstrap comparison of the corpus DER of two systems.
+
+    Attributes:
+        difference: corpus DER of system b minus corpus DER of system a;
+            negative if system b is better
+        low: the lower end of the confidence interval of the difference
+        high: the upper end of the confidence interval of the difference
+        p_value: two-sided p-value of the null hypothesis that both systems
+            have the same corpus DER
+        samples: a 1-dim numpy array with the difference of each bootstrap
+            sample
+    """
+
+    def __init__(self, difference, low, high, p_value, samples):
+        self.difference = difference
+        self.low = low
+        self.high = high
+        self.p_value = p_value
+        self.samples = samples
+
+    def __repr__(self):
+        return ("PairedBootstrapResult(difference={:.4f}, "
+                "interval=[{:.4f}, {:.4f}], p_value={:.4f})").format(
+                    self.difference, self.low, self.high, self.p_value)
+
+
+def _ratio(errors, ref_lengths):
+    """Element-wise errors / ref_lengths, where 0 / 0 is 0."""
+    return np.divide(errors, ref_lengths, out=np.zeros_like(errors),
+                     where=ref_lengths != 0.0)
+
+
+def _resample_sums(seed_sequence, num_samples, columns):
+    """Sum `columns` over files resampled with replacement.
+
+    Args:
+        seed_sequence: a numpy SeedSequence for this batch
+        num_samples: number of bootstrap samples
+        columns: a 2-dim numpy array with one row per file
+
+    Returns:
+        a 2-dim numpy array of shape (num_samples, columns.shape[1])
+    """
+    rng = np.random.default_rng(seed_sequence)
+    num_files = columns.shape[0]
+    # How many times each file is drawn in each sample.
+    draws = rng.integers(num_files, size=(num_samples, num_files))
+    draws += np.arange(num_samples)[:, np.newaxis] * num_files
+    counts = np.bincount(draws.ravel(), minlength=num_samples * num_files)
+    counts = counts.reshape((num_samples, num_files)).astype(np.float64)
+    return np.dot(counts, columns)
+
+
+def _bootstrap_sums(columns, num_samples, seed, workers):
+    """Resample files in batches, optionally in worker processes.
+
+    The batches and their seeds only depend on `seed`, `num_samples` and the
+    number of files, so the samples do not depend on `workers`.
+    """
+    batch_size = max(1, _MAX_BATCH_ELEMENTS // max(1, columns.shape[0]))
+    sizes = [min(batch_size, num_samples - start)
+             for start in range(0, num_samples, batch_size)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(sizes) <= 1:
+        sums = [_resample_sums(seed_sequence, size, columns)
+                for seed_sequence, size in zip(seed_sequences, sizes)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            sums = list(executor.map(_resample_sums, seed_sequences, sizes,
+                                     [columns] * len(sizes)))
+    return np.concatenate(sums, axis=0)
+
+
+def bootstrap(result, num_samples=1000, confidence=0.95, seed=None,
+              workers=1):
+    """Compute a bootstrap confidence interval of corpus DER.
+
+    Files are resampled with replacement. Each file is only scored once, by
+    `DER_corpus`; every bootstrap sample just sums the per-file error and
+    reference lengths with a matrix product.
+
+    Args:
+        result: a corpus.CorpusResult, see `DER_corpus`
+        num_samples: number of bootstrap samples
+        confidence: float in (0, 1), the confidence level of the interval
+        seed: optional int, the random seed
+        workers: number of worker processes for very large corpora; None
+            uses all CPUs
+
+    Returns:
+        a BootstrapResult
+
+    Raises:
+        ValueError: if there are no files
+    """
+    if not len(result):
+        raise ValueError("Cannot bootstrap an empty corpus.")
+    columns = np.stack([result.errors, result.ref_lengths], axis=1)
+    sums = _bootstrap_sums(columns, num_samples, seed, workers)
+    samples = _ratio(sums[:, 0], sums[:, 1])
+    low, high = np.quantile(
+        samples, [(1.0 - confidence) / 2.0, (1.0 + confidence) / 2.0])
+    return BootstrapResult(result.der, float(low), float(high), samples)
+
+
+def paired_bootstrap(result_a, result_b, num_samples=1000, confidence=0.95,
+                     seed=None, workers=1):
+    """Compare the corpus DER of two systems with a paired bootstrap.
+
+    Both systems are scored on the same resampled files in every bootstrap
+    sample.
+
+    Args:
+        result_a: a corpus.CorpusResult of system a
+        result_b: a corpus.CorpusResult of system b, with the same file ids
+            as `result_a`, in any order
+        num_samples: number of bootstrap samples
+        confidence: float in (0, 1), the confidence level of the interval
+        seed: optional int, the random seed
+        workers: number of worker processes for very large corpora; None
+            uses all CPUs
+
+    Returns:
+        a PairedBootstrapResult
+
+    Raises:
+        ValueError: if there are no files, or if the file ids differ
+    """
+    if not len(result_a):
+        raise ValueError("Cannot bootstrap an empty corpus.")
+    if sorted(result_a.file_ids) != sorted(result_b.file_ids):
+        raise ValueError("Both systems must be scored on the same files.")
+    positions = {file_id: i for i, file_id in enumerate(result_b.file_ids)}
+    order = np.array([positions[file_id] for file_id in result_a.file_ids],
+                     dtype=np.int64)
+    columns = np.stack([result_a.errors, result_a.ref_lengths,
+                        result_b.errors[order], result_b.ref_lengths[order]],
+                       axis=1)
+    sums = _bootstrap_sums(columns, num_samples, seed, workers)
+    samples = _ratio(sums[:, 2], sums[:, 3]) - _ratio(sums[:, 0], sums[:, 1])
+    low, high = np.quantile(
+        samples, [(1.0 - confidence) / 2.0, (1.0 + confidence) / 2.0])
+    p_value = min(1.0, 2.0 * min(np.mean(samples <= 0.0),
+                                 np.mean(samples >= 0.0)))
+    return PairedBootstrapResult(result_b.der - result_a.der, float(low),
+                                 float(high), float(p_value), samples)
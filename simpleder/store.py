@@ -0,0 +1,239 @@
+import functools
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from . import corpus
+from . import der
+from . import rttm
+from . import segments
+
+_INDEX_FILE = "index.json"
+_FORMAT_VERSION = 1
+# File name and on-disk dtype of each column.
+_COLUMNS = {
+    "speakers": ("speakers.i32", np.dtype("<i4")),
+    "starts": ("starts.f64", np.dtype("<f8")),
+    "ends": ("ends.f64", np.dtype("<f8")),
+}
+
+
+def write_store(path, recordings):
+    """Write recordings to an on-disk segment store.
+
+    A store is a directory with one contiguous little-endian binary file per
+    column (speaker codes, start times and end times) for the whole corpus,
+    and an `index.json` with the file ids, the offset of each recording in
+    the columns, and the speaker labels of each recording. Recordings are
+    written one at a time, so they can be streamed from e.g. `iter_rttm`.
+    An existing store at `path` is replaced only once all files are written;
+    stores opened before keep reading the old files.
+
+    Args:
+        path: path of the store directory; it is created if missing
+        recordings: an iterable of (file_id, segments) pairs, where segments
+            is a list of (speaker, start, end) tuples or a SegmentArray
+
+    Raises:
+        ValueError: if a file id appears more than once
+    """
+    os.makedirs(path, exist_ok=True)
+    file_ids = []
+    seen_file_ids = set()
+    labels = []
+    offsets = [0]
+    # All files are written to temporary files and then renamed over the
+    # old ones, so stores that have the old files mapped keep reading them;
+    # truncating mapped files in place would crash their readers.
+    column_files = {
+        name: tempfile.NamedTemporaryFile(dir=path, suffix=".tmp",
+                                          delete=False)
+        for name in _COLUMNS}
+    index_file = tempfile.NamedTemporaryFile(mode="w", dir=path,
+                                             suffix=".tmp", delete=False)
+    temporary_paths = [file_object.name for file_object in
+                       list(column_files.values()) + [index_file]]
+    try:
+        try:
+            for file_id, recording in recordings:
+                if file_id in seen_file_ids:
+                    raise ValueError(
+                        "File id {} appears more than once.".format(file_id))
+                if not isinstance(recording, segments.SegmentArray):
+                    recording = segments.SegmentArray.from_tuples(recording)
+                columns = {"speakers": recording.speakers,
+                           "starts": recording.start,
+                           "ends": recording.end}
+                for name, (_, dtype) in _COLUMNS.items():
+                    columns[name].astype(dtype).tofile(column_files[name])
+                seen_file_ids.add(file_id)
+                file_ids.append(file_id)
+                labels.append(list(recording.labels))
+                offsets.append(offsets[-1] + len(recording))
+            json.dump({"version": _FORMAT_VERSION, "file_ids": file_ids,
+                       "offsets": offsets, "labels": labels}, index_file)
+        finally:
+            for file_object in list(column_files.values()) + [index_file]:
+                file_object.close()
+        for name, (file_name, _) in _COLUMNS.items():
+            os.replace(column_files[name].name,
+                       os.path.join(path, file_name))
+        # The index is replaced last, so it never refers to missing data.
+        os.replace(index_file.name, os.path.join(path, _INDEX_FILE))
+    finally:
+        for temporary_path in temporary_paths:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+    # Stores opened by `DER_stores` in this process may be stale now.
+    _open_store.cache_clear()
+
+
+def convert_rttm(rttm_path_or_file, path):
+    """Convert an RTTM file to an on-disk segment store.
+
+    Args:
+        rttm_path_or_file: path to an RTTM file, or an open text file
+        path: path of the store directory
+
+    Returns:
+        a SegmentStore
+    """
+    write_store(path, rttm.iter_rttm(rttm_path_or_file, as_arrays=True))
+    return SegmentStore(path)
+
+
+class SegmentStore:
+    """A read-only, memory-mapped segment store, see `write_store`.
+
+    The columns are opened with `np.memmap`, so `store[file_id]` is a
+    zero-copy SegmentArray view of one recording, and only the pages that are
+    used are read from disk. A SegmentStore is pickled as its path, so it can
+    be passed to worker processes, which map the same files.
+
+    Attributes:
+        path: path of the store directory
+        file_ids: a list of file ids, in the order they were written
+    """
+
+    def __init__(self, path):
+        """Open a store.
+
+        Args:
+            path: path of the store directory
+
+        Raises:
+            ValueError: if the store has an unknown format version
+        """
+        self.path = path
+        with open(os.path.join(path, _INDEX_FILE), "r") as file_object:
+            index = json.load(file_object)
+        if index.get("version") != _FORMAT_VERSION:
+            raise ValueError("Unknown segment store version: {}".format(
+                index.get("version")))
+        self.file_ids = index["file_ids"]
+        self._positions = {file_id: position
+                           for position, file_id in enumerate(self.file_ids)}
+        self._offsets = index["offsets"]
+        self._labels = index["labels"]
+        self._columns = {}
+        for name, (file_name, dtype) in _COLUMNS.items():
+            if self._offsets[-1]:
+                self._columns[name] = np.memmap(
+                    os.path.join(path, file_name), dtype=dtype, mode="r",
+                    shape=(self._offsets[-1],))
+            else:
+                # Empty files cannot be memory-mapped.
+                self._columns[name] = np.zeros(0, dtype=dtype)
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __len__(self):
+        return len(self.file_ids)
+
+    def __contains__(self, file_id):
+        return file_id in self._positions
+
+    def __iter__(self):
+        return iter(self.file_ids)
+
+    def __repr__(self):
+        return "SegmentStore({!r}, {} recordings, {} segments)".format(
+            self.path, len(self), self._offsets[-1])
+
+    def __getitem__(self, file_id):
+        """Get the segments of a recording.
+
+        Args:
+            file_id: the file id
+
+        Returns:
+            a SegmentArray, whose columns are views of the mapped files
+
+        Raises:
+            KeyError: if the file id is not in the store
+        """
+        position = self._positions[file_id]
+        begin, end = self._offsets[position], self._offsets[position + 1]
+        return segments.SegmentArray(
+            self._columns["speakers"][begin:end], self._labels[position],
+            self._columns["starts"][begin:end],
+            self._columns["ends"][begin:end])
+
+    def get(self, file_id, default=None):
+        """Get the segments of a recording, or `default` if missing."""
+        if file_id not in self:
+            return default
+        return self[file_id]
+
+
+@functools.lru_cache(maxsize=None)
+def _open_store(path):
+    """Open a store once per process."""
+    return SegmentStore(path)
+
+
+def _score_recording(file_id, ref_path, hyp_path, collar, validate):
+    """Compute (error_length, ref_total_length) of one recording."""
+    ref = _open_store(ref_path)[file_id]
+    hyp = _open_store(hyp_path).get(file_id)
+    if hyp is None:
+        hyp = segments.SegmentArray([], (), [], [])
+    return der.compute_error_and_reference_length(
+        ref, hyp, collar=collar, validate=validate)
+
+
+def DER_stores(ref_store, hyp_store, collar=0.0, workers=1, chunksize=None,
+               validate=True):
+    """Compute corpus-level Diarization Error Rate of two segment stores.
+
+    Every recording of `ref_store` is scored; recordings missing from
+    `hyp_store` are scored against an empty hypothesis. Worker processes
+    receive only the store paths and the file ids, and map the stores
+    themselves.
+
+    Args:
+        ref_store: a SegmentStore, or the path of one, for the references
+        hyp_store: a SegmentStore, or the path of one, for the hypotheses
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        workers: number of worker processes; 1 scores all recordings in the
+            current process, and None uses all CPUs
+        chunksize: number of recordings sent to a worker process at a time;
+            by default, recordings are split into about 4 chunks per worker
+        validate: if False, skip `check_input` on all inputs
+
+    Returns:
+        a corpus.CorpusResult
+    """
+    ref_path = getattr(ref_store, "path", ref_store)
+    hyp_path = getattr(hyp_store, "path", hyp_store)
+    file_ids = _open_store(ref_path).file_ids
+    score = functools.partial(_score_recording, ref_path=ref_path,
+                              hyp_path=hyp_path, collar=collar,
+                              validate=validate)
+    return corpus._map_files(score, file_ids, file_ids, workers, chunksize)
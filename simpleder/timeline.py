@@ -0,0 +1,192 @@
+import numpy as np
+
+from . import der
+
+
+class Timeline:
+    """Elementary intervals between all boundaries of a reference/hypothesis.
+
+    Every quantity that DER needs is piecewise constant over the elementary
+    intervals, so once the intervals are annotated with the number of active
+    reference/hypothesis speakers and with the overlapping speaker pairs, any
+    scoring region (e.g. the region left by a collar) only changes how much of
+    each elementary interval is counted.
+
+    Attributes:
+        boundaries: a 1-dim sorted numpy array of all distinct start and end
+            times of the reference and the hypothesis
+        ref_counts: a 1-dim integer numpy array, the number of active
+            reference speakers in each elementary interval
+        hyp_counts: same as `ref_counts`, for the hypothesis
+        ref_index: a dict from reference speaker to integer
+        hyp_index: a dict from hypothesis speaker to integer
+    """
+
+    def __init__(self, ref, hyp):
+        """Build the timeline of a reference and a hypothesis.
+
+        Args:
+            ref: a list of tuples for the ground truth, where each tuple is
+                (speaker, start, end) of type (string, float, float); or a
+                SegmentArray
+            hyp: a list of tuples for the diarization result hypothesis, same
+                type as `ref`
+        """
+        ref_starts, ref_ends = der._start_end_arrays(ref)
+        hyp_starts, hyp_ends = der._start_end_arrays(hyp)
+        self.boundaries = np.unique(
+            np.concatenate([ref_starts, ref_ends, hyp_starts, hyp_ends]))
+        points = self.boundaries[:-1]
+        self.ref_counts = der.count_active_segments(
+            points, ref_starts, ref_ends)
+        self.hyp_counts = der.count_active_segments(
+            points, hyp_starts, hyp_ends)
+
+        # Each overlapping pair of segments covers a contiguous run of
+        # elementary intervals [pair_first, pair_last).
+        self.ref_index = der.build_speaker_index(ref)
+        self.hyp_index = der.build_speaker_index(hyp)
+        ref_pos, hyp_pos, _ = der.compute_pairwise_overlaps(
+            ref_starts, ref_ends, hyp_starts, hyp_ends)
+        self._pair_codes = (
+            der._speaker_codes(ref, self.ref_index)[ref_pos] *
+            len(self.hyp_index) +
+            der._speaker_codes(hyp, self.hyp_index)[hyp_pos])
+        self._pair_first = np.searchsorted(
+            self.boundaries,
+            np.maximum(ref_starts[ref_pos], hyp_starts[hyp_pos]))
+        self._pair_last = np.searchsorted(
+            self.boundaries, np.minimum(ref_ends[ref_pos], hyp_ends[hyp_pos]))
+
+        # The reference boundaries closest to each elementary interval.
+        ref_points = np.unique(np.concatenate([ref_starts, ref_ends]))
+        left = np.searchsorted(ref_points, points, side="right") - 1
+        right = np.searchsorted(ref_points, self.boundaries[1:], side="left")
+        padded = np.concatenate([[-np.inf], ref_points, [np.inf]])
+        self._left_ref_points = padded[left + 1]
+        self._right_ref_points = padded[right + 1]
+
+    def retained_lengths(self, collar=0.0):
+        """Compute the scored length of each elementary interval.
+
+        Args:
+            collar: float, tolerance around reference boundaries; the region
+                within `collar` of any reference boundary is not scored
+
+        Returns:
+            a 1-dim float numpy array with one length per elementary interval
+        """
+        starts = self.boundaries[:-1]
+        ends = self.boundaries[1:]
+        if collar <= 0.0:
+            return ends - starts
+        left_cut = np.clip(self._left_ref_points + collar, starts, ends)
+        right_cut = np.clip(self._right_ref_points - collar, starts, ends)
+        return np.maximum(right_cut - left_cut, 0.0)
+
+    def build_cost_matrix(self, lengths, sparse_layout=False):
+        """Build the cost matrix, counting each elementary interval partially.
+
+        Args:
+            lengths: a 1-dim numpy array, the length to count for each
+                elementary interval, see `retained_lengths`
+            sparse_layout: True to return a scipy.sparse matrix, False for a
+                numpy array, or None to choose from the density of the
+                overlapping speaker pairs
+
+        Returns:
+            a 2-dim numpy array or scipy.sparse matrix, whose element (i, j)
+                is the overlap between `i`th reference speaker and `j`th
+                hypothesis speaker
+        """
+        cumulative = np.concatenate([[0.0], np.cumsum(lengths)])
+        overlap = cumulative[self._pair_last] - cumulative[self._pair_first]
+        shape = (len(self.ref_index), len(self.hyp_index))
+        return der._pair_cost_matrix(self._pair_codes, overlap, shape,
+                                     sparse_layout)
+
+    def compute_error_and_reference_length(self, lengths):
+        """Compute the numerator and denominator of DER.
+
+        Args:
+            lengths: a 1-dim numpy array, the length to count for each
+                elementary interval, see `retained_lengths`
+
+        Returns:
+            a tuple of two float numbers: (error_length, ref_total_length)
+        """
+        ref_total_length = float(np.sum(lengths * self.ref_counts))
+        load_length = np.sum(
+            lengths * np.maximum(self.ref_counts, self.hyp_counts))
+        optimal_match_overlap = der.compute_optimal_match_overlap(
+            self.build_cost_matrix(lengths, sparse_layout=None))
+        return float(load_length - optimal_match_overlap), ref_total_length
+
+
+def DER_collars(ref, hyp, collars, validate=True):
+    """Compute Diarization Error Rate for several collars in a single pass.
+
+    The elementary intervals, speaker counts and overlapping speaker pairs are
+    computed once; each collar then only masks part of the intervals near
+    reference boundaries.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyp: a list of tuples for the diarization result hypothesis, same type
+            as `ref`
+        collars: a list of float tolerances
+        validate: if False, skip `check_input` on `ref` and `hyp`
+
+    Returns:
+        a list of float numbers for the Diarization Error Rate of each collar
+    """
+    der._check_time_kinds(der._time_kind(ref), der._time_kind(hyp))
+    if validate:
+        der.check_input(ref)
+        der.check_input(hyp)
+    timeline = Timeline(ref, hyp)
+    ders = []
+    for collar in collars:
+        error_length, ref_total_length = (
+            timeline.compute_error_and_reference_length(
+                timeline.retained_lengths(collar)))
+        ders.append(error_length / ref_total_length
+                    if ref_total_length else 0.0)
+    return ders
+
+
+def DER_and_skip_overlap(ref, hyp, collar=0.0, validate=True):
+    """Compute Diarization Error Rate with and without overlapped speech.
+
+    Both variants share one timeline: skipping the overlap only stops
+    counting the elementary intervals where at least two reference speakers
+    are active, so there is no second scoring pass.
+
+    Args:
+        ref: a list of tuples for the ground truth, where each tuple is
+            (speaker, start, end) of type (string, float, float); or a
+            SegmentArray
+        hyp: a list of tuples for the diarization result hypothesis, same type
+            as `ref`
+        collar: float, tolerance allowing for some mismatch in speaker borders
+        validate: if False, skip `check_input` on `ref` and `hyp`
+
+    Returns:
+        a tuple of two float numbers: the Diarization Error Rate, and the
+            Diarization Error Rate with `skip_overlap=True`
+    """
+    der._check_time_kinds(der._time_kind(ref), der._time_kind(hyp))
+    if validate:
+        der.check_input(ref)
+        der.check_input(hyp)
+    timeline = Timeline(ref, hyp)
+    lengths = timeline.retained_lengths(collar)
+    ders = []
+    for scored in (lengths, np.where(timeline.ref_counts >= 2, 0.0, lengths)):
+        error_length, ref_total_length = (
+            timeline.compute_error_and_reference_length(scored))
+        ders.append(error_length / ref_total_length
+                    if ref_total_length else 0.0)
+    return ders[0], ders[1]
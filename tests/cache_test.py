@@ -0,0 +1,104 @@
+import unittest
+
+from simpleder import cache
+from simpleder import der
+
+
+REF = [("A", 0.0, 1.0),
+       ("B", 1.0, 1.5),
+       ("A", 1.6, 2.1)]
+HYP = [("1", 0.0, 0.8),
+       ("2", 0.8, 1.4),
+       ("3", 1.5, 1.8),
+       ("1", 1.8, 2.0)]
+
+
+class TestReferenceCache(unittest.TestCase):
+    """Tests for the ReferenceCache class."""
+
+    def test_hit(self):
+        reference_cache = cache.ReferenceCache()
+        prepared = reference_cache.get("file", REF, collar=0.1)
+        # The reference is not used on a hit.
+        self.assertIs(prepared, reference_cache.get("file", None, collar=0.1))
+        self.assertAlmostEqual(der.DER(REF, HYP, collar=0.1),
+                               prepared.score(HYP).der, delta=1e-12)
+        self.assertEqual(1, len(reference_cache))
+
+    def test_keyed_by_collar(self):
+        reference_cache = cache.ReferenceCache()
+        prepared = reference_cache.get("file", REF, collar=0.0)
+        other = reference_cache.get("file", REF, collar=0.25)
+        self.assertIsNot(prepared, other)
+        self.assertEqual(0.25, other.collar)
+        self.assertEqual(2, len(reference_cache))
+
+    def test_keyed_by_uem(self):
+        reference_cache = cache.ReferenceCache()
+        prepared = reference_cache.get("file", REF)
+        other = reference_cache.get("file", REF, uem=[(0.0, 1.0)])
+        self.assertIsNot(prepared, other)
+        self.assertIs(other,
+                      reference_cache.get("file", None, uem=[(0.0, 1.0)]))
+        self.assertEqual(der.DER(REF, HYP, uem=[(0.0, 1.0)]),
+                         other.score(HYP).der)
+
+    def test_keyed_by_skip_overlap(self):
+        ref = REF + [("C", 0.5, 1.2)]
+        reference_cache = cache.ReferenceCache()
+        prepared = reference_cache.get("file", ref)
+        other = reference_cache.get("file", ref, skip_overlap=True)
+        self.assertIsNot(prepared, other)
+        self.assertIs(other,
+                      reference_cache.get("file", None, skip_overlap=True))
+        self.assertEqual(der.DER(ref, HYP), prepared.score(HYP).der)
+        self.assertEqual(der.DER(ref, HYP, skip_overlap=True),
+                         other.score(HYP).der)
+        self.assertNotEqual(prepared.score(HYP).der, other.score(HYP).der)
+
+    def test_lookup_and_insert(self):
+        reference_cache = cache.ReferenceCache()
+        self.assertIsNone(reference_cache.lookup("file", collar=0.1))
+        prepared = der.PreparedReference(REF, collar=0.1)
+        self.assertIs(prepared,
+                      reference_cache.insert("file", prepared, collar=0.1))
+        self.assertIs(prepared, reference_cache.lookup("file", collar=0.1))
+        self.assertIsNone(reference_cache.lookup("file"))
+        # A reference prepared concurrently does not replace the cached one.
+        other = der.PreparedReference(REF, collar=0.1)
+        self.assertIs(prepared,
+                      reference_cache.insert("file", other, collar=0.1))
+        self.assertEqual(prepared.nbytes, reference_cache.nbytes)
+
+    def test_eviction(self):
+        nbytes = der.PreparedReference(REF).nbytes
+        reference_cache = cache.ReferenceCache(max_bytes=2 * nbytes)
+        first = reference_cache.get("a", REF)
+        reference_cache.get("b", REF)
+        # Using "a" makes "b" the least recently used.
+        self.assertIs(first, reference_cache.get("a", REF))
+        reference_cache.get("c", REF)
+        self.assertEqual(2, len(reference_cache))
+        self.assertEqual(2 * nbytes, reference_cache.nbytes)
+        self.assertIs(first, reference_cache.get("a", None))
+        with self.assertRaises(TypeError):
+            reference_cache.get("b", None)
+
+    def test_too_large(self):
+        reference_cache = cache.ReferenceCache(max_bytes=0)
+        prepared = reference_cache.get("a", REF)
+        self.assertAlmostEqual(der.DER(REF, HYP), prepared.score(HYP).der,
+                               delta=1e-12)
+        self.assertEqual(0, len(reference_cache))
+        self.assertEqual(0, reference_cache.nbytes)
+
+    def test_clear(self):
+        reference_cache = cache.ReferenceCache()
+        reference_cache.get("a", REF)
+        reference_cache.clear()
+        self.assertEqual(0, len(reference_cache))
+        self.assertEqual(0, reference_cache.nbytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
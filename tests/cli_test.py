@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from simpleder import cli
+
+REF_RTTM = """SPEAKER file1 1 0.00 1.00 <NA> <NA> A <NA> <NA>
+SPEAKER file1 1 1.00 0.50 <NA> <NA> B <NA> <NA>
+SPEAKER file1 1 1.60 0.50 <NA> <NA> A <NA> <NA>
+SPEAKER file2 1 0.00 2.00 <NA> <NA> C <NA> <NA>
+"""
+
+HYP_RTTM = """SPEAKER file1 1 0.00 0.80 <NA> <NA> 1 <NA> <NA>
+SPEAKER file1 1 0.80 0.60 <NA> <NA> 2 <NA> <NA>
+SPEAKER file1 1 1.50 0.30 <NA> <NA> 3 <NA> <NA>
+SPEAKER file1 1 1.80 0.20 <NA> <NA> 1 <NA> <NA>
+SPEAKER file2 1 0.00 2.00 <NA> <NA> 1 <NA> <NA>
+"""
+
+
+class TestMain(unittest.TestCase):
+    """Tests for the main function."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.ref_path = os.path.join(self.temp_dir.name, "ref.rttm")
+        self.hyp_path = os.path.join(self.temp_dir.name, "hyp.rttm")
+        with open(self.ref_path, "w") as file_object:
+            file_object.write(REF_RTTM)
+        with open(self.hyp_path, "w") as file_object:
+            file_object.write(HYP_RTTM)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_per_file(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            exit_code = cli.main([self.ref_path, self.hyp_path, "--per-file"])
+        self.assertEqual(0, exit_code)
+        # file1 has 0.7s of error in 2.0s, file2 is perfect.
+        self.assertEqual(
+            ["file1 DER=0.3500", "file2 DER=0.0000", "DER=0.1750"],
+            output.getvalue().splitlines())
+
+    def test_uem(self):
+        uem_path = os.path.join(self.temp_dir.name, "all.uem")
+        with open(uem_path, "w") as file_object:
+            file_object.write("file1 1 0.00 1.00\n")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            cli.main([self.ref_path, self.hyp_path, "--uem", uem_path,
+                      "--per-file"])
+        # Only the first second of file1 is scored; file2 is not in the UEM.
+        self.assertEqual(
+            ["file1 DER=0.2000", "file2 DER=0.0000", "DER=0.0667"],
+            output.getvalue().splitlines())
+
+    def test_skip_overlap(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            cli.main([self.ref_path, self.hyp_path, "--skip-overlap"])
+        # The reference has no overlapped speech.
+        self.assertEqual(["DER=0.1750"], output.getvalue().splitlines())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import numpy as np
+import unittest
+
+from simpleder import corpus
+from simpleder import der
+
+
+PAIRS = {
+    "a": ([("A", 0.0, 1.0)],
+          [("B", 0.0, 0.5)]),
+    "b": ([("A", 0.0, 1.0), ("B", 1.0, 1.5), ("A", 1.6, 2.1)],
+          [("1", 0.0, 0.8), ("2", 0.8, 1.4), ("3", 1.5, 1.8),
+           ("1", 1.8, 2.0)]),
+    "c": ([("A", 0.0, 3.0)],
+          [("1", 0.0, 3.0)]),
+    "d": ([],
+          [("1", 0.0, 1.0)]),
+}
+
+
+class TestDERCorpus(unittest.TestCase):
+    """Tests for the DER_corpus function."""
+
+    def test_serial(self):
+        result = corpus.DER_corpus(PAIRS)
+        self.assertEqual(["a", "b", "c", "d"], result.file_ids)
+        np.testing.assert_allclose([0.5, 0.7, 0.0, 1.0], result.errors)
+        np.testing.assert_allclose([1.0, 2.0, 3.0, 0.0], result.ref_lengths)
+        # (0.5 + 0.7 + 0.0 + 1.0) / (1.0 + 2.0 + 3.0 + 0.0)
+        self.assertAlmostEqual(2.2 / 6.0, result.der, delta=0.0001)
+        ders = result.ders
+        self.assertAlmostEqual(0.35, ders["b"], delta=0.0001)
+        self.assertEqual(0.0, ders["d"])
+        for file_id, (ref, hyp) in PAIRS.items():
+            self.assertEqual(der.DER(ref, hyp), ders[file_id])
+
+    def test_sequence(self):
+        result = corpus.DER_corpus(list(PAIRS.values()), collar=0.1)
+        self.assertEqual([0, 1, 2, 3], result.file_ids)
+
+    def test_workers_match_serial(self):
+        serial = corpus.DER_corpus(PAIRS, collar=0.1)
+        parallel = corpus.DER_corpus(PAIRS, collar=0.1, workers=2,
+                                     chunksize=1)
+        np.testing.assert_array_equal(serial.errors, parallel.errors)
+        np.testing.assert_array_equal(serial.ref_lengths,
+                                      parallel.ref_lengths)
+        self.assertEqual(serial.der, parallel.der)
+
+    def test_empty(self):
+        result = corpus.DER_corpus({})
+        self.assertEqual(0, len(result))
+        self.assertEqual(0.0, result.der)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from simpleder import curves
+from simpleder import der
+
+REF = [("A", 0.0, 1.0),
+       ("B", 1.0, 1.5),
+       ("A", 1.6, 2.1)]
+HYP = [("1", 0.0, 0.8),
+       ("2", 0.8, 1.4),
+       ("3", 1.5, 1.8),
+       ("1", 1.8, 2.0)]
+
+
+class TestDERCurve(unittest.TestCase):
+    """Tests for the DER_curve function."""
+
+    def test_bins_sum_to_der(self):
+        for collar in [0.0, 0.1]:
+            curve = curves.DER_curve(REF, HYP, window=0.5, collar=collar)
+            details = der.DER(REF, HYP, collar=collar, detailed=True)
+            self.assertAlmostEqual(details.error_length, curve.errors.sum(),
+                                   delta=1e-12)
+            self.assertAlmostEqual(details.ref_length,
+                                   curve.ref_lengths.sum(), delta=1e-12)
+
+    def test_windows_cover_segments(self):
+        curve = curves.DER_curve(REF, HYP, window=0.5)
+        np.testing.assert_allclose([0.0, 0.5, 1.0, 1.5, 2.0], curve.starts)
+        np.testing.assert_allclose(curve.starts + 0.5, curve.ends)
+
+    def test_edges(self):
+        curve = curves.DER_curve([("A", 0.0, 10.0)], [("1", 0.0, 5.0)],
+                                 edges=[0.0, 2.0, 6.0, 20.0])
+        np.testing.assert_allclose([0.0, 2.0, 6.0], curve.starts)
+        np.testing.assert_allclose([0.0, 1.0, 4.0], curve.errors)
+        np.testing.assert_allclose([2.0, 4.0, 4.0], curve.ref_lengths)
+        np.testing.assert_allclose([0.0, 0.25, 1.0], curve.ders)
+
+    def test_sliding_windows_use_global_mapping(self):
+        # Globally, A maps to 1; so 2 is a confusion in the second window
+        # even though it would be a correct mapping there on its own.
+        ref = [("A", 0.0, 3.0)]
+        hyp = [("1", 0.0, 2.0), ("2", 2.0, 3.0)]
+        curve = curves.DER_curve(ref, hyp, window=2.0, step=1.0)
+        np.testing.assert_allclose([0.0, 1.0, 2.0], curve.starts)
+        np.testing.assert_allclose([0.0, 1.0, 1.0], curve.errors)
+        np.testing.assert_allclose([2.0, 2.0, 1.0], curve.ref_lengths)
+
+    def test_empty(self):
+        curve = curves.DER_curve([], [])
+        self.assertEqual(0, len(curve))
+        curve = curves.DER_curve([], [], edges=[0.0, 1.0])
+        np.testing.assert_allclose([0.0], curve.ders)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            curves.DER_curve(REF, HYP, window=0.0)
+        with self.assertRaises(ValueError):
+            curves.DER_curve(REF, HYP, edges=[1.0, 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
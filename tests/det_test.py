@@ -1,7 +1,14 @@
 import numpy as np
+import os
+import subprocess
+import sys
 import unittest
 
+from scipy import optimize
+from scipy import sparse
+
 from simpleder import der
+from simpleder import frames
 
 
 class TestCheckInput(unittest.TestCase):
@@ -36,6 +43,81 @@ class TestCheckInput(unittest.TestCase):
         with self.assertRaises(TypeError):
             der.check_input(hyp)
 
+    def test_same_speaker_intersect(self):
+        hyp = [("A", 1.0, 3.0),
+               ("B", 2.0, 4.0),
+               ("A", 2.5, 5.0)]
+        with self.assertRaises(ValueError):
+            der.check_input(hyp)
+
+    def test_same_speaker_touching(self):
+        hyp = [("A", 1.0, 3.0),
+               ("A", 3.0, 5.0),
+               ("A", 4.0, 4.0)]
+        der.check_input(hyp)
+
+    def test_not_finite(self):
+        hyp = [("A", 1.0, float("inf"))]
+        with self.assertRaises(ValueError):
+            der.check_input(hyp)
+
+    def test_nan(self):
+        hyp = [("A", float("nan"), 1.0)]
+        with self.assertRaises(ValueError):
+            der.check_input(hyp)
+
+    def test_same_as_segment_array(self):
+        rng = np.random.default_rng(0)
+        for num_segments in [5, 20, 200]:
+            for _ in range(20):
+                starts = rng.integers(0, num_segments ** 2,
+                                      size=num_segments) / 4.0
+                hyp = [("AB"[i % 2], float(start), float(start) + 0.5)
+                       for i, start in enumerate(starts)]
+                errors = []
+                for segments in [hyp, der.SegmentArray.from_tuples(hyp)]:
+                    try:
+                        der.check_input(segments)
+                        errors.append(None)
+                    except ValueError:
+                        errors.append(ValueError)
+                self.assertEqual(errors[0], errors[1])
+
+    def test_segment_array_valid(self):
+        hyp = der.SegmentArray.from_tuples([("A", 1.0, 3.0),
+                                            ("B", 4.0, 4.8)])
+        der.check_input(hyp)
+
+    def test_segment_array_start_after_end(self):
+        hyp = der.SegmentArray.from_tuples([("A", 1.0, 3.0),
+                                            ("B", 4.0, 3.8)])
+        with self.assertRaises(ValueError):
+            der.check_input(hyp)
+
+    def test_segment_array_nan(self):
+        hyp = der.SegmentArray.from_tuples([("A", 1.0, 3.0),
+                                            ("B", float("nan"), 4.8)])
+        with self.assertRaises(ValueError):
+            der.check_input(hyp)
+
+    def test_segment_array_same_speaker_intersect(self):
+        hyp = der.SegmentArray.from_tuples([("A", 1.0, 3.0),
+                                            ("B", 1.0, 3.0),
+                                            ("A", 0.0, 10.0)])
+        with self.assertRaises(ValueError):
+            der.check_input(hyp)
+
+    def test_segment_array_integer_times(self):
+        hyp = der.SegmentArray.from_tuples([("A", 1.0, 3.0)])
+        hyp.start = hyp.start.astype(np.int64)
+        with self.assertRaises(TypeError):
+            der.check_input(hyp)
+
+    def test_segment_array_bad_speaker_index(self):
+        hyp = der.SegmentArray([0, 2], ["A", "B"], [1.0, 4.0], [3.0, 5.0])
+        with self.assertRaises(ValueError):
+            der.check_input(hyp)
+
 
 class TestComputeIntersectionLength(unittest.TestCase):
     """Tests for the compute_intersection_length function."""
@@ -94,6 +176,35 @@ class TestComputeLoadLength(unittest.TestCase):
         # Ref has 2 speakers, Hyp has 1. Max is 2.
         self.assertEqual(2.0, der.compute_load_length(ref, hyp))
 
+    def test_zero_length_segment(self):
+        ref = [("A", 0.0, 1.0),
+               ("B", 0.5, 0.5)]
+        hyp = [("A", 0.0, 1.0)]
+        # Zero-length segments never cover any elementary interval.
+        self.assertEqual(1.0, der.compute_load_length(ref, hyp))
+
+    def test_touching_boundaries(self):
+        ref = [("A", 0.0, 1.0),
+               ("A", 1.0, 2.0)]
+        hyp = [("A", 0.0, 2.0),
+               ("B", 2.0, 3.0)]
+        self.assertEqual(3.0, der.compute_load_length(ref, hyp))
+
+    def test_empty(self):
+        self.assertEqual(0.0, der.compute_load_length([], []))
+
+
+class TestCountActiveSegments(unittest.TestCase):
+    """Tests for the count_active_segments function."""
+
+    def test_example(self):
+        starts = np.array([0.0, 1.0, 1.0, 3.0])
+        ends = np.array([2.0, 1.0, 3.0, 4.0])
+        points = np.array([0.0, 1.0, 2.0, 3.0, 4.0])
+        expected = np.array([1, 2, 1, 1, 0])
+        np.testing.assert_array_equal(
+            expected, der.count_active_segments(points, starts, ends))
+
 
 class TestBuildSpeakerIndex(unittest.TestCase):
     """Tests for the build_speaker_index function."""
@@ -133,6 +244,108 @@ class TestBuildCostMatrix(unittest.TestCase):
         cost_matrix = der.build_cost_matrix(ref, hyp)
         self.assertTrue(np.allclose(expected, cost_matrix, atol=0.0001))
 
+    def test_overlapped_speech(self):
+        ref = [("A", 0.0, 4.0),
+               ("B", 1.0, 3.0),
+               ("A", 5.0, 6.0)]
+        hyp = [("1", 0.5, 5.5),
+               ("2", 2.0, 2.5),
+               ("2", 3.0, 3.0)]
+        expected = np.array(
+            [[4.0, 0.5],
+             [2.0, 0.5]])
+        cost_matrix = der.build_cost_matrix(ref, hyp)
+        self.assertTrue(np.allclose(expected, cost_matrix, atol=0.0001))
+
+    def test_empty_hyp(self):
+        ref = [("A", 0.0, 1.0)]
+        cost_matrix = der.build_cost_matrix(ref, [])
+        self.assertEqual((1, 0), cost_matrix.shape)
+
+
+class TestComputePairwiseOverlaps(unittest.TestCase):
+    """Tests for the compute_pairwise_overlaps function."""
+
+    def test_example(self):
+        a_starts = np.array([0.0, 5.0, 2.0])
+        a_ends = np.array([3.0, 6.0, 4.0])
+        b_starts = np.array([1.0, 3.0, 6.0])
+        b_ends = np.array([2.5, 5.5, 7.0])
+        a_pos, b_pos, overlap = der.compute_pairwise_overlaps(
+            a_starts, a_ends, b_starts, b_ends)
+        np.testing.assert_array_equal([0, 1, 2, 2], a_pos)
+        np.testing.assert_array_equal([0, 1, 0, 1], b_pos)
+        np.testing.assert_allclose([1.5, 0.5, 0.5, 1.0], overlap)
+
+
+def linear_sum_assignment_overlap(cost_matrix):
+    row_index, col_index = optimize.linear_sum_assignment(-cost_matrix)
+    return float(cost_matrix[row_index, col_index].sum())
+
+
+class TestComputeOptimalMatchOverlap(unittest.TestCase):
+    """Tests for the compute_optimal_match_overlap function."""
+
+    def test_dense(self):
+        cost_matrix = np.array([[1.0, 3.0, 0.0],
+                                [2.0, 4.0, 0.5]])
+        self.assertAlmostEqual(
+            5.0, der.compute_optimal_match_overlap(cost_matrix), delta=1e-12)
+
+    def test_sparse_same_as_dense(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            shape = tuple(rng.integers(1, 12, size=2))
+            cost_matrix = rng.random(shape) * (rng.random(shape) < 0.3)
+            self.assertAlmostEqual(
+                der.compute_optimal_match_overlap(cost_matrix),
+                der.compute_optimal_match_overlap(
+                    sparse.csr_matrix(cost_matrix)),
+                delta=1e-9)
+
+    def test_small_without_scipy(self):
+        cases = [np.zeros((0, 3)),
+                 np.array([[0.0, 2.0, 1.0]]),
+                 np.array([[3.0, 1.0], [2.0, 0.5]]),
+                 np.array([[1.0, 1.0, 0.0],
+                           [1.0, 1.0, 1.0],
+                           [0.0, 1.0, 1.0]])]
+        expected = [0.0, 2.0, 3.5, 3.0]
+        for cost_matrix, overlap in zip(cases, expected):
+            self.assertAlmostEqual(
+                overlap, der._small_optimal_match_overlap(cost_matrix),
+                delta=1e-12)
+
+    def test_small_same_as_scipy(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            shape = tuple(rng.integers(1, 5, size=2))
+            cost_matrix = np.round(rng.random(shape) * 3.0)
+            overlap = der._small_optimal_match_overlap(cost_matrix)
+            if overlap is not None:
+                self.assertAlmostEqual(
+                    linear_sum_assignment_overlap(cost_matrix), overlap,
+                    delta=1e-12)
+
+    def test_large_needs_scipy(self):
+        rng = np.random.default_rng(0)
+        cost_matrix = np.ones((4, 4)) + rng.random((4, 4)) * 1e-3
+        cost_matrix[:, 0] = 2.0
+        self.assertIsNone(der._small_optimal_match_overlap(cost_matrix))
+
+    def test_import_without_scipy(self):
+        code = ("import sys, simpleder; "
+                "simpleder.DER([('A', 0.0, 1.0)], [('1', 0.0, 2.0)]); "
+                "print('scipy' in sys.modules)")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output([sys.executable, "-c", code],
+                                         env=env, universal_newlines=True)
+        self.assertEqual("False", output.strip())
+
+    def test_sparse_empty(self):
+        self.assertEqual(0.0, der.compute_optimal_match_overlap(
+            sparse.csr_matrix((3, 4))))
+
 
 class TestDER(unittest.TestCase):
     """Tests for the DER function."""
@@ -203,6 +416,22 @@ class TestDER(unittest.TestCase):
                ("1", 1.8, 2.0)]
         self.assertAlmostEqual(0.35, der.DER(ref, hyp), delta=0.0001)
 
+    def test_three_tuples_segment_array(self):
+        ref = der.SegmentArray.from_tuples([("A", 0.0, 1.0),
+                                            ("B", 1.0, 1.5),
+                                            ("A", 1.6, 2.1)])
+        hyp = der.SegmentArray.from_tuples([("1", 0.0, 0.8),
+                                            ("2", 0.8, 1.4),
+                                            ("3", 1.5, 1.8),
+                                            ("1", 1.8, 2.0)])
+        self.assertAlmostEqual(0.35, der.DER(ref, hyp), delta=0.0001)
+
+    def test_segment_array_unused_labels(self):
+        ref = der.SegmentArray([1, 1], ["X", "A"], [0.0, 20.0], [10.0, 21.0])
+        hyp = der.SegmentArray([0, 2], ["1", "X", "2"],
+                               [0.0, 20.0], [10.0, 21.0])
+        self.assertAlmostEqual(1.0 / 11.0, der.DER(ref, hyp), delta=0.0001)
+
     def test_hyp_has_more_labels(self):
         ref = [("0", 0.0, 1.0),
                ("1", 1.0, 2.0),
@@ -348,6 +577,414 @@ class TestDER(unittest.TestCase):
         hyp = [("A", 0.0, 1.05), ("B", 1.05, 2.0)]
         self.assertEqual(0.0, der.DER(ref, hyp, collar=0.1))
 
+    def test_detailed(self):
+        ref = [("A", 0.0, 1.0),
+               ("B", 1.0, 1.5),
+               ("A", 1.6, 2.1)]
+        hyp = [("1", 0.0, 0.8),
+               ("2", 0.8, 1.4),
+               ("3", 1.5, 1.8),
+               ("1", 1.8, 2.0)]
+        details = der.DER(ref, hyp, detailed=True)
+        self.assertIsInstance(details, der.DERDetails)
+        # Miss: 1.4-1.5 and 2.0-2.1. False alarm: 1.5-1.6.
+        # Confusion: 0.2 (A vs 2) + 0.2 (A vs 3).
+        self.assertAlmostEqual(2.0, details.ref_length, delta=0.0001)
+        self.assertAlmostEqual(0.2, details.miss, delta=0.0001)
+        self.assertAlmostEqual(0.1, details.false_alarm, delta=0.0001)
+        self.assertAlmostEqual(0.4, details.confusion, delta=0.0001)
+        self.assertEqual(der.DER(ref, hyp), details.der)
+
+    def test_detailed_overlap(self):
+        ref = [("A", 0.0, 1.0),
+               ("B", 0.0, 1.0)]
+        hyp = [("1", 0.0, 1.0),
+               ("2", 0.5, 2.0)]
+        details = der.DER(ref, hyp, detailed=True)
+        self.assertAlmostEqual(0.5, details.miss, delta=0.0001)
+        self.assertAlmostEqual(1.0, details.false_alarm, delta=0.0001)
+        self.assertAlmostEqual(0.0, details.confusion, delta=0.0001)
+        self.assertAlmostEqual(0.75, details.der, delta=0.0001)
+
+    def test_detailed_collar(self):
+        ref = [("A", 0.0, 1.0)]
+        hyp = [("A", 0.0, 1.2)]
+        details = der.DER(ref, hyp, collar=0.1, detailed=True)
+        self.assertAlmostEqual(0.8, details.ref_length, delta=0.0001)
+        self.assertAlmostEqual(0.1, details.false_alarm, delta=0.0001)
+        self.assertAlmostEqual(0.125, details.der, delta=0.0001)
+
+    def test_skip_validation(self):
+        ref = [("A", 0.0, 1.0)]
+        hyp = [("B", 0.0, 0.5),
+               ("C", 0.5, 1.0)]
+        self.assertEqual(0.5, der.DER(ref, hyp, validate=False))
+        with self.assertRaises(TypeError):
+            der.DER(tuple(ref), hyp)
+
+    def test_collar_segment_array(self):
+        ref = der.SegmentArray.from_tuples([("A", 0.0, 1.0)])
+        hyp = der.SegmentArray.from_tuples([("A", 0.0, 1.2)])
+        self.assertAlmostEqual(0.125,
+                               der.DER(ref, hyp, collar=0.1),
+                               delta=0.0001)
+
+
+class TestComputeErrorAndReferenceLength(unittest.TestCase):
+    """Tests for the compute_error_and_reference_length function."""
+
+    def test_example(self):
+        ref = [("A", 0.0, 1.0),
+               ("B", 1.0, 1.5),
+               ("A", 1.6, 2.1)]
+        hyp = [("1", 0.0, 0.8),
+               ("2", 0.8, 1.4),
+               ("3", 1.5, 1.8),
+               ("1", 1.8, 2.0)]
+        error_length, ref_total_length = (
+            der.compute_error_and_reference_length(ref, hyp))
+        self.assertAlmostEqual(0.7, error_length, delta=0.0001)
+        self.assertAlmostEqual(2.0, ref_total_length, delta=0.0001)
+
+    def test_empty_ref(self):
+        hyp = [("1", 0.0, 1.0)]
+        self.assertEqual((1.0, 0.0),
+                         der.compute_error_and_reference_length([], hyp))
+
+
+class TestPreparedReference(unittest.TestCase):
+    """Tests for the PreparedReference class."""
+
+    def setUp(self):
+        self.ref = [("A", 0.0, 1.0),
+                    ("B", 1.0, 1.5),
+                    ("A", 1.6, 2.1),
+                    ("C", 3.0, 4.5)]
+        self.hyps = [[("1", 0.0, 0.8),
+                      ("2", 0.8, 1.4),
+                      ("3", 1.5, 1.8),
+                      ("1", 1.8, 2.0)],
+                     [("1", 0.2, 2.0), ("2", 2.9, 4.0)],
+                     []]
+
+    def test_same_as_der(self):
+        for collar in [0.0, 0.1, 0.3]:
+            prepared = der.PreparedReference(self.ref, collar=collar)
+            for hyp in self.hyps:
+                expected = der.DER(self.ref, hyp, collar=collar,
+                                   detailed=True)
+                details = prepared.score(hyp)
+                self.assertEqual(expected.error_length, details.error_length)
+                self.assertEqual(expected.ref_length, details.ref_length)
+                self.assertEqual(expected.miss, details.miss)
+                self.assertEqual(expected.false_alarm, details.false_alarm)
+                self.assertEqual(expected.confusion, details.confusion)
+
+    def test_segment_array(self):
+        prepared = der.PreparedReference(
+            der.SegmentArray.from_tuples(self.ref), collar=0.1)
+        for hyp in self.hyps[:2]:
+            self.assertAlmostEqual(
+                der.DER(self.ref, hyp, collar=0.1),
+                prepared.score(der.SegmentArray.from_tuples(hyp)).der,
+                delta=1e-12)
+
+    def test_sparse_cost_matrix(self):
+        prepared = der.PreparedReference(self.ref)
+        hyp = self.hyps[0]
+        dense = prepared.build_cost_matrix(hyp)
+        sparse_matrix = prepared.build_cost_matrix(hyp, sparse_layout=True)
+        self.assertTrue(sparse.issparse(sparse_matrix))
+        np.testing.assert_array_equal(dense, sparse_matrix.toarray())
+
+    def test_sparse_path_same_as_dense(self):
+        expected = [der.DER(self.ref, hyp, collar=0.1) for hyp in self.hyps]
+        original = der.SPARSE_MIN_SIZE, der.SPARSE_MAX_DENSITY
+        der.SPARSE_MIN_SIZE, der.SPARSE_MAX_DENSITY = 0, 1.0
+        try:
+            for hyp, expected_der in zip(self.hyps, expected):
+                self.assertAlmostEqual(
+                    expected_der, der.DER(self.ref, hyp, collar=0.1),
+                    delta=1e-12)
+        finally:
+            der.SPARSE_MIN_SIZE, der.SPARSE_MAX_DENSITY = original
+
+    def test_attributes(self):
+        prepared = der.PreparedReference(self.ref, collar=0.0)
+        self.assertEqual(0.0, prepared.collar)
+        self.assertAlmostEqual(3.5, prepared.ref_length, delta=1e-12)
+        self.assertEqual({"A": 0, "B": 1, "C": 2}, prepared.ref_index)
+        self.assertEqual(4, len(prepared))
+        self.assertGreater(prepared.nbytes, 0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            der.PreparedReference([("A", 2.0, 1.0)])
+        prepared = der.PreparedReference(self.ref)
+        with self.assertRaises(TypeError):
+            prepared.score([("1", 0.0)])
+
+
+class TestDERMulti(unittest.TestCase):
+    """Tests for the DER_multi function."""
+
+    def setUp(self):
+        self.ref = [("A", 0.0, 1.0),
+                    ("B", 1.0, 1.5),
+                    ("A", 1.6, 2.1)]
+        self.hyps = [[("1", 0.0, 0.8),
+                      ("2", 0.8, 1.4),
+                      ("3", 1.5, 1.8),
+                      ("1", 1.8, 2.0)],
+                     [("1", 0.0, 2.1)],
+                     []]
+
+    def test_same_as_der(self):
+        for collar in [0.0, 0.2]:
+            expected = [der.DER(self.ref, hyp, collar=collar)
+                        for hyp in self.hyps]
+            self.assertEqual(expected,
+                             der.DER_multi(self.ref, self.hyps,
+                                           collar=collar))
+
+    def test_dict_detailed(self):
+        hyps = {"system_a": self.hyps[0], "system_b": self.hyps[1]}
+        results = der.DER_multi(self.ref, hyps, detailed=True)
+        self.assertEqual(["system_a", "system_b"], list(results))
+        self.assertAlmostEqual(0.35, results["system_a"].der, delta=1e-4)
+        self.assertEqual(der.DER(self.ref, hyps["system_b"]),
+                         results["system_b"].der)
+
+    def test_invalid_hyp(self):
+        with self.assertRaises(ValueError):
+            der.DER_multi(self.ref, [self.hyps[0], [("1", 2.0, 1.0)]])
+
+
+class TestJER(unittest.TestCase):
+    """Tests for Jaccard Error Rate."""
+
+    def setUp(self):
+        self.ref = [("A", 0.0, 1.0),
+                    ("B", 1.0, 2.0)]
+        self.hyp = [("1", 0.0, 1.5)]
+
+    def test_simple(self):
+        # A maps to 1 with Jaccard 1.0 / 1.5, and B is unmapped.
+        self.assertAlmostEqual((1.0 - 1.0 / 1.5 + 1.0) / 2.0,
+                               der.JER(self.ref, self.hyp), delta=1e-12)
+
+    def test_perfect(self):
+        self.assertEqual(0.0, der.JER(self.ref, [("1", 0.0, 1.0),
+                                                 ("2", 1.0, 2.0)]))
+
+    def test_empty(self):
+        self.assertEqual(1.0, der.JER(self.ref, []))
+        self.assertEqual(0.0, der.JER([], self.hyp))
+
+    def test_mapping_maximizes_jaccard(self):
+        # DER maps A to 2 for the larger overlap, but JER maps A to 1.
+        ref = [("A", 0.0, 10.0)]
+        hyp = [("1", 0.0, 4.0), ("2", 3.0, 100.0)]
+        self.assertAlmostEqual(0.6, der.JER(ref, hyp), delta=1e-12)
+
+    def test_sparse(self):
+        prepared = der.PreparedReference(self.ref)
+        hyp = [("1", 0.0, 0.5), ("2", 0.5, 1.5)]
+        cost_matrix, hyp_codes, num_hyp = prepared._build_cost_matrix(
+            hyp, sparse_layout=True)
+        starts, ends = der._start_end_arrays(hyp)
+        self.assertAlmostEqual(
+            der.JER(self.ref, hyp),
+            der.compute_jaccard_error_rate(
+                cost_matrix, prepared._durations,
+                der._speaker_durations(hyp_codes, starts, ends, num_hyp)),
+            delta=1e-12)
+
+    def test_der_and_jer(self):
+        for collar in [0.0, 0.1]:
+            der_value, jer_value = der.DER_and_JER(self.ref, self.hyp,
+                                                   collar=collar)
+            self.assertEqual(der.DER(self.ref, self.hyp, collar=collar),
+                             der_value)
+            self.assertEqual(der.JER(self.ref, self.hyp, collar=collar),
+                             jer_value)
+
+    def test_details(self):
+        self.assertIsNone(der.DER(self.ref, self.hyp, detailed=True).jer)
+        details = der.compute_der_details(self.ref, self.hyp, jer=True)
+        self.assertEqual(der.JER(self.ref, self.hyp), details.jer)
+        self.assertIn("jer=", repr(details))
+
+
+class TestUEM(unittest.TestCase):
+    """Tests for scoring only the regions of a UEM."""
+
+    def setUp(self):
+        self.ref = [("A", 0.0, 1.0),
+                    ("B", 1.0, 1.5),
+                    ("A", 1.6, 2.1)]
+        self.hyp = [("1", 0.0, 0.8),
+                    ("2", 0.8, 1.4),
+                    ("3", 1.5, 1.8),
+                    ("1", 1.8, 2.0)]
+
+    def test_same_as_trimmed_inputs(self):
+        uem = [(1.2, 1.9), (0.1, 0.5), (0.4, 0.6)]
+        outside = [(-np.inf, 0.1), (0.6, 1.2), (1.9, np.inf)]
+        for collar in [0.0, 0.05]:
+            exclusions = der._merge_interval_arrays(
+                *np.array(outside + der.compute_merged_exclusion_intervals(
+                    self.ref, collar)).T)
+            ref = der.subtract_intervals(self.ref, list(zip(*exclusions)))
+            hyp = der.subtract_intervals(self.hyp, list(zip(*exclusions)))
+            expected = der.DER(ref, hyp, detailed=True)
+            details = der.DER(self.ref, self.hyp, collar=collar, uem=uem,
+                              detailed=True)
+            self.assertAlmostEqual(expected.ref_length, details.ref_length,
+                                   delta=1e-12)
+            self.assertAlmostEqual(expected.error_length,
+                                   details.error_length, delta=1e-12)
+
+    def test_whole_recording(self):
+        self.assertEqual(der.DER(self.ref, self.hyp, collar=0.1),
+                         der.DER(self.ref, self.hyp, collar=0.1,
+                                 uem=[(-1.0, 10.0)]))
+
+    def test_empty(self):
+        details = der.DER(self.ref, self.hyp, uem=[], detailed=True)
+        self.assertEqual(0.0, details.ref_length)
+        self.assertEqual(0.0, details.error_length)
+
+    def test_frames(self):
+        uem = [(0.1, 0.6), (1.2, 1.9)]
+        self.assertAlmostEqual(
+            der.DER(self.ref, self.hyp, collar=0.05, uem=uem),
+            frames.compute_der_details(self.ref, self.hyp, 0.001,
+                                       collar=0.05, uem=uem).der,
+            delta=0.01)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            der.DER(self.ref, self.hyp, uem=[(2.0, 1.0)])
+        with self.assertRaises(TypeError):
+            der.DER(self.ref, self.hyp, uem=[(1.0, 2.0, 3.0)])
+
+
+class TestSkipOverlap(unittest.TestCase):
+    """Tests for not scoring overlapped reference speech."""
+
+    def setUp(self):
+        self.ref = [("A", 0.0, 2.0),
+                    ("B", 1.0, 3.0),
+                    ("C", 2.5, 4.0)]
+        self.hyp = [("1", 0.0, 3.0),
+                    ("2", 3.0, 4.0)]
+
+    def test_simple(self):
+        # [1.0, 2.0] and [2.5, 3.0] are not scored.
+        details = der.DER(self.ref, self.hyp, skip_overlap=True,
+                          detailed=True)
+        self.assertAlmostEqual(2.5, details.ref_length, delta=1e-12)
+        self.assertAlmostEqual(0.5, details.confusion, delta=1e-12)
+        self.assertAlmostEqual(0.5 / 2.5, details.der, delta=1e-12)
+
+    def test_same_as_trimmed_inputs(self):
+        exclusions = [(1.0, 2.0), (2.5, 3.0)]
+        self.assertAlmostEqual(
+            der.DER(der.subtract_intervals(self.ref, exclusions),
+                    der.subtract_intervals(self.hyp, exclusions)),
+            der.DER(self.ref, self.hyp, skip_overlap=True), delta=1e-12)
+
+    def test_with_collar_and_uem(self):
+        exclusions = [(-np.inf, 0.5), (0.9, 2.1), (2.4, 3.1), (3.5, np.inf)]
+        self.assertAlmostEqual(
+            der.DER(der.subtract_intervals(self.ref, exclusions),
+                    der.subtract_intervals(self.hyp, exclusions)),
+            der.DER(self.ref, self.hyp, collar=0.1, uem=[(0.5, 3.5)],
+                    skip_overlap=True),
+            delta=1e-12)
+
+    def test_no_overlap(self):
+        ref = [("A", 0.0, 1.0), ("B", 1.0, 2.0)]
+        self.assertEqual(der.DER(ref, self.hyp),
+                         der.DER(ref, self.hyp, skip_overlap=True))
+
+
+class TestIntegerTicks(unittest.TestCase):
+    """Tests for segments with integer tick times."""
+
+    def setUp(self):
+        self.ref = der.SegmentArray.from_tuples([("A", 0.0, 1.0),
+                                                 ("B", 1.0, 1.5),
+                                                 ("A", 1.6, 2.1)])
+        self.hyp = der.SegmentArray.from_tuples([("1", 0.0, 0.8),
+                                                 ("2", 0.8, 1.4),
+                                                 ("3", 1.5, 1.8),
+                                                 ("1", 1.8, 2.0)])
+
+    def test_same_as_seconds(self):
+        ref, hyp = self.ref.to_ticks(1000), self.hyp.to_ticks(1000)
+        for collar, tick_collar in [(0.0, 0), (0.1, 100)]:
+            expected = der.DER(self.ref, self.hyp, collar=collar,
+                               detailed=True)
+            details = der.DER(ref, hyp, collar=tick_collar, detailed=True)
+            self.assertAlmostEqual(expected.der, details.der, delta=1e-12)
+            self.assertAlmostEqual(expected.ref_length * 1000,
+                                   details.ref_length, delta=1e-9)
+        self.assertAlmostEqual(
+            der.DER(self.ref, self.hyp, uem=[(0.5, 1.9)], skip_overlap=True),
+            der.DER(ref, hyp, uem=[(500, 1900)], skip_overlap=True),
+            delta=1e-12)
+
+    def test_exclusions_keep_ticks(self):
+        ref = self.ref.to_ticks(1000)
+        for exclusions in [der._exclusion_arrays(ref, 100),
+                           der._exclusion_arrays(ref, 0, uem=[(500, 1900)]),
+                           der._exclusion_arrays(ref, 0, skip_overlap=True)]:
+            trimmed = der._subtract_intervals(ref, *exclusions)
+            self.assertEqual(np.int64, trimmed.start.dtype)
+            self.assertEqual(np.int64, trimmed.end.dtype)
+
+    def test_exact(self):
+        # 0.1 is not exact in binary, so the float lengths drift.
+        num_segments = 100000
+        starts = np.arange(num_segments) * 100000
+        ref = der.SegmentArray.from_arrays(["A"] * num_segments, starts,
+                                           starts + 100000)
+        hyp = der.SegmentArray.from_arrays(["1"] * num_segments,
+                                           starts + 50000, starts + 150000)
+        details = der.DER(ref, hyp, collar=30000, detailed=True)
+        self.assertEqual(4000000000.0, details.ref_length)
+        self.assertEqual(40000.0, details.error_length)
+
+    def test_ticks_against_seconds(self):
+        ref = self.ref.to_ticks()
+        with self.assertRaises(TypeError):
+            der.DER(ref, self.hyp)
+        with self.assertRaises(TypeError):
+            der.DER(self.ref, self.hyp.to_ticks())
+        with self.assertRaises(TypeError):
+            der.PreparedReference(ref).score(self.hyp.to_tuples())
+        # Empty inputs have no time kind.
+        self.assertEqual(1.0, der.DER(ref, []))
+
+    def test_float_collar(self):
+        ref, hyp = self.ref.to_ticks(1000), self.hyp.to_ticks(1000)
+        self.assertEqual(der.DER(ref, hyp, collar=100),
+                         der.DER(ref, hyp, collar=100.0))
+        exclusions = der._exclusion_arrays(ref, 100.0)
+        self.assertEqual(np.int64, exclusions[0].dtype)
+        with self.assertRaises(ValueError):
+            der.DER(ref, hyp, collar=100.5)
+        with self.assertRaises(ValueError):
+            der.DER(ref, hyp, uem=[(500.5, 1900)])
+
+    def test_mixed_types(self):
+        ref = der.SegmentArray(self.ref.speakers, self.ref.labels,
+                               self.ref.to_ticks().start, self.ref.end)
+        with self.assertRaises(TypeError):
+            der.check_input(ref)
+
 
 class TestComputeMergedExclusionIntervals(unittest.TestCase):
     def test_basic(self):
@@ -385,6 +1022,32 @@ class TestSubtractIntervals(unittest.TestCase):
         self.assertEqual(expected,
                          der.subtract_intervals(segments, exclusions))
 
+    def test_many_segments(self):
+        segments = [("A", 0.0, 3.0),
+                    ("B", 3.0, 10.0),
+                    ("C", 4.5, 5.5),
+                    ("D", 7.0, 7.0),
+                    ("E", 12.0, 13.0)]
+        exclusions = [(1.0, 2.0), (4.0, 6.0), (8.0, 9.0)]
+        expected = [("A", 0.0, 1.0), ("A", 2.0, 3.0),
+                    ("B", 3.0, 4.0), ("B", 6.0, 8.0), ("B", 9.0, 10.0),
+                    ("E", 12.0, 13.0)]
+        self.assertEqual(expected,
+                         der.subtract_intervals(segments, exclusions))
+
+    def test_no_exclusions(self):
+        segments = [("A", 0.0, 10.0)]
+        self.assertEqual(segments, der.subtract_intervals(segments, []))
+
+    def test_segment_array(self):
+        segments = der.SegmentArray.from_tuples([("A", 0.0, 10.0),
+                                                 ("B", 4.5, 5.5)])
+        exclusions = [(4.0, 6.0)]
+        expected = [("A", 0.0, 4.0), ("A", 6.0, 10.0)]
+        result = der.subtract_intervals(segments, exclusions)
+        self.assertIsInstance(result, der.SegmentArray)
+        self.assertEqual(expected, result.to_tuples())
+
 
 if __name__ == "__main__":
     unittest.main()
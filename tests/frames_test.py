@@ -0,0 +1,119 @@
+import numpy as np
+import unittest
+
+from simpleder import der
+from simpleder import frames
+
+
+REF = [("A", 0.0, 1.0),
+       ("B", 1.0, 1.5),
+       ("A", 1.6, 2.1),
+       ("C", 3.0, 4.5)]
+HYP = [("1", 0.0, 0.8),
+       ("2", 0.8, 1.4),
+       ("3", 1.5, 1.8),
+       ("1", 1.8, 2.0),
+       ("2", 2.9, 4.0)]
+
+
+def _random_segments(rng, speakers, num_segments):
+    segments = []
+    for speaker in speakers:
+        time = rng.uniform(0.0, 1.0)
+        for _ in range(num_segments):
+            start = time + rng.uniform(0.0, 1.0)
+            time = start + rng.uniform(0.0, 2.0)
+            segments.append((speaker, start, time))
+    return segments
+
+
+class TestComputeDERDetails(unittest.TestCase):
+    """Tests for the frames.compute_der_details function."""
+
+    def test_exact_on_frame_grid(self):
+        # All boundaries and collars are multiples of the resolution.
+        for collar in [0.0, 0.1, 0.2]:
+            expected = der.DER(REF, HYP, collar=collar, detailed=True)
+            details = frames.compute_der_details(REF, HYP, 0.1, collar=collar)
+            for name in ["ref_length", "miss", "false_alarm", "confusion",
+                         "error_length"]:
+                self.assertAlmostEqual(getattr(expected, name),
+                                       getattr(details, name), delta=1e-9)
+
+    def test_error_bound(self):
+        rng = np.random.default_rng(0)
+        for resolution in [0.01, 0.1, 0.5]:
+            ref = _random_segments(rng, ["A", "B", "C"], 20)
+            hyp = _random_segments(rng, ["1", "2", "3", "4"], 20)
+            expected = der.DER(ref, hyp, detailed=True)
+            details = frames.compute_der_details(ref, hyp, resolution)
+            self.assertLessEqual(
+                abs(expected.error_length - details.error_length),
+                2 * resolution * (len(ref) + len(hyp)))
+            self.assertLessEqual(
+                abs(expected.ref_length - details.ref_length),
+                resolution * len(ref))
+
+    def test_collar(self):
+        self.assertAlmostEqual(
+            der.DER(REF, HYP, collar=0.1),
+            frames.compute_der_details(REF, HYP, 0.05, collar=0.1).der,
+            delta=1e-9)
+
+    def test_segment_array(self):
+        self.assertAlmostEqual(
+            der.DER(REF, HYP),
+            frames.compute_der_details(der.SegmentArray.from_tuples(REF),
+                                       der.SegmentArray.from_tuples(HYP),
+                                       0.1).der,
+            delta=1e-9)
+
+    def test_empty(self):
+        self.assertEqual(0.0, frames.compute_der_details([], [], 0.1).der)
+        self.assertAlmostEqual(
+            1.0, frames.compute_der_details(REF, [], 0.1).der, delta=1e-9)
+
+    def test_invalid_resolution(self):
+        with self.assertRaises(ValueError):
+            frames.compute_der_details(REF, HYP, 0.0)
+
+
+class TestDERFrames(unittest.TestCase):
+    """Tests for the DER_frames function."""
+
+    def test_activity(self):
+        ref_activity = np.array([[1, 1, 1, 1, 0, 0],
+                                 [0, 0, 0, 1, 1, 1]], dtype=bool)
+        hyp_activity = np.array([[1, 1, 1, 0, 0, 0],
+                                 [0, 0, 1, 1, 1, 0],
+                                 [0, 0, 0, 0, 0, 1]], dtype=bool)
+        details = frames.DER_frames(ref_activity, hyp_activity,
+                                    resolution=0.5, detailed=True)
+        self.assertAlmostEqual(3.5, details.ref_length, delta=1e-12)
+        # Frame 3 is missed, frame 2 is a false alarm, and frame 5 is
+        # confused after mapping each reference speaker to the hypothesis
+        # speaker of the same row.
+        self.assertAlmostEqual(0.5, details.miss, delta=1e-12)
+        self.assertAlmostEqual(0.5, details.false_alarm, delta=1e-12)
+        self.assertAlmostEqual(0.5, details.confusion, delta=1e-12)
+        self.assertAlmostEqual(1.5, details.error_length, delta=1e-12)
+        self.assertAlmostEqual(1.5 / 3.5, frames.DER_frames(
+            ref_activity, hyp_activity, resolution=0.5), delta=1e-12)
+
+    def test_scored(self):
+        ref_activity = np.array([[1, 1, 0, 0]], dtype=bool)
+        hyp_activity = np.array([[0, 1, 1, 0]], dtype=bool)
+        scored = np.array([False, True, True, True])
+        details = frames.DER_frames(ref_activity, hyp_activity,
+                                    resolution=1.0, scored=scored,
+                                    detailed=True)
+        self.assertAlmostEqual(1.0, details.ref_length, delta=1e-12)
+        self.assertAlmostEqual(1.0, details.false_alarm, delta=1e-12)
+
+    def test_shape_mismatch(self):
+        with self.assertRaises(ValueError):
+            frames.DER_frames(np.zeros((1, 3)), np.zeros((1, 4)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+from simpleder import der
+from simpleder import online
+
+
+REF = [("A", 0.0, 1.0),
+       ("B", 1.0, 1.5),
+       ("A", 1.6, 2.1),
+       ("B", 3.0, 4.0),
+       ("C", 3.5, 6.0)]
+HYP = [("1", 0.0, 0.8),
+       ("2", 0.8, 1.4),
+       ("3", 1.5, 1.8),
+       ("1", 1.8, 2.0),
+       ("2", 3.2, 5.0),
+       ("3", 4.5, 6.5)]
+
+
+def _add_all(online_der, ref, hyp):
+    events = [(start, online_der.add_ref, (speaker, start, end))
+              for speaker, start, end in ref]
+    events += [(start, online_der.add_hyp, (speaker, start, end))
+               for speaker, start, end in hyp]
+    for _, add, segment in sorted(events, key=lambda event: event[0]):
+        add(*segment)
+        online_der.current()
+
+
+class TestOnlineDER(unittest.TestCase):
+    """Tests for the OnlineDER class."""
+
+    def test_empty(self):
+        self.assertEqual(0.0, online.OnlineDER().current())
+
+    def test_matches_batch(self):
+        online_der = online.OnlineDER()
+        _add_all(online_der, REF, HYP)
+        self.assertAlmostEqual(der.DER(REF, HYP), online_der.current(),
+                               delta=0.0001)
+
+    def test_matches_batch_with_horizon(self):
+        online_der = online.OnlineDER(horizon=1.0)
+        _add_all(online_der, REF, HYP)
+        self.assertAlmostEqual(der.DER(REF, HYP), online_der.current(),
+                               delta=0.0001)
+        # Segments that ended before the horizon are freed.
+        self.assertLess(online_der._ref.size, len(REF))
+
+    def test_segment_before_horizon(self):
+        online_der = online.OnlineDER(horizon=1.0)
+        online_der.add_ref("A", 5.0, 6.0)
+        online_der.current()
+        with self.assertRaises(ValueError):
+            online_der.add_hyp("1", 3.0, 4.5)
+
+    def test_invalid_segment(self):
+        online_der = online.OnlineDER()
+        with self.assertRaises(ValueError):
+            online_der.add_ref("A", 2.0, 1.0)
+        with self.assertRaises(TypeError):
+            online_der.add_hyp(1, 0.0, 1.0)
+
+    def test_same_speaker_intersect(self):
+        cases = [[("A", 0.0, 2.0), ("A", 1.0, 3.0)],
+                 [("A", 1.0, 3.0), ("A", 0.0, 2.0)],
+                 [("A", 0.0, 2.0), ("B", 1.0, 3.0)],
+                 [("A", 0.0, 1.0), ("A", 1.0, 2.0), ("A", 1.5, 1.5)],
+                 [("A", 1.0, 1.0), ("A", 0.0, 2.0)]]
+        for segments in cases:
+            try:
+                der.check_input(segments)
+                expected = None
+            except ValueError:
+                expected = ValueError
+            for add in ["add_ref", "add_hyp"]:
+                online_der = online.OnlineDER()
+                try:
+                    for segment in segments:
+                        getattr(online_der, add)(*segment)
+                    error = None
+                except ValueError:
+                    error = ValueError
+                self.assertEqual(expected, error, msg=str(segments))
+
+
+if __name__ == "__main__":
+    unittest.main()
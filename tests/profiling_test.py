@@ -0,0 +1,62 @@
+import unittest
+
+from simpleder import der
+from simpleder import profiling
+
+
+REF = [("A", 0.0, 1.0),
+       ("B", 1.0, 1.5),
+       ("A", 1.6, 2.1)]
+HYP = [("1", 0.0, 0.8),
+       ("2", 0.8, 1.4),
+       ("3", 1.5, 1.8),
+       ("1", 1.8, 2.0)]
+
+
+class TestDERStats(unittest.TestCase):
+    """Tests for the DERStats collector."""
+
+    def test_stages_without_collar(self):
+        stats = profiling.DERStats()
+        error = der.DER(REF, HYP, stats=stats)
+        self.assertAlmostEqual(der.DER(REF, HYP), error, delta=1e-12)
+        stages = [record[0] for record in stats.records]
+        self.assertEqual(["check_input", "prepare_reference",
+                          "build_cost_matrix", "assignment", "load"], stages)
+        infos = {record[0]: record[2] for record in stats.records}
+        self.assertEqual(3, infos["check_input"]["ref_segments"])
+        self.assertEqual(4, infos["check_input"]["hyp_segments"])
+        self.assertEqual((2, 3),
+                         infos["build_cost_matrix"]["cost_matrix_shape"])
+        self.assertEqual(3, infos["build_cost_matrix"]["hyp_speakers"])
+        for _, seconds, _ in stats.records:
+            self.assertGreaterEqual(seconds, 0.0)
+
+    def test_collar_without_validation(self):
+        stats = profiling.DERStats()
+        der.DER(REF, HYP, collar=0.1, validate=False, stats=stats)
+        stages = [record[0] for record in stats.records]
+        self.assertEqual(["prepare_reference", "collar", "build_cost_matrix",
+                          "assignment", "load"], stages)
+        info = stats.records[0][2]
+        self.assertEqual(4, info["exclusions"])
+        self.assertEqual(3, info["ref_segments"])
+
+    def test_callback_and_seconds(self):
+        calls = []
+        stats = profiling.DERStats(
+            callback=lambda stage, seconds, info: calls.append(stage))
+        der.DER(REF, HYP, stats=stats)
+        der.compute_error_and_reference_length(REF, HYP, stats=stats)
+        self.assertEqual(10, len(calls))
+        self.assertEqual(calls, [record[0] for record in stats.records])
+        totals = stats.seconds()
+        self.assertEqual(["check_input", "prepare_reference",
+                          "build_cost_matrix", "assignment", "load"],
+                         list(totals))
+        stats.clear()
+        self.assertEqual([], stats.records)
+
+
+if __name__ == "__main__":
+    unittest.main()
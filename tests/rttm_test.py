@@ -0,0 +1,80 @@
+import io
+import unittest
+
+from simpleder import rttm
+
+REF_RTTM = """SPEAKER file1 1 0.00 1.00 <NA> <NA> A <NA> <NA>
+SPEAKER file1 1 1.00 0.50 <NA> <NA> B <NA> <NA>
+SPEAKER file1 1 1.60 0.50 <NA> <NA> A <NA> <NA>
+SPEAKER file2 1 0.00 2.00 <NA> <NA> C <NA> <NA>
+SPEAKER file3 1 0.00 1.00 <NA> <NA> D <NA> <NA>
+"""
+
+HYP_RTTM = """SPEAKER file2 1 0.00 2.00 <NA> <NA> 1 <NA> <NA>
+SPEAKER file1 1 0.00 0.80 <NA> <NA> 1 <NA> <NA>
+SPEAKER file1 1 0.80 0.60 <NA> <NA> 2 <NA> <NA>
+SPEAKER file4 1 0.00 1.00 <NA> <NA> 1 <NA> <NA>
+"""
+
+
+class TestIterRttm(unittest.TestCase):
+    """Tests for the iter_rttm function."""
+
+    def test_tuples(self):
+        groups = list(rttm.iter_rttm(io.StringIO(REF_RTTM)))
+        self.assertEqual(["file1", "file2", "file3"],
+                         [file_id for file_id, _ in groups])
+        self.assertEqual([("A", 0.0, 1.0), ("B", 1.0, 1.5), ("A", 1.6, 2.1)],
+                         groups[0][1])
+
+    def test_arrays(self):
+        groups = list(rttm.iter_rttm(io.StringIO(REF_RTTM), as_arrays=True))
+        self.assertEqual(3, len(groups[0][1]))
+        self.assertEqual([("C", 0.0, 2.0)], groups[1][1].to_tuples())
+
+    def test_ignores_other_lines(self):
+        text = ("SPKR-INFO file1 1 <NA> <NA> <NA> unknown A <NA> <NA>\n"
+                "\n"
+                "SPEAKER file1 1 0.00 1.00 <NA> <NA> A <NA> <NA>\n")
+        groups = list(rttm.iter_rttm(io.StringIO(text)))
+        self.assertEqual([("file1", [("A", 0.0, 1.0)])], groups)
+
+    def test_not_contiguous(self):
+        text = ("SPEAKER file1 1 0.00 1.00 <NA> <NA> A <NA> <NA>\n"
+                "SPEAKER file2 1 0.00 1.00 <NA> <NA> A <NA> <NA>\n"
+                "SPEAKER file1 1 2.00 1.00 <NA> <NA> A <NA> <NA>\n")
+        with self.assertRaises(ValueError):
+            list(rttm.iter_rttm(io.StringIO(text)))
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            list(rttm.iter_rttm(io.StringIO("SPEAKER file1 1 0.00\n")))
+
+
+class TestIterRttmPairs(unittest.TestCase):
+    """Tests for the iter_rttm_pairs function."""
+
+    def test_example(self):
+        pairs = list(rttm.iter_rttm_pairs(io.StringIO(REF_RTTM),
+                                          io.StringIO(HYP_RTTM)))
+        self.assertEqual(["file2", "file1", "file3"],
+                         [file_id for file_id, _, _ in pairs])
+        self.assertEqual([("1", 0.0, 2.0)], pairs[0][2])
+        self.assertEqual(2, len(pairs[1][2]))
+        self.assertEqual([], pairs[2][2])
+
+
+class TestReadUem(unittest.TestCase):
+    """Tests for the read_uem function."""
+
+    def test_example(self):
+        text = ("file1 1 0.00 10.00\n"
+                "file1 1 20.00 30.00\n"
+                "file2 1 0.00 5.00\n")
+        expected = {"file1": [(0.0, 10.0), (20.0, 30.0)],
+                    "file2": [(0.0, 5.0)]}
+        self.assertEqual(expected, rttm.read_uem(io.StringIO(text)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import numpy as np
+import unittest
+
+from simpleder import segments
+
+
+class TestSegmentArray(unittest.TestCase):
+    """Tests for the SegmentArray class."""
+
+    def test_from_tuples(self):
+        hyp = [("B", 1.0, 3.0),
+               ("A", 4.0, 5.0),
+               ("B", 7.0, 9.0)]
+        array = segments.SegmentArray.from_tuples(hyp)
+        self.assertEqual(3, len(array))
+        self.assertEqual(("A", "B"), array.labels)
+        np.testing.assert_array_equal([1, 0, 1], array.speakers)
+        np.testing.assert_array_equal([1.0, 4.0, 7.0], array.start)
+        np.testing.assert_array_equal([3.0, 5.0, 9.0], array.end)
+        self.assertEqual(np.float64, array.start.dtype)
+        self.assertEqual(hyp, array.to_tuples())
+
+    def test_from_tuples_empty(self):
+        array = segments.SegmentArray.from_tuples([])
+        self.assertEqual(0, len(array))
+        self.assertEqual([], array.to_tuples())
+
+    def test_from_arrays_with_labels(self):
+        array = segments.SegmentArray.from_arrays(
+            np.array([0, 1]), np.array([0.0, 1.0]), np.array([1.0, 2.0]),
+            labels=["x", "y"])
+        self.assertEqual([("x", 0.0, 1.0), ("y", 1.0, 2.0)],
+                         array.to_tuples())
+
+    def test_from_dataframe(self):
+        data_frame = {"speaker": ["b", "a"],
+                      "start": [0.0, 1.0],
+                      "end": [1.0, 2.0]}
+        array = segments.SegmentArray.from_dataframe(data_frame)
+        self.assertEqual([("b", 0.0, 1.0), ("a", 1.0, 2.0)],
+                         array.to_tuples())
+
+    def test_take(self):
+        array = segments.SegmentArray.from_tuples(
+            [("A", 0.0, 1.0), ("B", 1.0, 2.0), ("A", 2.0, 3.0)])
+        subset = array.take(np.array([False, True, True]))
+        self.assertEqual([("B", 1.0, 2.0), ("A", 2.0, 3.0)],
+                         subset.to_tuples())
+
+    def test_integer_ticks(self):
+        array = segments.SegmentArray.from_arrays(
+            ["A", "B"], np.array([0, 5], dtype=np.int32),
+            np.array([5, 9], dtype=np.int32))
+        self.assertEqual(np.int32, array.start.dtype)
+        self.assertEqual(np.int32, array.end.dtype)
+        # Lists of Python numbers are still seconds.
+        array = segments.SegmentArray.from_arrays(["A"], [0], [5])
+        self.assertEqual(np.float64, array.start.dtype)
+
+    def test_to_ticks(self):
+        array = segments.SegmentArray.from_tuples(
+            [("A", 0.1, 0.3), ("B", 0.3, 1.7)])
+        ticks = array.to_ticks()
+        self.assertEqual(np.int64, ticks.start.dtype)
+        self.assertEqual([("A", 100000, 300000), ("B", 300000, 1700000)],
+                         ticks.to_tuples())
+        self.assertEqual([("A", 1600, 4800), ("B", 4800, 27200)],
+                         array.to_ticks(rate=16000).to_tuples())
+
+
+if __name__ == "__main__":
+    unittest.main()
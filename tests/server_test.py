@@ -0,0 +1,187 @@
+import asyncio
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from simpleder import der
+from simpleder import segments
+from simpleder import server
+
+REF_RTTM = """SPEAKER file1 1 0.00 1.00 <NA> <NA> A <NA> <NA>
+SPEAKER file1 1 1.00 0.50 <NA> <NA> B <NA> <NA>
+SPEAKER file1 1 1.60 0.50 <NA> <NA> A <NA> <NA>
+SPEAKER file2 1 0.00 2.00 <NA> <NA> C <NA> <NA>
+"""
+
+HYP_RTTM = """SPEAKER file2 1 0.00 2.00 <NA> <NA> 1 <NA> <NA>
+SPEAKER file1 1 0.00 0.80 <NA> <NA> 1 <NA> <NA>
+SPEAKER file1 1 0.80 0.60 <NA> <NA> 2 <NA> <NA>
+"""
+
+REF = [("A", 0.0, 1.0), ("B", 1.0, 1.5), ("A", 1.6, 2.1)]
+HYP = [("1", 0.0, 0.8), ("2", 0.8, 1.4), ("3", 1.5, 1.8),
+       ("1", 1.8, 2.0)]
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires Unix sockets")
+class TestScoringServer(unittest.TestCase):
+    """Tests for the scoring server and client."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "simpleder.sock")
+        self.server = server.ScoringServer(self.path, workers=2)
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.server.start())
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+        self.client = server.ScoringClient(self.path, fallback=False)
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.drain(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.server.close()
+        self.loop.close()
+        shutil.rmtree(self.directory)
+
+    async def drain(self):
+        """Wait for the connection handlers to finish."""
+        tasks = asyncio.all_tasks() - {asyncio.current_task()}
+        await asyncio.gather(*tasks)
+
+    async def restart(self):
+        """Restart listening, e.g. with a new request limit."""
+        self.server._server.close()
+        await self.server._server.wait_closed()
+        await self.server.start()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as file_object:
+            file_object.write(content)
+        return path
+
+    def test_ping(self):
+        self.assertTrue(self.client.ping())
+
+    def test_der(self):
+        for collar in [0.0, 0.1]:
+            self.assertEqual(der.DER(REF, HYP, collar=collar),
+                             self.client.DER(REF, HYP, collar=collar))
+
+    def test_der_segment_array(self):
+        self.assertEqual(
+            der.DER(REF, HYP),
+            self.client.DER(segments.SegmentArray.from_tuples(REF),
+                            segments.SegmentArray.from_tuples(HYP)))
+
+    def test_der_detailed_with_ref_key(self):
+        expected = der.DER(REF, HYP, detailed=True)
+        for _ in range(2):
+            details = self.client.DER(REF, HYP, ref_key=("file1", 0),
+                                      detailed=True)
+            self.assertEqual(expected.ref_length, details.ref_length)
+            self.assertEqual(expected.confusion, details.confusion)
+            self.assertEqual(expected.der, details.der)
+        self.assertEqual(1, len(self.server._references))
+
+    def test_ref_key_sends_reference_once(self):
+        requests = []
+        request = self.client._request
+
+        def record(message):
+            requests.append(dict(message))
+            return request(message)
+
+        self.client._request = record
+        for _ in range(2):
+            self.assertEqual(der.DER(REF, HYP),
+                             self.client.DER(REF, HYP, ref_key="file1"))
+        # The first call is retried with the reference; the second one is
+        # answered from the cache without it.
+        self.assertEqual([False, True, False],
+                         ["ref" in message for message in requests])
+
+    def test_missing_reference_without_ref_key(self):
+        with self.assertRaises(KeyError):
+            self.client._request({"method": "der", "hyp": HYP})
+
+    def test_concurrent_clients(self):
+        results = [None] * 8
+
+        def run(i):
+            results[i] = self.client.DER(REF, HYP, ref_key="file1")
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([der.DER(REF, HYP)] * 8, results)
+
+    def test_error_is_raised_by_client(self):
+        with self.assertRaises(ValueError):
+            self.client.DER([("A", 1.0, 0.5)], HYP)
+
+    def test_large_request(self):
+        ref = [("A", 2.0 * i, 2.0 * i + 1.0) for i in range(5000)]
+        hyp = [("1", 2.0 * i + 0.5, 2.0 * i + 1.5) for i in range(5000)]
+        self.assertEqual(der.DER(ref, hyp), self.client.DER(ref, hyp))
+
+    def test_request_too_large(self):
+        self.server.max_request_bytes = 1024
+        future = asyncio.run_coroutine_threadsafe(self.restart(), self.loop)
+        future.result()
+        ref = [("A", 2.0 * i, 2.0 * i + 1.0) for i in range(100)]
+        with self.assertRaises((ValueError, ConnectionError)):
+            self.client.DER(ref, ref)
+
+    def test_missing_rttm(self):
+        hyp_path = self.write("hyp.rttm", HYP_RTTM)
+        with self.assertRaises(FileNotFoundError):
+            self.client.DER_rttm(os.path.join(self.directory, "missing"),
+                                 hyp_path)
+
+    def test_der_rttm(self):
+        ref_path = self.write("ref.rttm", REF_RTTM)
+        hyp_path = self.write("hyp.rttm", HYP_RTTM)
+        result = self.client.DER_rttm(ref_path, hyp_path)
+        fallback = server.ScoringClient(
+            os.path.join(self.directory, "missing.sock")).DER_rttm(
+                ref_path, hyp_path)
+        self.assertAlmostEqual(fallback["der"], result["der"], places=12)
+        self.assertEqual(fallback["ders"], result["ders"])
+        # The parsed reference file is cached.
+        self.client.DER_rttm(ref_path, hyp_path, collar=0.1)
+        self.assertEqual(1, len(self.server._corpora))
+
+
+class TestScoringClientFallback(unittest.TestCase):
+    """Tests for the client without a server."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "missing.sock")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fallback(self):
+        client = server.ScoringClient(self.path)
+        self.assertFalse(client.ping())
+        self.assertEqual(der.DER(REF, HYP, collar=0.1),
+                         client.DER(REF, HYP, collar=0.1))
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires Unix sockets")
+    def test_no_fallback(self):
+        client = server.ScoringClient(self.path, fallback=False)
+        with self.assertRaises(ConnectionError):
+            client.DER(REF, HYP)
+
+
+if __name__ == "__main__":
+    unittest.main()
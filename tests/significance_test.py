@@ -0,0 +1,103 @@
+import numpy as np
+import unittest
+
+from simpleder import corpus
+from simpleder import significance
+
+
+def _corpus_result(errors, ref_lengths, file_ids=None):
+    if file_ids is None:
+        file_ids = list(range(len(errors)))
+    return corpus.CorpusResult(file_ids, errors, ref_lengths)
+
+
+class TestBootstrap(unittest.TestCase):
+    """Tests for the bootstrap function."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        ref_lengths = rng.uniform(10.0, 100.0, 200)
+        self.result = _corpus_result(
+            ref_lengths * rng.uniform(0.1, 0.3, 200), ref_lengths)
+
+    def test_interval(self):
+        bootstrap = significance.bootstrap(self.result, num_samples=500,
+                                           seed=1)
+        self.assertEqual(self.result.der, bootstrap.der)
+        self.assertEqual((500,), bootstrap.samples.shape)
+        self.assertLess(bootstrap.low, bootstrap.der)
+        self.assertGreater(bootstrap.high, bootstrap.der)
+        self.assertLess(bootstrap.high - bootstrap.low, 0.05)
+
+    def test_seed(self):
+        first = significance.bootstrap(self.result, num_samples=100, seed=3)
+        second = significance.bootstrap(self.result, num_samples=100, seed=3)
+        np.testing.assert_array_equal(first.samples, second.samples)
+
+    def test_batches_and_workers(self):
+        original = significance._MAX_BATCH_ELEMENTS
+        significance._MAX_BATCH_ELEMENTS = 1000
+        try:
+            serial = significance.bootstrap(self.result, num_samples=50,
+                                            seed=2)
+            parallel = significance.bootstrap(self.result, num_samples=50,
+                                              seed=2, workers=2)
+        finally:
+            significance._MAX_BATCH_ELEMENTS = original
+        np.testing.assert_array_equal(serial.samples, parallel.samples)
+
+    def test_single_file(self):
+        bootstrap = significance.bootstrap(_corpus_result([1.0], [4.0]),
+                                           num_samples=10, seed=0)
+        np.testing.assert_allclose(np.full(10, 0.25), bootstrap.samples)
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            significance.bootstrap(_corpus_result([], []))
+
+
+class TestPairedBootstrap(unittest.TestCase):
+    """Tests for the paired_bootstrap function."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.ref_lengths = rng.uniform(10.0, 100.0, 100)
+        self.errors = self.ref_lengths * rng.uniform(0.1, 0.3, 100)
+        self.file_ids = ["file{}".format(i) for i in range(100)]
+        self.result_a = _corpus_result(self.errors, self.ref_lengths,
+                                       self.file_ids)
+
+    def test_same_system(self):
+        paired = significance.paired_bootstrap(
+            self.result_a, self.result_a, num_samples=200, seed=0)
+        self.assertEqual(0.0, paired.difference)
+        np.testing.assert_array_equal(np.zeros(200), paired.samples)
+        self.assertEqual(1.0, paired.p_value)
+
+    def test_better_system(self):
+        result_b = _corpus_result(self.errors * 0.9, self.ref_lengths,
+                                  self.file_ids)
+        paired = significance.paired_bootstrap(
+            self.result_a, result_b, num_samples=200, seed=0)
+        self.assertLess(paired.difference, 0.0)
+        self.assertLess(paired.high, 0.0)
+        self.assertEqual(0.0, paired.p_value)
+
+    def test_aligns_file_ids(self):
+        order = np.arange(100)[::-1]
+        result_b = _corpus_result(
+            self.errors[order], self.ref_lengths[order],
+            [self.file_ids[i] for i in order])
+        paired = significance.paired_bootstrap(
+            self.result_a, result_b, num_samples=50, seed=0)
+        np.testing.assert_allclose(np.zeros(50), paired.samples, atol=1e-12)
+
+    def test_different_files(self):
+        result_b = _corpus_result(self.errors, self.ref_lengths,
+                                  list(range(100)))
+        with self.assertRaises(ValueError):
+            significance.paired_bootstrap(self.result_a, result_b)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from simpleder import corpus
+from simpleder import der
+from simpleder import store
+
+REF_RTTM = """SPEAKER file1 1 0.00 1.00 <NA> <NA> A <NA> <NA>
+SPEAKER file1 1 1.00 0.50 <NA> <NA> B <NA> <NA>
+SPEAKER file1 1 1.60 0.50 <NA> <NA> A <NA> <NA>
+SPEAKER file2 1 0.00 2.00 <NA> <NA> C <NA> <NA>
+SPEAKER file3 1 0.00 1.00 <NA> <NA> D <NA> <NA>
+"""
+
+HYP_RTTM = """SPEAKER file2 1 0.00 2.00 <NA> <NA> 1 <NA> <NA>
+SPEAKER file1 1 0.00 0.80 <NA> <NA> 1 <NA> <NA>
+SPEAKER file1 1 0.80 0.60 <NA> <NA> 2 <NA> <NA>
+SPEAKER file4 1 0.00 1.00 <NA> <NA> 1 <NA> <NA>
+"""
+
+
+class TestSegmentStore(unittest.TestCase):
+    """Tests for writing and reading segment stores."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.ref_path = os.path.join(self.directory, "ref")
+        self.hyp_path = os.path.join(self.directory, "hyp")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        recordings = [("a", [("A", 0.0, 1.0), ("B", 1.0, 1.5)]),
+                      ("b", der.SegmentArray.from_tuples([("C", 0.0, 2.0)])),
+                      ("c", [])]
+        store.write_store(self.ref_path, recordings)
+        segment_store = store.SegmentStore(self.ref_path)
+        self.assertEqual(["a", "b", "c"], segment_store.file_ids)
+        self.assertEqual(3, len(segment_store))
+        self.assertIn("b", segment_store)
+        self.assertNotIn("d", segment_store)
+        self.assertEqual([("A", 0.0, 1.0), ("B", 1.0, 1.5)],
+                         segment_store["a"].to_tuples())
+        self.assertEqual([("C", 0.0, 2.0)], segment_store["b"].to_tuples())
+        self.assertEqual([], segment_store["c"].to_tuples())
+        self.assertIsNone(segment_store.get("d"))
+        with self.assertRaises(KeyError):
+            segment_store["d"]
+
+    def test_zero_copy(self):
+        store.write_store(self.ref_path, [("a", [("A", 0.0, 1.0)]),
+                                          ("b", [("B", 2.0, 3.0)])])
+        segment_store = store.SegmentStore(self.ref_path)
+        recording = segment_store["b"]
+        columns = segment_store._columns
+        self.assertIsInstance(columns["starts"], np.memmap)
+        self.assertTrue(np.shares_memory(recording.start, columns["starts"]))
+        self.assertTrue(np.shares_memory(recording.end, columns["ends"]))
+        self.assertTrue(
+            np.shares_memory(recording.speakers, columns["speakers"]))
+
+    def test_rewrite_while_mapped(self):
+        ref = [("A", 2.0 * i, 2.0 * i + 1.0) for i in range(1000)]
+        store.write_store(self.ref_path, [("f", ref)])
+        old_store = store.SegmentStore(self.ref_path)
+        # Rewriting must not truncate the files mapped by `old_store`.
+        store.write_store(self.ref_path, [("f", ref[:10])])
+        self.assertEqual(ref, old_store["f"].to_tuples())
+        self.assertEqual(ref[:10],
+                         store.SegmentStore(self.ref_path)["f"].to_tuples())
+        self.assertEqual(
+            sorted(["index.json", "speakers.i32", "starts.f64", "ends.f64"]),
+            sorted(os.listdir(self.ref_path)))
+
+    def test_failed_rewrite_keeps_store(self):
+        store.write_store(self.ref_path, [("f", [("A", 0.0, 1.0)])])
+        with self.assertRaises(ValueError):
+            store.write_store(self.ref_path, [("f", []), ("f", [])])
+        self.assertEqual([("A", 0.0, 1.0)],
+                         store.SegmentStore(self.ref_path)["f"].to_tuples())
+        self.assertEqual(4, len(os.listdir(self.ref_path)))
+
+    def test_pickle_by_path(self):
+        segment_store = store.convert_rttm(io.StringIO(REF_RTTM),
+                                           self.ref_path)
+        data = pickle.dumps(segment_store)
+        self.assertLess(len(data), 200 + len(self.ref_path))
+        copy = pickle.loads(data)
+        self.assertEqual(segment_store.file_ids, copy.file_ids)
+        self.assertEqual(segment_store["file1"].to_tuples(),
+                         copy["file1"].to_tuples())
+
+    def test_empty(self):
+        store.write_store(self.ref_path, [])
+        segment_store = store.SegmentStore(self.ref_path)
+        self.assertEqual(0, len(segment_store))
+
+    def test_duplicate_file_id(self):
+        with self.assertRaises(ValueError):
+            store.write_store(self.ref_path, [("a", [("A", 0.0, 1.0)]),
+                                              ("a", [("A", 2.0, 3.0)])])
+
+    def test_unknown_version(self):
+        store.write_store(self.ref_path, [])
+        with open(os.path.join(self.ref_path, "index.json"), "w") as f:
+            json.dump({"version": 0}, f)
+        with self.assertRaises(ValueError):
+            store.SegmentStore(self.ref_path)
+
+
+class TestDERStores(unittest.TestCase):
+    """Tests for the DER_stores function."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.ref_store = store.convert_rttm(
+            io.StringIO(REF_RTTM), os.path.join(self.directory, "ref"))
+        self.hyp_store = store.convert_rttm(
+            io.StringIO(HYP_RTTM), os.path.join(self.directory, "hyp"))
+        self.pairs = {
+            "file1": ([("A", 0.0, 1.0), ("B", 1.0, 1.5), ("A", 1.6, 2.1)],
+                      [("1", 0.0, 0.8), ("2", 0.8, 1.4)]),
+            "file2": ([("C", 0.0, 2.0)], [("1", 0.0, 2.0)]),
+            "file3": ([("D", 0.0, 1.0)], []),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_serial(self):
+        result = store.DER_stores(self.ref_store, self.hyp_store, collar=0.1)
+        expected = corpus.DER_corpus(self.pairs, collar=0.1)
+        self.assertEqual(expected.file_ids, result.file_ids)
+        np.testing.assert_allclose(expected.errors, result.errors)
+        np.testing.assert_allclose(expected.ref_lengths, result.ref_lengths)
+
+    def test_workers(self):
+        result = store.DER_stores(self.ref_store.path, self.hyp_store.path,
+                                  workers=2, chunksize=1)
+        expected = corpus.DER_corpus(self.pairs)
+        self.assertEqual(expected.file_ids, result.file_ids)
+        self.assertAlmostEqual(expected.der, result.der, delta=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import numpy as np
+import unittest
+
+from simpleder import der
+from simpleder import timeline
+
+
+REF = [("A", 0.0, 1.0),
+       ("B", 1.0, 2.0),
+       ("A", 2.5, 4.0)]
+HYP = [("1", 0.0, 1.05),
+       ("2", 1.05, 2.2),
+       ("1", 2.3, 4.0),
+       ("2", 3.0, 3.5)]
+
+
+class TestTimeline(unittest.TestCase):
+    """Tests for the Timeline class."""
+
+    def test_counts(self):
+        line = timeline.Timeline(REF, HYP)
+        np.testing.assert_allclose(
+            [0.0, 1.0, 1.05, 2.0, 2.2, 2.3, 2.5, 3.0, 3.5, 4.0],
+            line.boundaries)
+        np.testing.assert_array_equal([1, 1, 1, 0, 0, 0, 1, 1, 1],
+                                      line.ref_counts)
+        np.testing.assert_array_equal([1, 1, 1, 1, 0, 1, 1, 2, 1],
+                                      line.hyp_counts)
+
+    def test_retained_lengths(self):
+        line = timeline.Timeline([("A", 1.0, 2.0)], [("1", 0.0, 3.0)])
+        np.testing.assert_allclose([1.0, 1.0, 1.0],
+                                   line.retained_lengths())
+        np.testing.assert_allclose([0.75, 0.5, 0.75],
+                                   line.retained_lengths(0.25))
+
+    def test_cost_matrix(self):
+        line = timeline.Timeline(REF, HYP)
+        np.testing.assert_allclose(der.build_cost_matrix(REF, HYP),
+                                   line.build_cost_matrix(
+                                       line.retained_lengths()))
+
+
+class TestDERCollars(unittest.TestCase):
+    """Tests for the DER_collars function."""
+
+    def test_matches_der(self):
+        collars = [0.0, 0.1, 0.25, 0.5]
+        ders = timeline.DER_collars(REF, HYP, collars)
+        self.assertEqual(len(collars), len(ders))
+        for collar, value in zip(collars, ders):
+            self.assertAlmostEqual(der.DER(REF, HYP, collar=collar), value,
+                                   delta=0.0001)
+
+    def test_segment_array(self):
+        ref = der.SegmentArray.from_tuples(REF)
+        hyp = der.SegmentArray.from_tuples(HYP)
+        self.assertAlmostEqual(der.DER(REF, HYP, collar=0.25),
+                               timeline.DER_collars(ref, hyp, [0.25])[0],
+                               delta=0.0001)
+
+    def test_empty_ref(self):
+        self.assertEqual([0.0, 0.0],
+                         timeline.DER_collars([], HYP, [0.0, 0.25]))
+
+
+class TestDERAndSkipOverlap(unittest.TestCase):
+    """Tests for the DER_and_skip_overlap function."""
+
+    def test_matches_der(self):
+        ref = [("A", 0.0, 2.0), ("B", 1.0, 3.0), ("C", 2.5, 4.0)]
+        hyp = [("1", 0.0, 3.0), ("2", 3.0, 4.0)]
+        for collar in [0.0, 0.1]:
+            full, skipped = timeline.DER_and_skip_overlap(ref, hyp,
+                                                          collar=collar)
+            self.assertAlmostEqual(der.DER(ref, hyp, collar=collar), full,
+                                   delta=1e-12)
+            self.assertAlmostEqual(
+                der.DER(ref, hyp, collar=collar, skip_overlap=True), skipped,
+                delta=1e-12)
+
+    def test_empty_ref(self):
+        self.assertEqual((0.0, 0.0), timeline.DER_and_skip_overlap([], HYP))
+
+
+if __name__ == "__main__":
+    unittest.main()